@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+benchmark_pixel_format.py - Full-screen FPS in RGB565 vs RGB444
+
+Pushes a sequence of pre-rendered, video-like frames (moving colour
+gradients with noise) in each pixel format and prints the achieved FPS.
+RGB444 sends 115,200 bytes per frame instead of 153,600.
+
+Usage:
+    python3 benchmark_pixel_format.py [frames]
+"""
+
+import sys
+import time
+
+from displayhatmini_lite import DisplayHATMini
+from PIL import Image, ImageChops
+
+
+def make_frames(count, width, height):
+    """Pre-render frames so only packing and SPI are measured."""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 32)
+    frames = []
+    for i in range(count):
+        shift = (i * 7) % width
+        r = ImageChops.offset(gradient, shift, 0)
+        g = ImageChops.offset(gradient.transpose(Image.ROTATE_180), 0, shift % height)
+        b = ImageChops.add(ImageChops.offset(noise, shift, shift), gradient, scale=2.0)
+        frames.append(Image.merge("RGB", (r, g, b)))
+    return frames
+
+
+def run(display, frames):
+    start = time.perf_counter()
+    for frame in frames:
+        display.display(frame)
+    return len(frames) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    display = DisplayHATMini()
+    display.set_backlight(1.0)
+
+    print(f"Rendering {count} frames...")
+    unique = make_frames(min(count, 30), DisplayHATMini.WIDTH, DisplayHATMini.HEIGHT)
+    frames = [unique[i % len(unique)] for i in range(count)]
+
+    results = []
+    for pixel_format, dither in (("rgb565", False), ("rgb444", False), ("rgb444", True)):
+        display.pixel_format = pixel_format
+        display.dither = dither
+        fps = run(display, frames)
+        label = pixel_format + (" + dither" if dither else "")
+        results.append((label, fps))
+        print(f"{label:16s} {fps:6.1f} FPS")
+
+    baseline = results[0][1]
+    for label, fps in results[1:]:
+        print(f"{label:16s} {(fps / baseline - 1) * 100:+6.1f}% vs rgb565")
+
+    display.set_backlight(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -40,7 +40,7 @@ def main():
     draw = ImageDraw.Draw(image)
 
     draw.text((10, 30), "Display HAT Mini", font=font_large, fill="white")
-    draw.text((10, 80), "luma.lcd edition", font=font_large, fill="cyan")
+    draw.text((10, 80), "lite edition", font=font_large, fill="cyan")
     draw.text((10, 140), "No NumPy required!", font=font_small, fill="lime")
     draw.text((10, 170), "Press Ctrl+C to exit", font=font_small, fill="gray")
 
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+play_animation.py - Play an animated GIF/PNG/WebP on Display HAT Mini
+
+Frames are decoded ahead in a worker thread and late frames are dropped,
+so playback keeps to the animation's own timing.
+
+Usage:
+    python3 play_animation.py animation.gif [--loop] [--fps N] [--rgb444]
+"""
+
+import argparse
+
+from displayhatmini_lite import AnimationPlayer, DisplayHATMini
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="Animated image file")
+    parser.add_argument("--loop", action="store_true", help="Loop until Ctrl+C")
+    parser.add_argument("--fps", type=float, help="Override the frame rate")
+    parser.add_argument("--rgb444", action="store_true", help="Send 12-bit frames")
+    args = parser.parse_args()
+
+    display = DisplayHATMini(pixel_format="rgb444" if args.rgb444 else "rgb565")
+    display.set_backlight(1.0)
+
+    player = AnimationPlayer(display, args.path, fps=args.fps, loop=args.loop)
+    try:
+        player.play()
+    except KeyboardInterrupt:
+        player.stop()
+
+    stats = player.stats
+    print(f"Presented {stats.presented} frames, dropped {stats.dropped}")
+    print(f"Achieved {stats.achieved_fps:.1f} FPS (target {stats.target_fps:.1f})")
+    display.set_backlight(0)
+
+
+if __name__ == "__main__":
+    main()
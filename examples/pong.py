@@ -7,15 +7,18 @@ Controls:
 - Button X / Button Y: Right player (up/down)
 
 Ported from Pimoroni's displayhatmini-python examples.
+
+The ball and paddles are Sprites, so each frame only sends the few
+rectangles that changed instead of the whole screen. A GameLoop runs the
+game logic at a fixed 60 ticks per second and paces the frames.
 """
 
 import math
 import random
-import time
 from collections import namedtuple
 
-from displayhatmini_lite import DisplayHATMini
-from PIL import Image, ImageDraw, ImageFont
+from displayhatmini_lite import DisplayHATMini, GameLoop, Sprite, to_rgb565
+from PIL import Image, ImageDraw
 
 
 Position = namedtuple("Position", "x y")
@@ -55,10 +58,6 @@ class Vec2D:
         )
 
 
-def millis():
-    return int(round(time.time() * 1000))
-
-
 class Ball:
     def __init__(self, width, height):
         self.width = width
@@ -171,16 +170,14 @@ class Ball:
             self.y = self.height - self.radius
             self.vy *= -1
 
-    def render(self, draw):
-        draw.ellipse(
-            (
-                self.x - self.radius,
-                self.y - self.radius,
-                self.x + self.radius,
-                self.y + self.radius,
-            ),
-            self.color,
-        )
+    def image(self):
+        size = self.radius * 2 + 1
+        image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        ImageDraw.Draw(image).ellipse((0, 0, size - 1, size - 1), self.color)
+        return image
+
+    def render(self, sprite):
+        sprite.move(self.x - self.radius, self.y - self.radius)
 
 
 class Player:
@@ -222,16 +219,25 @@ class Player:
     def update(self):
         self.y = self.next_y
 
-    def render(self, draw):
-        draw.rectangle(
-            (
-                self.x - (self.paddle_width / 2),
-                self.y - (self.paddle_height / 2),
-                self.x + (self.paddle_width / 2),
-                self.y + (self.paddle_height / 2),
-            ),
-            (255, 255, 255),
-        )
+    def image(self):
+        return Image.new("RGB", (self.paddle_width + 1, self.paddle_height + 1), (255, 255, 255))
+
+    def render(self, sprite):
+        sprite.move(self.x - (self.paddle_width / 2), self.y - (self.paddle_height / 2))
+
+
+def draw_background(draw, width, height, player_one, player_two):
+    # Clear screen
+    draw.rectangle((0, 0, width, height), (0, 0, 0))
+
+    # Draw center line
+    draw.rectangle(
+        ((width / 2) - 1, 20, (width / 2) + 1, height - 20), (64, 64, 64)
+    )
+
+    # Draw scores
+    draw.text((25, 25), f"{player_one.score:02d}", fill=(255, 255, 255))
+    draw.text((width - 45, 25), f"{player_two.score:02d}", fill=(255, 255, 255))
 
 
 def main():
@@ -243,7 +249,7 @@ def main():
     width = DisplayHATMini.WIDTH
     height = DisplayHATMini.HEIGHT
 
-    # Create image buffer
+    # Create background buffer
     image = Image.new("RGB", (width, height))
     draw = ImageDraw.Draw(image)
 
@@ -252,8 +258,65 @@ def main():
     player_two = Player(1, width, height)
     ball = Ball(width, height)
 
-    time_last = millis()
-    paddle_speed = 15
+    # Draw the static background once, then move sprites over it
+    draw_background(draw, width, height, player_one, player_two)
+    background = to_rgb565(image)
+    display.display(image)
+    scores = (player_one.score, player_two.score)
+
+    ball_sprite = Sprite(display, ball.image(), background)
+    player_one_sprite = Sprite(display, player_one.image(), background)
+    player_two_sprite = Sprite(display, player_two.image(), background)
+    sprites = (ball_sprite, player_one_sprite, player_two_sprite)
+
+    paddle_speed = 600  # Pixels per second
+
+    def update(dt, buttons):
+        # Handle input (all buttons are sampled once per tick)
+        step = paddle_speed * dt
+        player_one_pos = player_one.center.y
+        if DisplayHATMini.BUTTON_A in buttons.held:
+            player_one_pos -= step
+        if DisplayHATMini.BUTTON_B in buttons.held:
+            player_one_pos += step
+
+        player_two_pos = player_two.center.y
+        if DisplayHATMini.BUTTON_X in buttons.held:
+            player_two_pos -= step
+        if DisplayHATMini.BUTTON_Y in buttons.held:
+            player_two_pos += step
+
+        # Clamp paddle positions
+        player_one_pos = max(0, min(height, player_one_pos))
+        player_two_pos = max(0, min(height, player_two_pos))
+
+        player_one.paddle(player_one_pos)
+        player_two.paddle(player_two_pos)
+
+        # Update game state (ball speeds are in pixels per millisecond)
+        player_one.update()
+        player_two.update()
+        ball.update(dt * 1000, player_one, player_two)
+
+    def render(alpha):
+        nonlocal background, scores
+
+        # Redraw the background only when a score changes
+        if (player_one.score, player_two.score) != scores:
+            scores = (player_one.score, player_two.score)
+            draw_background(draw, width, height, player_one, player_two)
+            background = to_rgb565(image)
+            display.display(image)
+            for sprite in sprites:
+                sprite.set_background(background)
+                sprite.redraw()
+
+        # Each sprite sends only the area it moved across
+        ball.render(ball_sprite)
+        player_one.render(player_one_sprite)
+        player_two.render(player_two_sprite)
+
+    loop = GameLoop(display, update, render, tick_rate=60)
 
     print("Pong - Display HAT Mini")
     print("Left player: A (up), B (down)")
@@ -261,61 +324,11 @@ def main():
     print("Press Ctrl+C to exit")
 
     try:
-        while True:
-            time_now = millis()
-            time_delta = time_now - time_last
-
-            # Handle input
-            player_one_pos = player_one.center.y
-            if display.read_button(DisplayHATMini.BUTTON_A):
-                player_one_pos -= paddle_speed
-            if display.read_button(DisplayHATMini.BUTTON_B):
-                player_one_pos += paddle_speed
-
-            player_two_pos = player_two.center.y
-            if display.read_button(DisplayHATMini.BUTTON_X):
-                player_two_pos -= paddle_speed
-            if display.read_button(DisplayHATMini.BUTTON_Y):
-                player_two_pos += paddle_speed
-
-            # Clamp paddle positions
-            player_one_pos = max(0, min(height, player_one_pos))
-            player_two_pos = max(0, min(height, player_two_pos))
-
-            player_one.paddle(player_one_pos)
-            player_two.paddle(player_two_pos)
-
-            # Clear screen
-            draw.rectangle((0, 0, width, height), (0, 0, 0))
-
-            # Draw center line
-            draw.rectangle(
-                ((width / 2) - 1, 20, (width / 2) + 1, height - 20), (64, 64, 64)
-            )
-
-            # Draw scores
-            draw.text((25, 25), f"{player_one.score:02d}", fill=(255, 255, 255))
-            draw.text((width - 45, 25), f"{player_two.score:02d}", fill=(255, 255, 255))
-
-            # Update game state
-            player_one.update()
-            player_two.update()
-            ball.update(time_delta, player_one, player_two)
-
-            # Render
-            ball.render(draw)
-            player_one.render(draw)
-            player_two.render(draw)
-
-            # Send to display
-            display.display(image)
-
-            time.sleep(0.001)
-            time_last = time_now
-
+        loop.run()
     except KeyboardInterrupt:
         print("\nGame over!")
         print(f"Final score: {player_one.score} - {player_two.score}")
+        print(loop.stats)
         display.set_led(0, 0, 0)
         display.set_backlight(0)
 
@@ -15,8 +15,10 @@ Requires: dtoverlay=pwm-2chan,pin=13,func=4 in /boot/firmware/config.txt
 import os
 import time
 import RPi.GPIO as GPIO
-from luma.core.interface.serial import spi
-from luma.lcd.device import st7789
+from displayhatmini_lite import DisplayHATMini
+from displayhatmini_lite.backends import SpidevBackend
+from displayhatmini_lite.gpio import RPiGPIO
+from displayhatmini_lite.pixels import to_rgb565
 from PIL import Image, ImageDraw, ImageFont
 
 # GPIO pins
@@ -112,9 +114,11 @@ def main():
     for pin in [BUTTON_A, BUTTON_B, BUTTON_X, BUTTON_Y]:
         GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
-    # Initialize display
-    serial = spi(port=0, device=1, gpio_DC=9, gpio_RST=None, bus_speed_hz=52000000)
-    display = st7789(serial, width=320, height=240, rotate=2)
+    # Initialize the panel alone: DisplayHATMini would also set up GPIO 13,
+    # which is left to the PWM under test
+    panel = SpidevBackend(
+        RPiGPIO(), DisplayHATMini.SPI_PORT, DisplayHATMini.SPI_CS, DisplayHATMini.SPI_DC, 52_000_000
+    )
 
     # Load font
     try:
@@ -158,7 +162,8 @@ def main():
         draw.text((20, 190), "X/Y: Frequency +/-", font=font_small, fill="gray")
         draw.text((20, 215), "(Kernel sysfs PWM)", font=font_small, fill="darkgreen")
 
-        display.display(image)
+        panel.set_window(0, 0, 320, 240)
+        panel.write(to_rgb565(image))
 
     def read_button(pin):
         return not GPIO.input(pin)
@@ -212,6 +217,7 @@ def main():
         print("\nExiting...")
     finally:
         pwm.cleanup()
+        panel.close()
         GPIO.cleanup()
 
 
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+startup_benchmark.py - Measure time to first frame
+
+Reports how long each startup stage takes, from the start of this script to
+the first pixels being sent to the panel:
+
+- import displayhatmini_lite
+- DisplayHATMini() construction (GPIO, backlight, panel init)
+- the first frame (a solid fill, which needs no Pillow import)
+
+Usage:
+    python3 startup_benchmark.py [--defer-io] [--backlight-pwm]
+"""
+
+import time
+
+START = time.perf_counter()
+
+import argparse  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first frame")
+    parser.add_argument("--defer-io", action="store_true", help="Set up LED/buttons in the background")
+    parser.add_argument("--backlight-pwm", action="store_true", help="Use PWM backlight (kernel PWM if available)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    from displayhatmini_lite import DisplayHATMini
+    t1 = time.perf_counter()
+
+    display = DisplayHATMini(backlight_pwm=args.backlight_pwm, defer_io=args.defer_io)
+    t2 = time.perf_counter()
+
+    display.fill((0, 0, 64))
+    t3 = time.perf_counter()
+
+    display.set_led(0, 0, 0)  # Waits for deferred LED/button setup
+    t4 = time.perf_counter()
+
+    print(f"import:          {(t1 - t0) * 1000:7.1f} ms")
+    print(f"init:            {(t2 - t1) * 1000:7.1f} ms  (backend: {display.backend})")
+    print(f"first frame:     {(t3 - t2) * 1000:7.1f} ms")
+    print(f"time to frame:   {(t3 - START) * 1000:7.1f} ms since script start")
+    print(f"LED/buttons up:  {(t4 - START) * 1000:7.1f} ms since script start")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,24 +2,93 @@
 displayhatmini_lite - Lightweight driver for Pimoroni Display HAT Mini
 
 A NumPy-free replacement for the official displayhatmini library,
-using luma.lcd for display communication.
+driving the ST7789 panel directly over spidev.
+
+Importing the package is cheap: the GPIO library, spidev and Pillow are only
+imported when a DisplayHATMini is created or a helper that needs them is
+first used.
 """
 
+from __future__ import annotations
+
 __version__ = "0.1.6"
 
 import atexit
+import importlib
 import os
+import threading
 import time
+import zlib
+
+# typing.TYPE_CHECKING without the cost of importing typing
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Public helpers, imported from their submodules on first access
+_LAZY_EXPORTS = {
+    "AnimationFile": "animfile",
+    "encode_animation": "animfile",
+    "Asset": "assets",
+    "clear_asset_cache": "assets",
+    "load_asset": "assets",
+    "FramebufferBackend": "backends",
+    "SpidevBackend": "backends",
+    "find_panel_framebuffer": "backends",
+    "BusArbiter": "bus",
+    "FramebufferMirror": "fbmirror",
+    "GpiodGPIO": "gpio",
+    "RPiGPIO": "gpio",
+    "LatencyTracker": "latency",
+    "Governor": "governor",
+    "FlightRecorder": "flight",
+    "Watchdog": "flight",
+    "GameLoop": "loop",
+    "LoopStats": "loop",
+    "IdleManager": "power",
+    "rgb565_color": "pixels",
+    "to_rgb444": "pixels",
+    "to_rgb565": "pixels",
+    "AnimationPlayer": "player",
+    "RemoteViewClient": "remote",
+    "RemoteViewServer": "remote",
+    "ShadowFramebuffer": "shadow",
+    "PlaybackStats": "player",
+    "Sprite": "sprite",
+    "TraceRecorder": "trace",
+    "replay_trace": "trace",
+}
+
 
-import RPi.GPIO as GPIO
-from luma.core.interface.serial import spi
-from luma.lcd.device import st7789
-from PIL import Image
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
+
+
+def _wait_for(condition, timeout: float, interval: float = 0.001) -> bool:
+    """Poll condition() until it is true or timeout seconds pass."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
 
 
 class KernelPWM:
     """Control PWM via kernel sysfs interface (more stable than pigpio)."""
 
+    # Maximum time to wait for sysfs to create or remove a channel
+    EXPORT_TIMEOUT = 1.0
+
     def __init__(self, chip=0, channel=0):
         self.chip = chip
         self.channel = channel
@@ -35,9 +104,11 @@ class KernelPWM:
             try:
                 with open(f"{self.base_path}/export", "w") as f:
                     f.write(str(self.channel))
-                time.sleep(0.1)  # Wait for sysfs to create files
             except (IOError, OSError):
                 return False
+            # Wait for sysfs (and udev permissions) to make the channel writable
+            if not _wait_for(lambda: os.access(f"{self.pwm_path}/period", os.W_OK), self.EXPORT_TIMEOUT):
+                return False
         self._exported = True
         return True
 
@@ -74,6 +145,30 @@ class KernelPWM:
         if self._write("enable", 0):
             self._enabled = False
 
+    def attach(self):
+        """
+        Take over a channel that an earlier process left exported and running.
+
+        Returns:
+            Its duty cycle as a fraction of the period, or None (changing
+            nothing) if the channel is not exported and enabled.
+        """
+        try:
+            with open(f"{self.pwm_path}/enable") as f:
+                enabled = f.read().strip() == "1"
+            with open(f"{self.pwm_path}/period") as f:
+                period_ns = int(f.read())
+            with open(f"{self.pwm_path}/duty_cycle") as f:
+                duty_ns = int(f.read())
+        except (OSError, ValueError):
+            return None
+        if not enabled or period_ns <= 0:
+            return None
+        self._exported = True
+        self._enabled = True
+        self._period_ns = period_ns
+        return min(1.0, max(0.0, duty_ns / period_ns))
+
     def cleanup(self):
         """Set duty cycle to 0 and unexport the PWM channel."""
         if self._exported:
@@ -93,6 +188,48 @@ class KernelPWM:
         return os.path.exists(f"/sys/class/pwm/pwmchip{chip}")
 
 
+class DisplayStats:
+    """Counters for everything a DisplayHATMini has sent to the panel."""
+
+    def __init__(self):
+        self.frames = 0
+        self.frames_skipped = 0
+        self.regions = 0
+        self.bytes_sent = 0
+        # Bus contention
+        self.bus_waits = 0
+        self.bus_wait_time = 0.0
+        self.updates_deferred = 0
+        self.updates_merged = 0
+        # SPI transfer sizing (None with the fbdev backend)
+        self.spi_bufsiz = None
+        self.spi_chunk_bytes = None
+        self.spi_throughput = None  # Bytes per second, measured by calibrate_spi()
+
+    def as_dict(self) -> dict:
+        """Return the stats as a plain dict."""
+        return {
+            "frames": self.frames,
+            "frames_skipped": self.frames_skipped,
+            "regions": self.regions,
+            "bytes_sent": self.bytes_sent,
+            "bus_waits": self.bus_waits,
+            "bus_wait_time": self.bus_wait_time,
+            "updates_deferred": self.updates_deferred,
+            "updates_merged": self.updates_merged,
+            "spi_bufsiz": self.spi_bufsiz,
+            "spi_chunk_bytes": self.spi_chunk_bytes,
+            "spi_throughput": self.spi_throughput,
+        }
+
+    def __repr__(self):
+        return (
+            f"DisplayStats(frames={self.frames}, frames_skipped={self.frames_skipped}, "
+            f"regions={self.regions}, bytes_sent={self.bytes_sent}, bus_waits={self.bus_waits}, "
+            f"updates_deferred={self.updates_deferred}, updates_merged={self.updates_merged})"
+        )
+
+
 class DisplayHATMini:
     """
     Driver for the Pimoroni Display HAT Mini.
@@ -105,6 +242,7 @@ class DisplayHATMini:
     BUTTON_B = 6
     BUTTON_X = 16
     BUTTON_Y = 24
+    BUTTONS = (BUTTON_A, BUTTON_B, BUTTON_X, BUTTON_Y)
 
     # RGB LED GPIO pins (active low - inverted logic)
     LED_R = 17
@@ -132,7 +270,44 @@ class DisplayHATMini:
     # SPI speed - 80 MHz works reliably and gives good performance
     SPI_SPEED_HZ = 80_000_000  # 80 MHz
 
-    def __init__(self, backlight_pwm: bool = False, spi_speed_hz: int = None):
+    # Output backends ("auto" picks fbdev when a kernel panel driver is found)
+    BACKENDS = ("auto", "spidev", "fbdev")
+
+    # Pixel formats for full-frame transfers
+    PIXEL_FORMATS = ("rgb565", "rgb444")
+
+    # Size of the reusable buffer streamed by fill()/fill_rect()
+    FILL_BUFFER_SIZE = 4096
+
+    # Rows per band when display() encodes and sends a frame in pieces (a
+    # multiple of 4, so ordered dithering lines up across bands)
+    BAND_ROWS = 16
+
+    # Updates queued for the thread holding the bus before callers must wait
+    MAX_PENDING_UPDATES = 16
+
+    # Warm-start record of the applied panel setup (/run is cleared at boot)
+    STATE_FILE = "/run/displayhatmini-lite.state"
+
+    def __init__(
+        self,
+        backlight_pwm: bool = False,
+        spi_speed_hz: int = None,
+        pixel_format: str = "rgb565",
+        dither: bool = False,
+        backend: str = "auto",
+        fb_device: str = None,
+        defer_io: bool = False,
+        warm_start=False,
+        skip_identical: bool = True,
+        bus_arbiter=None,
+        max_slice_latency: float = 0.002,
+        gpio="auto",
+        calibrate_spi: bool = False,
+        render_size=None,
+        flight_events: int = 1024,
+        shadow: bool = False,
+    ):
         """
         Initialize the Display HAT Mini.
 
@@ -140,6 +315,47 @@ class DisplayHATMini:
             backlight_pwm: If True, use PWM for dimmable backlight.
             spi_speed_hz: SPI bus speed in Hz. Default 80 MHz for best performance.
                          Can try 100_000_000 for ~20 FPS if display is stable.
+            pixel_format: "rgb565" (default) or "rgb444". RGB444 sends 12 bits
+                         per pixel, cutting full-frame transfers by 25%.
+            dither: If True, apply ordered dithering when packing RGB444 frames.
+            backend: "spidev" to drive the panel over SPI from this process,
+                     "fbdev" to write into a kernel panel driver's framebuffer
+                     (DMA refresh, no SPI work in Python), or "auto" (default)
+                     to use fbdev when such a framebuffer is found.
+            fb_device: Framebuffer for the fbdev backend (default: detected
+                       from /sys/class/graphics). Implies fbdev with "auto".
+            defer_io: If True, set up the LED and buttons in a background
+                      thread while the panel initialises, for the fastest
+                      time to first frame. LED and button calls wait for it.
+            warm_start: If True (or a state file path instead of STATE_FILE),
+                        skip the panel setup when an earlier process already
+                        applied the same configuration since boot, so a
+                        restarted service keeps the last image on screen.
+                        The backlight is also left on at exit.
+            skip_identical: If True (default), display() and display_raw()
+                            skip the transfer when a CRC-32 of the frame
+                            matches the full frame already on the panel.
+            bus_arbiter: A BusArbiter shared with drivers for other devices
+                         on SPI0 (e.g. a sensor on CE0). Transfers are then
+                         sent in slices, so others wait at most one slice
+                         (spidev backend only).
+            max_slice_latency: With bus_arbiter, the longest a slice may
+                               hold the bus, in seconds (default 2 ms).
+            gpio: "gpiod" for the GPIO character device (libgpiod v2,
+                  kernel-debounced button edges with kernel timestamps),
+                  "rpi-gpio" for RPi.GPIO, "null" to drive nothing (for a
+                  mock panel off the Pi), or "auto" (default) to use
+                  gpiod when its bindings are installed.
+            calibrate_spi: If True, run calibrate_spi() while the panel is
+                           still dark (skipped after a warm start).
+            render_size: (width, height) of the images given to display(),
+                         e.g. (160, 120). They are upscaled by the largest
+                         integer factor that fits, while being packed, and
+                         centred on black borders. None means full size.
+            flight_events: Number of recent events kept by the flight
+                           recorder (see flight_recorder).
+            shadow: If True, keep a copy of the panel contents in memory,
+                    for screenshot() and enable_remote_view().
 
         Note:
             For flicker-free backlight dimming, enable kernel PWM overlay:
@@ -150,27 +366,58 @@ class DisplayHATMini:
             For completely flicker-free operation, add a 0.1µF capacitor
             between GPIO 13 and GND.
         """
+        from .flight import FlightRecorder
+
+        self._flight = FlightRecorder(flight_events)
         self._backlight_pwm_enabled = backlight_pwm
         self._spi_speed = spi_speed_hz or self.SPI_SPEED_HZ
+        self._warm_start = bool(warm_start)
+        self.dither = dither
+        self.skip_identical = skip_identical
+        self.stats = DisplayStats()
+        self._transfers_done = 0  # Frames and regions that reached the panel, for the watchdog
         self._button_callback = None
+        self._fill_color = None
+        self._fill_buffer = None
         self._kernel_pwm = None
         self._using_kernel_pwm = False
+        self._led_pwm = {}
+        self._io_ready = threading.Event()
+        self._led_values = (0.0, 0.0, 0.0)
+        self._backlight_level = 1.0
+        self._powered_down = False
+        self._idle = None
+        self._governor = None
+        self._watchdog = None
+        self._remote_view = None
+        self._shadow = None
+        if shadow:
+            from .shadow import ShadowFramebuffer
+
+            self._shadow = ShadowFramebuffer(self.WIDTH, self.HEIGHT)
+        self._latency = None
+        self._trace = None
+        self._frame_key = None  # Fingerprint of the full frame on the panel
+        self._closed = False
+
+        # Thread safety: the bus lock serialises everything sent to the panel;
+        # updates made while another thread holds it are queued in _pending
+        # and sent by that thread. The IO lock covers LED and backlight state.
+        self._bus_lock = threading.RLock()
+        self._pending_lock = threading.Lock()
+        self._pending = []
+        self._io_lock = threading.Lock()
 
         # Initialize GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)
+        from .gpio import open_gpio
 
-        # Set up buttons with pull-up resistors
-        for pin in (self.BUTTON_A, self.BUTTON_B, self.BUTTON_X, self.BUTTON_Y):
-            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        self._gpio = gpio = open_gpio(gpio)
 
-        # Set up RGB LED with PWM
-        self._led_pwm = {}
-        for pin in (self.LED_R, self.LED_G, self.LED_B):
-            GPIO.setup(pin, GPIO.OUT)
-            pwm = GPIO.PWM(pin, self.LED_PWM_FREQ)
-            pwm.start(100)  # Start at 100% duty = LED off (inverted)
-            self._led_pwm[pin] = pwm
+        # LED and buttons are not needed for the first frame
+        if defer_io:
+            threading.Thread(target=self._init_io, name="displayhatmini-io", daemon=True).start()
+        else:
+            self._init_io()
 
         # Set up backlight
         self._backlight_pwm = None
@@ -179,60 +426,123 @@ class DisplayHATMini:
             if KernelPWM.is_available(self.PWM_CHIP, self.PWM_CHANNEL):
                 try:
                     self._kernel_pwm = KernelPWM(self.PWM_CHIP, self.PWM_CHANNEL)
-                    # Always unexport first if the channel is already exported (stale
-                    # state from a previous run).  The unexport+export cycle causes the
-                    # kernel to re-claim GPIO 13 via pinctrl, restoring it to ALT0
-                    # regardless of any prior GPIO.setup() calls that may have changed
-                    # the pin function.  It also gives the PWM clock a clean start.
-                    if os.path.exists(self._kernel_pwm.pwm_path):
-                        try:
-                            with open(f"{self._kernel_pwm.base_path}/unexport", "w") as f:
-                                f.write(str(self._kernel_pwm.channel))
-                            time.sleep(0.05)
-                        except (IOError, OSError):
-                            pass
-                    if self._kernel_pwm._export():
-                        self._kernel_pwm.set_frequency(self.BACKLIGHT_PWM_FREQ)
-                        self._kernel_pwm.set_duty_cycle(100)
-                        self._kernel_pwm.enable()
+                    level = self._kernel_pwm.attach() if warm_start else None
+                    if level is not None:
+                        # Left running at exit for this warm start: keep it and
+                        # its brightness, so the backlight does not blink
+                        self._backlight_level = level
                         self._using_kernel_pwm = True
+                    else:
+                        self._start_kernel_pwm()
                 except Exception:
                     self._kernel_pwm = None
 
             # Fall back to software PWM if kernel PWM not available
             if not self._using_kernel_pwm:
-                GPIO.setup(self.BACKLIGHT, GPIO.OUT)
-                self._backlight_pwm = GPIO.PWM(self.BACKLIGHT, self.BACKLIGHT_PWM_FREQ)
+                gpio.setup_output(self.BACKLIGHT, True)
+                self._backlight_pwm = gpio.pwm(self.BACKLIGHT, self.BACKLIGHT_PWM_FREQ)
                 self._backlight_pwm.start(100)  # Full brightness
         else:
-            GPIO.setup(self.BACKLIGHT, GPIO.OUT)
-            GPIO.output(self.BACKLIGHT, GPIO.HIGH)
-
-        # Initialize display via luma.lcd
-        # Use 52 MHz initially (luma's max allowed), then override if higher requested
-        initial_speed = min(self._spi_speed, 52_000_000)
-        serial = spi(
-            port=self.SPI_PORT,
-            device=self.SPI_CS,
-            gpio_DC=self.SPI_DC,
-            gpio_RST=None,
-            bus_speed_hz=initial_speed,
-        )
+            gpio.setup_output(self.BACKLIGHT, True)
 
-        # Override SPI speed if higher than luma's whitelist allows
-        if self._spi_speed > 52_000_000:
-            serial._spi.max_speed_hz = self._spi_speed
+        # Initialize the panel output
+        if backend not in self.BACKENDS:
+            raise ValueError(f"backend must be one of {self.BACKENDS} (got {backend!r})")
+        from .backends import FramebufferBackend, SpidevBackend, find_panel_framebuffer
 
-        self._device = st7789(
-            serial,
-            width=self.WIDTH,
-            height=self.HEIGHT,
-            rotate=2,  # 180 degree rotation for correct orientation
-        )
+        if backend != "spidev":
+            fb_device = fb_device or find_panel_framebuffer()
+            if fb_device:
+                backend = "fbdev"
+            elif backend == "fbdev":
+                raise ValueError("No kernel panel framebuffer found; pass fb_device")
+        if backend == "fbdev":
+            self._backend = FramebufferBackend(fb_device, self.WIDTH, self.HEIGHT)
+        else:
+            state_file = None
+            if warm_start:
+                state_file = self.STATE_FILE if warm_start is True else warm_start
+            slice_bytes = None
+            if bus_arbiter is not None:
+                if max_slice_latency <= 0:
+                    raise ValueError(f"max_slice_latency must be positive (got {max_slice_latency})")
+                slice_bytes = self.slice_size(self._spi_speed, max_slice_latency)
+            self._backend = SpidevBackend(
+                gpio,
+                self.SPI_PORT,
+                self.SPI_CS,
+                self.SPI_DC,
+                self._spi_speed,
+                state_file,
+                bus_arbiter,
+                slice_bytes,
+            )
+        if isinstance(self._backend, SpidevBackend):
+            self.stats.spi_bufsiz = self._backend.bufsiz
+            self.stats.spi_chunk_bytes = self._backend.chunk_bytes
+            if calibrate_spi and not self._backend.warm:
+                self.calibrate_spi()
+        self.pixel_format = pixel_format
+        self.render_size = render_size
+        from .bus import BandWriter
+
+        self._band_writer = BandWriter(self._write_pixels)
 
         # Register cleanup on exit
         atexit.register(self._cleanup)
 
+    @staticmethod
+    def slice_size(speed_hz: int, latency: float) -> int:
+        """
+        Return the bytes of pixels that fit into one bus slice.
+
+        Rounded down to a multiple of 12 bytes, so that every slice ends on a
+        pixel boundary in both RGB565 and RGB444.
+
+        Args:
+            speed_hz: SPI bus speed in Hz.
+            latency: Maximum slice duration in seconds.
+        """
+        return max(12, int(speed_hz * latency / 8) // 12 * 12)
+
+    def _start_kernel_pwm(self) -> None:
+        """Export the backlight's kernel PWM channel afresh and switch it on at full brightness."""
+        kernel_pwm = self._kernel_pwm
+        # Always unexport first if the channel is already exported (stale
+        # state from a previous run).  The unexport+export cycle causes the
+        # kernel to re-claim GPIO 13 via pinctrl, restoring it to ALT0
+        # regardless of any prior GPIO.setup() calls that may have changed
+        # the pin function.  It also gives the PWM clock a clean start.
+        pwm_path = kernel_pwm.pwm_path
+        if os.path.exists(pwm_path):
+            try:
+                with open(f"{kernel_pwm.base_path}/unexport", "w") as f:
+                    f.write(str(kernel_pwm.channel))
+                _wait_for(lambda: not os.path.exists(pwm_path), KernelPWM.EXPORT_TIMEOUT)
+            except (IOError, OSError):
+                pass
+        if kernel_pwm._export():
+            kernel_pwm.set_frequency(self.BACKLIGHT_PWM_FREQ)
+            kernel_pwm.set_duty_cycle(100)
+            kernel_pwm.enable()
+            self._using_kernel_pwm = True
+
+    def _init_io(self) -> None:
+        """Set up the buttons and the RGB LED."""
+        gpio = self._gpio
+
+        # Set up buttons with pull-up resistors
+        gpio.setup_inputs(self.BUTTONS)
+
+        # Set up RGB LED with PWM
+        for pin in (self.LED_R, self.LED_G, self.LED_B):
+            gpio.setup_output(pin, True)  # LED off
+            pwm = gpio.pwm(pin, self.LED_PWM_FREQ)
+            pwm.start(100)  # Start at 100% duty = LED off (inverted)
+            self._led_pwm[pin] = pwm
+
+        self._io_ready.set()
+
     def set_led(self, r: float = 0.0, g: float = 0.0, b: float = 0.0) -> None:
         """
         Set the RGB LED color.
@@ -248,11 +558,20 @@ class DisplayHATMini:
         for name, value in [("r", r), ("g", g), ("b", b)]:
             if not 0.0 <= value <= 1.0:
                 raise ValueError(f"{name} must be between 0.0 and 1.0 (got {value})")
+        if self._trace is not None:
+            self._trace.on_led(r, g, b)
+        self._flight.record("led", (r, g, b))
+
+        self._io_ready.wait()
+        with self._io_lock:
+            self._led_values = (r, g, b)
+            if self._powered_down:
+                return  # Applied when the idle manager wakes the display
 
-        # Inverted logic: 100% duty = off, 0% duty = full brightness
-        self._led_pwm[self.LED_R].ChangeDutyCycle((1.0 - r) * 100)
-        self._led_pwm[self.LED_G].ChangeDutyCycle((1.0 - g) * 100)
-        self._led_pwm[self.LED_B].ChangeDutyCycle((1.0 - b) * 100)
+            # Inverted logic: 100% duty = off, 0% duty = full brightness
+            self._led_pwm[self.LED_R].ChangeDutyCycle((1.0 - r) * 100)
+            self._led_pwm[self.LED_G].ChangeDutyCycle((1.0 - g) * 100)
+            self._led_pwm[self.LED_B].ChangeDutyCycle((1.0 - b) * 100)
 
     def set_backlight(self, value: float) -> None:
         """
@@ -266,7 +585,18 @@ class DisplayHATMini:
         """
         if not 0.0 <= value <= 1.0:
             raise ValueError(f"Backlight value must be between 0.0 and 1.0 (got {value})")
+        if self._trace is not None:
+            self._trace.on_backlight(value)
 
+        with self._io_lock:
+            self._backlight_level = value
+            if self._idle is not None and self._idle.state != "active":
+                return  # Applied when the idle manager wakes the display
+            self._apply_backlight(value)
+
+    def _apply_backlight(self, value: float) -> None:
+        """Drive the backlight without changing the level set by the application (hold _io_lock)."""
+        self._flight.record("backlight", value)
         if self._using_kernel_pwm and self._kernel_pwm:
             # Kernel sysfs PWM
             self._kernel_pwm.set_duty_cycle(value * 100)
@@ -275,7 +605,7 @@ class DisplayHATMini:
             self._backlight_pwm.ChangeDutyCycle(value * 100)
         else:
             # Simple on/off
-            GPIO.output(self.BACKLIGHT, GPIO.HIGH if value > 0 else GPIO.LOW)
+            self._gpio.output(self.BACKLIGHT, value > 0)
 
     def display(self, image: Image.Image) -> None:
         """
@@ -287,9 +617,786 @@ class DisplayHATMini:
 
         Note:
             For best performance, pass images that are already 320x240 RGB
-            to avoid conversion overhead.
+            to avoid conversion overhead. With skip_identical, an image
+            that matches the frame on screen is neither encoded nor sent.
+            The frame is encoded in bands of BAND_ROWS rows, each sent
+            while the next is encoded. Images of render_size are upscaled
+            to the panel instead of resized.
+        """
+        if self._latency is not None:
+            self._latency.on_draw()
+        if self._trace is not None:
+            self._trace.on_display(image)
+        key = None
+        if self._fingerprinting():
+            # Hash the source pixels, so an unchanged image is not even encoded
+            key = (image.mode, image.size, self._pixel_format, self.dither, self._image_crc(image))
+            if key == self._frame_key:
+                self._skip_frame()
+                return
+        self._stream_frame(image, key)
+
+    def encode(self, image: Image.Image) -> bytes:
+        """
+        Convert a PIL Image to a panel-ready frame in the current pixel format.
+
+        Encoding is independent of the SPI bus, so it can run ahead of time
+        (e.g. in a worker thread) and the result passed to display_raw().
+
+        Args:
+            image: A PIL Image. Resized to 320x240 if necessary.
+
+        Returns:
+            The packed frame bytes.
+        """
+        from .pixels import to_rgb444, to_rgb565
+
+        if image.size != (self.WIDTH, self.HEIGHT):
+            image = image.resize((self.WIDTH, self.HEIGHT))
+        if self._pixel_format == "rgb444":
+            return to_rgb444(image, self.dither)
+        return to_rgb565(image)
+
+    def display_raw(self, data) -> None:
+        """
+        Send a full frame produced by encode().
+
+        Args:
+            data: Packed frame bytes (any buffer object). The pixel format is
+                  taken from the length: 153,600 bytes for RGB565 or 115,200
+                  bytes for RGB444.
+
+        Raises:
+            ValueError: If the length matches neither pixel format.
+        """
+        if self._latency is not None:
+            self._latency.on_draw()
+        if self._trace is not None:
+            self._trace.on_display_raw(data)
+        key = None
+        if self._fingerprinting():
+            key = (len(data), zlib.crc32(data))
+            if key == self._frame_key:
+                self._skip_frame()
+                return
+        self._send_frame(data, key)
+
+    def _image_crc(self, image: Image.Image) -> int:
+        """CRC-32 of an image's pixel bytes (and palette), computed a band at a time."""
+        crc = 0
+        if image.mode in ("P", "PA"):
+            # The same indices look different under another palette
+            crc = zlib.crc32(bytes(image.getpalette() or ()))
+        width, height = image.size
+        for top in range(0, height, self.BAND_ROWS):
+            band = image.crop((0, top, width, min(top + self.BAND_ROWS, height)))
+            crc = zlib.crc32(band.tobytes(), crc)
+        return crc
+
+    def _stream_frame(self, image: Image.Image, key) -> None:
+        """
+        Encode and send a full frame band by band.
+
+        The writer thread sends each band while the next one is encoded, so
+        encoding overlaps the transfer and only a few bands are in memory at
+        once. If another thread holds the bus, the frame is encoded whole
+        and queued for it instead.
+        """
+        pixel_format = self._pixel_format
+        if image.size == self._render_size != (self.WIDTH, self.HEIGHT):
+            x, y, w, h = self._render_window
+            bands = self._scaled_bands
+            if w % 2:
+                pixel_format = "rgb565"  # RGB444 packs pixel pairs
+            if self._borders_dirty:
+                self._clear_borders()
+        else:
+            if image.size != (self.WIDTH, self.HEIGHT):
+                image = image.resize((self.WIDTH, self.HEIGHT))
+            x, y, w, h = 0, 0, self.WIDTH, self.HEIGHT
+            bands = self._bands
+            self._borders_dirty = True
+        if self._idle is not None:
+            self._idle.activity()
+        with self._pending_lock:
+            direct = self._bus_lock.acquire(blocking=False)
+            if direct:
+                self._frame_key = None  # Until the frame has been sent
+                if self._latency is not None:
+                    self._latency.on_submit()
+        if not direct:
+            data = b"".join(bands(image, pixel_format))
+            self._write_window(x, y, w, h, data, pixel_format, key)
+            return
+
+        writer = self._band_writer
+        shadow = self._shadow
+        row_bytes = w * 3 // 2 if pixel_format == "rgb444" else w * 2
+        try:
+            self._count_write(x, y, w, h, row_bytes * h)
+            self._set_window(x, y, w, h, pixel_format)
+            try:
+                top = y
+                for data in bands(image, pixel_format):
+                    writer.send(data)
+                    if shadow is not None:
+                        rows = len(data) // row_bytes
+                        shadow.write(x, top, w, rows, data, pixel_format)
+                        top += rows
+            finally:
+                writer.finish()
+            self._count_done(x, y, w, h, row_bytes * h)
+            self._frame_sent(key)
+        finally:
+            self._release_bus()
+
+    def _bands(self, image: Image.Image, pixel_format: str):
+        """Yield a full-size image packed in bands of BAND_ROWS rows."""
+        from .pixels import to_rgb444, to_rgb565
+
+        for top in range(0, self.HEIGHT, self.BAND_ROWS):
+            band = image.crop((0, top, self.WIDTH, min(top + self.BAND_ROWS, self.HEIGHT)))
+            if pixel_format == "rgb444":
+                yield to_rgb444(band, self.dither)
+            else:
+                yield to_rgb565(band)
+
+    def _scaled_bands(self, image: Image.Image, pixel_format: str):
+        """
+        Yield a render_size image packed and upscaled, in bands.
+
+        RGB565 is packed at render size, then each band of packed pixels is
+        enlarged as a 2-byte-per-pixel "LA" image, so colour conversion runs
+        once per source pixel. RGB444 bands are enlarged before packing.
+        """
+        from PIL import Image
+
+        from .pixels import to_rgb444, to_rgb565
+
+        scale = self._render_scale
+        width, height = self._render_size
+        # Source rows per band: a multiple of 4, so dithering lines up across bands
+        rows = max(4, self.BAND_ROWS // scale // 4 * 4)
+        if pixel_format == "rgb565":
+            packed = memoryview(to_rgb565(image))
+            for top in range(0, height, rows):
+                n = min(rows, height - top)
+                band = Image.frombytes("LA", (width, n), packed[top * width * 2:(top + n) * width * 2])
+                yield band.resize((width * scale, n * scale), Image.NEAREST).tobytes()
+        else:
+            for top in range(0, height, rows):
+                n = min(rows, height - top)
+                band = image.crop((0, top, width, top + n)).resize((width * scale, n * scale), Image.NEAREST)
+                yield to_rgb444(band, self.dither)
+
+    def _clear_borders(self) -> None:
+        """Fill the screen outside the render_size window with black."""
+        x, y, w, h = self._render_window
+        self._borders_dirty = False
+        for rect in (
+            (0, 0, self.WIDTH, y),
+            (0, y + h, self.WIDTH, self.HEIGHT - y - h),
+            (0, y, x, h),
+            (x + w, y, self.WIDTH - x - w, h),
+        ):
+            if rect[2] > 0 and rect[3] > 0:
+                self._fill_rect(*rect, (0, 0, 0))
+
+    def _skip_frame(self) -> None:
+        """Count a frame that is already on the panel."""
+        self.stats.frames_skipped += 1
+        self._flight.record("frame_skip")
+        if self._latency is not None:
+            # The response is already on screen
+            self._latency.on_submit()
+            self._latency.on_flushed()
+
+    def _fingerprinting(self) -> bool:
+        """Whether identical full frames are detected (idle management needs it)."""
+        return self.skip_identical or self._idle is not None
+
+    def _send_frame(self, data, key) -> None:
+        """Send a full frame and remember its fingerprint."""
+        pixels = self.WIDTH * self.HEIGHT
+        if len(data) == pixels * 2:
+            pixel_format = "rgb565"
+        elif len(data) == pixels * 3 // 2:
+            pixel_format = "rgb444"
+        else:
+            raise ValueError(f"Frame must be {pixels * 2} or {pixels * 3 // 2} bytes (got {len(data)})")
+        self._borders_dirty = True
+        self._write_window(0, 0, self.WIDTH, self.HEIGHT, data, pixel_format, key)
+
+    def display_region(self, image: Image.Image, x: int = 0, y: int = 0) -> None:
+        """
+        Display a PIL Image in a rectangle of the screen, leaving the rest alone.
+
+        Uses RGB444 when that pixel format is selected and the region has an
+        even number of pixels, RGB565 otherwise.
+
+        Args:
+            image: A PIL Image; its size is the size of the updated region.
+            x: Left edge of the region in screen coordinates.
+            y: Top edge of the region in screen coordinates.
+
+        Raises:
+            ValueError: If the region does not fit on the screen.
+        """
+        from .pixels import to_rgb444, to_rgb565
+
+        if self._latency is not None:
+            self._latency.on_draw()
+        w, h = image.size
+        self._check_region(x, y, w, h)
+        if self._trace is not None:
+            self._trace.on_region(image, x, y)
+        if self._pixel_format == "rgb444" and (w * h) % 2 == 0:
+            self._write_window(x, y, w, h, to_rgb444(image, self.dither), "rgb444")
+        else:
+            self._write_window(x, y, w, h, to_rgb565(image))
+
+    def blit(self, data, x: int, y: int, w: int, h: int) -> None:
+        """
+        Send pre-encoded RGB565 pixels to a rectangle of the screen.
+
+        Args:
+            data: w * h * 2 bytes of big-endian RGB565 (any buffer object),
+                  e.g. from pixels.to_rgb565().
+            x: Left edge of the region in screen coordinates.
+            y: Top edge of the region in screen coordinates.
+            w: Region width in pixels.
+            h: Region height in pixels.
+
+        Raises:
+            ValueError: If the region does not fit on the screen or the data
+                        length does not match its size.
+        """
+        if self._latency is not None:
+            self._latency.on_draw()
+        self._check_region(x, y, w, h)
+        if len(data) != w * h * 2:
+            raise ValueError(f"Expected {w * h * 2} bytes for a {w}x{h} region (got {len(data)})")
+        if self._trace is not None:
+            self._trace.on_blit(data, x, y, w, h)
+        self._write_window(x, y, w, h, data)
+
+    def fill(self, color) -> None:
+        """
+        Fill the whole screen with a solid colour, without building an image.
+
+        Args:
+            color: An (r, g, b) tuple (0-255) or a PIL colour string.
+        """
+        self.fill_rect(0, 0, self.WIDTH, self.HEIGHT, color)
+
+    def fill_rect(self, x: int, y: int, w: int, h: int, color) -> None:
+        """
+        Fill a rectangle with a solid colour, without building an image.
+
+        A small buffer of the repeated RGB565 colour is streamed as many times
+        as needed, so no frame-sized allocation or conversion takes place.
+        The rectangle is clipped to the screen.
+
+        Args:
+            x: Left edge in screen coordinates.
+            y: Top edge in screen coordinates.
+            w: Width in pixels.
+            h: Height in pixels.
+            color: An (r, g, b) tuple (0-255) or a PIL colour string.
         """
-        self._device.display(image)
+        if self._latency is not None:
+            self._latency.on_draw()
+        if self._trace is not None:
+            self._trace.on_fill(x, y, w, h, color)
+        self._fill_rect(x, y, w, h, color, tracked=True)
+
+    def _fill_rect(self, x: int, y: int, w: int, h: int, color, tracked: bool = False) -> None:
+        """Fill a rectangle without tracing it; only tracked fills count as latency responses."""
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.WIDTH)
+        y1 = min(y + h, self.HEIGHT)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        if color != self._fill_color:
+            from .pixels import rgb565_color
+
+            pattern = rgb565_color(color)
+            self._fill_buffer = memoryview(pattern * (self.FILL_BUFFER_SIZE // 2))
+            self._fill_color = color
+
+        buffer = self._fill_buffer
+        remaining = (x1 - x0) * (y1 - y0) * 2
+        if self._idle is not None:
+            self._idle.activity()
+        self._acquire_bus()
+        try:
+            if tracked and self._latency is not None:
+                self._latency.on_submit()
+            self._count_write(x0, y0, x1 - x0, y1 - y0, remaining)
+            self._set_window(x0, y0, x1 - x0, y1 - y0)
+            while remaining > 0:
+                n = min(remaining, len(buffer))
+                self._write_pixels(buffer[:n])
+                remaining -= n
+            if self._shadow is not None:
+                self._shadow.fill(x0, y0, x1 - x0, y1 - y0, bytes(buffer[:2]))
+            self._count_done(x0, y0, x1 - x0, y1 - y0, (x1 - x0) * (y1 - y0) * 2)
+        finally:
+            self._frame_sent(None)  # Also if the fill failed partway
+            self._release_bus()
+
+    def flush(self) -> None:
+        """Wait until updates queued by other threads have reached the panel."""
+        self._acquire_bus()
+        self._release_bus()
+
+    def screenshot(self) -> Image.Image:
+        """
+        Return what the panel shows, from the shadow copy (no SPI traffic).
+
+        Updates queued by other threads are included once sent; call
+        flush() first to wait for them. After a warm start, the shadow
+        copy is black until something is drawn.
+
+        Returns:
+            A 320x240 RGB PIL Image.
+
+        Raises:
+            RuntimeError: If the display was created without shadow=True.
+        """
+        if self._shadow is None:
+            raise RuntimeError("screenshot() needs DisplayHATMini(shadow=True)")
+        return self._shadow.image()
+
+    @property
+    def pixel_format(self) -> str:
+        """Pixel format used for full frames: "rgb565" or "rgb444"."""
+        return self._pixel_format
+
+    @pixel_format.setter
+    def pixel_format(self, value: str) -> None:
+        if value not in self.PIXEL_FORMATS:
+            raise ValueError(f"pixel_format must be one of {self.PIXEL_FORMATS} (got {value!r})")
+        if value not in self._backend.pixel_formats:
+            raise ValueError(f"The {self._backend.name} backend does not support {value}")
+        self._pixel_format = value
+
+    @property
+    def render_size(self) -> tuple:
+        """(width, height) of images that display() upscales to the panel."""
+        return self._render_size
+
+    @render_size.setter
+    def render_size(self, value) -> None:
+        width, height = value or (self.WIDTH, self.HEIGHT)
+        if not (0 < width <= self.WIDTH and 0 < height <= self.HEIGHT):
+            raise ValueError(f"render_size must fit in {self.WIDTH}x{self.HEIGHT} (got {value!r})")
+        scale = min(self.WIDTH // width, self.HEIGHT // height)
+        w = width * scale
+        h = height * scale
+        self._render_size = (width, height)
+        self._render_scale = scale
+        self._render_window = ((self.WIDTH - w) // 2, (self.HEIGHT - h) // 2, w, h)
+        self._borders_dirty = True
+        with self._pending_lock:
+            # The same image is laid out differently now
+            self._frame_key = None
+
+    @property
+    def backend(self) -> str:
+        """Name of the output backend in use: "spidev" or "fbdev"."""
+        return self._backend.name
+
+    @property
+    def idle(self):
+        """The IdleManager from enable_idle(), or None."""
+        return self._idle
+
+    def enable_idle(
+        self,
+        dim_after: float = 30.0,
+        blank_after: float = 120.0,
+        dim_level: float = 0.1,
+        sleep_panel: bool = True,
+    ):
+        """
+        Dim and then blank the display after a period without activity.
+
+        Activity is any button edge or changed pixels sent to the screen.
+        Identical full frames are skipped and do not count. While blanked,
+        the backlight is off, the LED PWM threads are stopped and the panel
+        sleeps; any activity restores everything, including backlight and
+        LED values set in the meantime.
+
+        Args:
+            dim_after: Seconds without activity before dimming (None = never).
+            blank_after: Seconds without activity before blanking (None = never).
+            dim_level: Backlight level while dimmed (0.0-1.0).
+            sleep_panel: If True, put the panel into sleep mode when blanked.
+
+        Returns:
+            The IdleManager, for its state and per-state CPU statistics.
+        """
+        from .power import IdleManager
+
+        self.disable_idle()
+        self._enable_button_events()
+        self._idle = IdleManager(self, dim_after, blank_after, dim_level, sleep_panel)
+        return self._idle
+
+    def disable_idle(self) -> None:
+        """Stop idle management, restoring the display if it is dimmed or blanked."""
+        if self._idle is not None:
+            self._idle.close()
+            self._idle = None
+
+    @property
+    def governor(self):
+        """The Governor from enable_governor(), or None."""
+        return self._governor
+
+    def enable_governor(self, **options):
+        """
+        Adapt the frame rate and transfer pacing to CPU load and SoC temperature.
+
+        A GameLoop on this display presents at most governor.fps frames per
+        second, and the writer thread pauses governor.band_delay seconds
+        after each band. Both are lowered as the Pi gets hotter or busier.
+
+        Args:
+            **options: Governor arguments (min_fps, max_fps, temp_range,
+                       load_range, max_band_delay, hysteresis, interval, ...).
+
+        Returns:
+            The Governor, for its current values and adjustment history.
+        """
+        from .governor import Governor
+
+        self.disable_governor()
+        self._governor = Governor(self, **options)
+        self._governor.update()
+        self._governor.start()
+        return self._governor
+
+    def disable_governor(self) -> None:
+        """Stop the governor and remove its limits."""
+        if self._governor is not None:
+            self._governor.close()
+            self._governor = None
+
+    @property
+    def flight_recorder(self):
+        """The FlightRecorder holding this display's recent events."""
+        return self._flight
+
+    @property
+    def watchdog(self):
+        """The Watchdog from enable_watchdog(), or None."""
+        return self._watchdog
+
+    def enable_watchdog(self, deadline: float = 5.0, on_stall=None, dump_path: str = None):
+        """
+        Report stalls: no frame reaching the panel within deadline seconds.
+
+        A stall is logged as a warning that says whether a transfer or a
+        button callback is stuck, or whether nothing is being drawn. The
+        full report adds the flight recorder's events and every thread's
+        stack. Applications that stop drawing on purpose (a static screen
+        with skip_identical off, say) need a deadline longer than their
+        longest pause.
+
+        Args:
+            deadline: Seconds without a completed frame or region.
+            on_stall: Called as on_stall(report) with the full report text.
+            dump_path: File to append full reports to.
+
+        Returns:
+            The Watchdog, for its stall count and last report.
+        """
+        from .flight import Watchdog
+
+        self.disable_watchdog()
+        self._watchdog = Watchdog(self, deadline, on_stall, dump_path)
+        return self._watchdog
+
+    def disable_watchdog(self) -> None:
+        """Stop the watchdog."""
+        if self._watchdog is not None:
+            self._watchdog.close()
+            self._watchdog = None
+
+    @property
+    def shadow(self):
+        """The ShadowFramebuffer holding a copy of the panel contents, or None."""
+        return self._shadow
+
+    @property
+    def remote_view(self):
+        """The RemoteViewServer from enable_remote_view(), or None."""
+        return self._remote_view
+
+    def enable_remote_view(self, address=None, max_fps: float = 10, max_clients: int = 4):
+        """
+        Stream the screen to viewers on a local socket.
+
+        Viewers get the whole screen when they connect, then only the
+        changed rectangles, at most max_fps updates per second each. They
+        are served from the shadow copy in their own threads, so they do
+        not hold up drawing.
+
+        Args:
+            address: (host, port) or UNIX socket path to listen on
+                     (default: 127.0.0.1 port 8320).
+            max_fps: Most updates per second sent to each viewer.
+            max_clients: Most viewers connected at once.
+
+        Returns:
+            The RemoteViewServer, for its address and counters.
+
+        Raises:
+            RuntimeError: If the display was created without shadow=True.
+        """
+        from .remote import DEFAULT_ADDRESS, RemoteViewServer
+
+        if self._shadow is None:
+            raise RuntimeError("enable_remote_view() needs DisplayHATMini(shadow=True)")
+        self.disable_remote_view()
+        self._remote_view = RemoteViewServer(self._shadow, address or DEFAULT_ADDRESS, max_fps, max_clients)
+        return self._remote_view
+
+    def disable_remote_view(self) -> None:
+        """Stop the remote view server and disconnect its viewers."""
+        if self._remote_view is not None:
+            self._remote_view.close()
+            self._remote_view = None
+
+    @property
+    def warm_started(self) -> bool:
+        """True if the panel setup was skipped because it was already applied."""
+        return self._backend.warm
+
+    def calibrate_spi(self, candidates=None, rounds: int = 2) -> dict:
+        """
+        Measure SPI throughput at several write sizes and use the fastest.
+
+        The sizes are capped by spidev's bufsiz. If the fastest is bufsiz
+        itself, a warning suggests raising it. The panel memory is filled
+        with black, so call this before the first frame or expect to
+        redraw (or pass calibrate_spi=True to the constructor).
+
+        Args:
+            candidates: Write sizes in bytes to try (default: 1 KiB to
+                        64 KiB in powers of two, plus bufsiz).
+            rounds: Full frames written per size.
+
+        Returns:
+            {write size: bytes per second}; empty with the fbdev backend.
+        """
+        backend = self._backend
+        if not hasattr(backend, "calibrate"):
+            return {}
+        self._acquire_bus()
+        try:
+            results = backend.calibrate(self.WIDTH, self.HEIGHT, candidates, rounds)
+            if self._shadow is not None:
+                self._shadow.clear()  # Calibration leaves a black frame
+        finally:
+            self._frame_sent(None)
+            self._release_bus()
+        self.stats.spi_chunk_bytes = backend.chunk_bytes
+        self.stats.spi_throughput = results[backend.chunk_bytes]
+        from .backends import CHUNK_CANDIDATES
+
+        largest = CHUNK_CANDIDATES[-1]
+        if backend.chunk_bytes == backend.bufsiz < largest:
+            import logging
+
+            logging.getLogger(__name__).warning(
+                "SPI writes are limited by spidev.bufsiz=%d, the fastest size measured; "
+                "add spidev.bufsiz=%d to /boot/firmware/cmdline.txt for larger transfers",
+                backend.bufsiz,
+                largest,
+            )
+        return results
+
+    def _check_region(self, x: int, y: int, w: int, h: int) -> None:
+        """Raise ValueError unless the rectangle lies fully on the screen."""
+        if w <= 0 or h <= 0 or x < 0 or y < 0 or x + w > self.WIDTH or y + h > self.HEIGHT:
+            raise ValueError(f"Region {w}x{h} at ({x}, {y}) is outside the display")
+
+    def _set_window(self, x: int, y: int, w: int, h: int, pixel_format: str = "rgb565") -> None:
+        """Start writing pixels of the given format into a screen rectangle."""
+        self._backend.set_window(x, y, w, h, pixel_format)
+
+    def _write_pixels(self, data) -> None:
+        """Stream pixel bytes after _set_window()."""
+        self._backend.write(data)
+
+    def _write_window(
+        self, x: int, y: int, w: int, h: int, data, pixel_format: str = "rgb565", key=None
+    ) -> None:
+        """
+        Write a full rectangle of pixels, from any thread.
+
+        If another thread is using the bus, the update is queued for it to
+        send (and the call returns at once) instead of waiting for its
+        transfer to finish. Queued data that the caller could still modify
+        is copied first.
+
+        Args:
+            key: Fingerprint of the panel contents after this update, if it
+                 is a full frame (see display()).
+        """
+        from .bus import Update
+
+        if self._idle is not None:
+            self._idle.activity()
+        update = Update(x, y, w, h, data, pixel_format)
+        with self._pending_lock:
+            if self._latency is not None:
+                self._latency.on_submit()
+            direct = self._bus_lock.acquire(blocking=False)
+            # Queue order is panel order, so a queued update sets the
+            # fingerprint here; a direct one only once it has been sent
+            self._frame_key = None if direct else key
+            if not direct:
+                if len(self._pending) < self.MAX_PENDING_UPDATES:
+                    if not isinstance(data, bytes):
+                        update = update._replace(data=bytes(data))
+                    self._pending.append(update)
+                    self.stats.updates_deferred += 1
+                    return
+                # Queue full: wait below until the bus holder has sent it
+                self._pending.append(update)
+        if direct:
+            # The bus was free, so nothing was queued before this update
+            try:
+                self._send_update(update)
+                self._frame_sent(key)
+            finally:
+                self._release_bus()
+        else:
+            self._acquire_bus()
+            self._release_bus()
+
+    def _acquire_bus(self) -> None:
+        """Take the bus lock, recording contention, and send anything queued before."""
+        if not self._bus_lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self._bus_lock.acquire()
+            waited = time.perf_counter() - start
+            self.stats.bus_waits += 1
+            self.stats.bus_wait_time += waited
+            self._flight.record("bus_wait", round(waited * 1e6))
+        self._drain_pending()
+
+    def _release_bus(self) -> None:
+        """Send queued updates, then release the bus lock once nothing is left."""
+        while True:
+            with self._pending_lock:
+                # Checked and released under the queue lock, so nothing queued
+                # by another thread can be left behind
+                if not self._pending:
+                    if self._latency is not None:
+                        self._latency.on_flushed()
+                    self._bus_lock.release()
+                    return
+            self._drain_pending()
+
+    def _drain_pending(self) -> None:
+        """Send the queued updates, combined into as few transfers as possible (hold the bus)."""
+        with self._pending_lock:
+            updates, self._pending = self._pending, []
+        if not updates:
+            return
+        from .bus import coalesce
+
+        transfers, merged = coalesce(updates)
+        self.stats.updates_merged += merged
+        try:
+            for update in transfers:
+                self._send_update(update)
+        except BaseException:
+            with self._pending_lock:
+                self._frame_key = None  # The panel may not show what was queued
+            raise
+
+    def _frame_sent(self, key) -> None:
+        """Record the fingerprint of the panel contents after a transfer (hold the bus; None = unknown)."""
+        with self._pending_lock:
+            if not self._pending:  # Updates queued meanwhile set their own fingerprint
+                self._frame_key = key
+
+    def _send_update(self, update) -> None:
+        """Send one update (hold the bus)."""
+        self._count_write(update.x, update.y, update.w, update.h, len(update.data))
+        self._set_window(update.x, update.y, update.w, update.h, update.pixel_format)
+        self._write_pixels(update.data)
+        if self._shadow is not None:
+            self._shadow.write(update.x, update.y, update.w, update.h, update.data, update.pixel_format)
+        self._count_done(update.x, update.y, update.w, update.h, len(update.data))
+
+    def _is_frame(self, x: int, y: int, w: int, h: int) -> bool:
+        """Whether a transfer is a full frame: the whole panel, or the window render_size frames fill."""
+        return (w, h) == (self.WIDTH, self.HEIGHT) or (x, y, w, h) == self._render_window
+
+    def _count_write(self, x: int, y: int, w: int, h: int, size: int) -> None:
+        """Update stats for a transfer that starts now (hold the bus)."""
+        stats = self.stats
+        if self._is_frame(x, y, w, h):
+            stats.frames += 1
+            self._flight.record("frame_start", size)
+        else:
+            stats.regions += 1
+            self._flight.record("region_start", size, (w, h))
+        stats.bytes_sent += size
+
+    def _count_done(self, x: int, y: int, w: int, h: int, size: int) -> None:
+        """Record the end of a transfer started with _count_write() (hold the bus)."""
+        self._transfers_done += 1
+        if self._is_frame(x, y, w, h):
+            self._flight.record("frame_end", size)
+        else:
+            self._flight.record("region_end", size, (w, h))
+
+    def _power_down(self, sleep_panel: bool) -> None:
+        """Idle blank: backlight off, LED PWM threads stopped, panel asleep."""
+        gpio = self._gpio
+        self._io_ready.wait()
+        self._flight.record("power_down")
+        self._powered_down = True
+        for pin, pwm in self._led_pwm.items():
+            pwm.stop()
+            gpio.output(pin, True)  # LED off
+        if self._backlight_pwm:
+            self._backlight_pwm.stop()
+            gpio.output(self.BACKLIGHT, False)
+        else:
+            self._apply_backlight(0)
+        if sleep_panel:
+            self._acquire_bus()
+            try:
+                self._backend.sleep()
+            finally:
+                self._release_bus()
+
+    def _power_up(self) -> None:
+        """Undo _power_down(), restoring the current backlight and LED values."""
+        self._flight.record("power_up")
+        self._acquire_bus()
+        try:
+            self._backend.wake()
+        finally:
+            self._release_bus()
+        if self._backlight_pwm:
+            self._backlight_pwm.start(self._backlight_level * 100)
+        else:
+            self._apply_backlight(self._backlight_level)
+        for pin, value in zip((self.LED_R, self.LED_G, self.LED_B), self._led_values):
+            self._led_pwm[pin].start((1.0 - value) * 100)
+        self._powered_down = False
 
     def on_button_pressed(self, callback) -> None:
         """
@@ -303,26 +1410,28 @@ class DisplayHATMini:
                      Use read_button(pin) inside to check state.
         """
         self._button_callback = callback
+        self._enable_button_events()
 
-        for pin in (self.BUTTON_A, self.BUTTON_B, self.BUTTON_X, self.BUTTON_Y):
-            # Remove any existing event detection
-            try:
-                GPIO.remove_event_detect(pin)
-            except RuntimeError:
-                pass
-
-            # Add edge detection for both press and release
-            GPIO.add_event_detect(
-                pin,
-                GPIO.BOTH,
-                callback=self._handle_button,
-                bouncetime=10
-            )
+    def _enable_button_events(self) -> None:
+        """Route edges on all four buttons to _handle_button()."""
+        self._io_ready.wait()
+        # Edge detection for both press and release
+        self._gpio.watch(self.BUTTONS, self._handle_button, bouncetime=10)
 
-    def _handle_button(self, pin: int) -> None:
-        """Internal button event handler."""
+    def _handle_button(self, pin: int, timestamp: int = None) -> None:
+        """Internal button event handler (timestamp: the edge's monotonic ns, if known)."""
+        latency = self._latency
+        record = latency.on_edge(pin, timestamp) if latency is not None else None
+        self._flight.record("button", pin)
+        if self._idle is not None:
+            self._idle.activity()
         if self._button_callback:
+            if record is not None:
+                latency.on_callback(record)
             self._button_callback(pin)
+        self._flight.record("callback_end", pin)
+        if record is not None:
+            latency.on_handled(record)
 
     def read_button(self, pin: int) -> bool:
         """
@@ -334,8 +1443,20 @@ class DisplayHATMini:
         Returns:
             True if the button is currently pressed, False otherwise.
         """
+        self._io_ready.wait()
         # Buttons are active low (pressed = LOW)
-        return not GPIO.input(pin)
+        return not self._gpio.input(pin)
+
+    def read_buttons(self) -> frozenset:
+        """
+        Read all four buttons at once.
+
+        Returns:
+            The GPIO pin numbers of the buttons currently pressed.
+        """
+        self._io_ready.wait()
+        gpio = self._gpio
+        return frozenset(pin for pin in self.BUTTONS if not gpio.input(pin))
 
     @property
     def using_hardware_pwm(self) -> bool:
@@ -343,25 +1464,44 @@ class DisplayHATMini:
         return self._using_kernel_pwm
 
     def _cleanup(self) -> None:
-        """Clean up GPIO resources."""
+        """Clean up GPIO resources (once; atexit and __del__ both call this)."""
+        if self._closed:
+            return
+        self._closed = True
+        gpio = self._gpio
+        self._io_ready.wait(1.0)
+        self.disable_idle()
+        self.disable_governor()
+        self.disable_watchdog()
+        self.disable_remote_view()
+        if self._trace is not None:
+            self._trace.close()
+
         # Stop software PWM
         for pwm in self._led_pwm.values():
             pwm.stop()
         if self._backlight_pwm:
             self._backlight_pwm.stop()
 
-        # Stop kernel PWM
-        if self._kernel_pwm:
+        # Stop kernel PWM (left running for a warm restart)
+        if self._kernel_pwm and not self._warm_start:
             self._kernel_pwm.cleanup()
 
+        self._band_writer.close()
+        self._backend.close()
+
         # Turn off LED and backlight
         for pin in (self.LED_R, self.LED_G, self.LED_B):
-            GPIO.output(pin, GPIO.HIGH)  # LED off
-        if not self._using_kernel_pwm:
-            # When using kernel PWM, GPIO 13 is in ALT0 (PWM) mode — calling
-            # GPIO.setup() here would override that and break the next startup.
-            GPIO.setup(self.BACKLIGHT, GPIO.OUT)
-            GPIO.output(self.BACKLIGHT, GPIO.LOW)  # Backlight off
+            gpio.output(pin, True)  # LED off
+        if self._warm_start:
+            # Keep the last image visible until the service comes back
+            if not self._using_kernel_pwm:
+                gpio.output(self.BACKLIGHT, True)
+        elif not self._using_kernel_pwm:
+            # When using kernel PWM, GPIO 13 is in ALT0 (PWM) mode — setting
+            # it up as an output here would override that and break the next startup.
+            gpio.setup_output(self.BACKLIGHT, False)  # Backlight off
+        gpio.close()
 
     def __del__(self):
         """Destructor - clean up resources."""
@@ -0,0 +1,249 @@
+"""
+Pre-encoded RGB565 animation files.
+
+An animation is encoded offline into a simple indexed container. Each
+frame stores only the rectangle that changed since the previous frame,
+already packed as panel-ready big-endian RGB565. Playback memory-maps the
+file and hands slices of the map straight to spidev: no decoding, no
+conversion and no copies.
+
+File layout (all integers little-endian):
+
+    header  "<4sHHHHII"  magic b"DHMA", version, flags, width, height,
+                         frame count, index offset
+    data    RGB565 pixels for each frame's dirty rectangle, back to back
+    index   "<IHHHHI" per frame: data offset, x, y, w, h, duration (ms)
+
+The first frame is always a full frame. Frames identical to the one
+before are folded into its duration.
+
+Command line:
+
+    python -m displayhatmini_lite.animfile encode boot.gif boot.dhma
+    python -m displayhatmini_lite.animfile info boot.dhma
+    python -m displayhatmini_lite.animfile play boot.dhma --loop
+"""
+
+import argparse
+import mmap
+import struct
+import time
+from collections import namedtuple
+
+from PIL import ImageChops
+
+from .pixels import to_rgb565
+from .player import iter_frames
+
+MAGIC = b"DHMA"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHHHII")
+_ENTRY = struct.Struct("<IHHHHI")
+
+Frame = namedtuple("Frame", "offset x y w h duration_ms")
+
+
+def encode_animation(source, path: str, size=(320, 240), fps: float = None) -> int:
+    """
+    Encode an animation into a pre-encoded RGB565 file.
+
+    Args:
+        source: A path or PIL Image (animated GIF/PNG/WebP), or an iterable
+                of PIL Images and/or paths.
+        path: Output file.
+        size: Frame size in pixels; frames are resized to fit.
+        fps: Fixed frame rate. If None, per-frame durations are kept.
+
+    Returns:
+        The number of frames written.
+    """
+    width, height = size
+    index = []
+    previous = None
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, width, height, 0, 0))
+        for image, duration in iter_frames(source, fps):
+            if image.size != size:
+                image = image.resize(size)
+            duration_ms = max(1, int(round(duration * 1000)))
+
+            bbox = (0, 0, width, height) if previous is None else ImageChops.difference(previous, image).getbbox()
+            previous = image
+            if bbox is None:
+                # Unchanged frame - just hold the previous one for longer
+                last = index[-1]
+                index[-1] = last._replace(duration_ms=last.duration_ms + duration_ms)
+                continue
+
+            x0, y0, x1, y1 = bbox
+            index.append(Frame(f.tell(), x0, y0, x1 - x0, y1 - y0, duration_ms))
+            f.write(to_rgb565(image.crop(bbox)))
+
+        index_offset = f.tell()
+        for frame in index:
+            f.write(_ENTRY.pack(*frame))
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, width, height, len(index), index_offset))
+
+    return len(index)
+
+
+class AnimationFile:
+    """
+    A memory-mapped pre-encoded animation.
+
+    Example:
+        with AnimationFile("boot.dhma") as anim:
+            anim.play(display, loop=True)
+    """
+
+    def __init__(self, path: str):
+        """
+        Open and map an animation file.
+
+        Raises:
+            ValueError: If the file is not a valid animation file.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+        self._view = memoryview(self._map)
+
+        try:
+            magic, version, _flags, self.width, self.height, count, index_offset = _HEADER.unpack_from(self._map)
+        except struct.error:
+            self.close()
+            raise ValueError(f"{path} is too short to be an animation file")
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} animation file")
+
+        if index_offset + count * _ENTRY.size > len(self._map):
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        self.frames = [
+            Frame(*_ENTRY.unpack_from(self._map, index_offset + i * _ENTRY.size))
+            for i in range(count)
+        ]
+        if any(frame.offset + frame.w * frame.h * 2 > index_offset for frame in self.frames):
+            self.close()
+            raise ValueError(f"{path} has frames outside its pixel data")
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def duration(self) -> float:
+        """Total playback time of one pass in seconds."""
+        return sum(frame.duration_ms for frame in self.frames) / 1000.0
+
+    def frame_data(self, index: int) -> memoryview:
+        """Return the RGB565 pixels of a frame's dirty rectangle (no copy)."""
+        frame = self.frames[index]
+        return self._view[frame.offset:frame.offset + frame.w * frame.h * 2]
+
+    def play(self, display, loop: bool = False, duration: float = None) -> int:
+        """
+        Play the animation on a DisplayHATMini, blocking until it ends.
+
+        Frames depend on the ones before them, so late frames are never
+        dropped; playback instead skips the wait until it has caught up.
+
+        Args:
+            display: The DisplayHATMini to play on.
+            loop: If True, repeat until duration passes (or forever).
+            duration: Maximum playback time in seconds (None = no limit).
+
+        Returns:
+            The number of frames presented.
+        """
+        if (self.width, self.height) != (display.WIDTH, display.HEIGHT):
+            raise ValueError(
+                f"Animation is {self.width}x{self.height}, display is {display.WIDTH}x{display.HEIGHT}"
+            )
+        presented = 0
+        start = time.monotonic()
+        deadline = 0.0
+        while True:
+            for i, frame in enumerate(self.frames):
+                if duration is not None and deadline >= duration:
+                    return presented
+                delay = deadline - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+                display.blit(self.frame_data(i), frame.x, frame.y, frame.w, frame.h)
+                presented += 1
+                deadline += frame.duration_ms / 1000.0
+            if not loop or not self.frames:
+                return presented
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+
+def main(argv=None) -> None:
+    """Command line entry point: encode, inspect or play animation files."""
+    parser = argparse.ArgumentParser(
+        prog="python -m displayhatmini_lite.animfile",
+        description="Pre-encoded RGB565 animations for Display HAT Mini",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    encode = commands.add_parser("encode", help="Encode images into an animation file")
+    encode.add_argument("inputs", nargs="+", help="An animated image, or several still images in order")
+    encode.add_argument("output", help="Animation file to write")
+    encode.add_argument("--fps", type=float, help="Fixed frame rate (default: keep image durations)")
+    encode.add_argument("--size", default="320x240", help="Frame size, WxH (default: 320x240)")
+
+    info = commands.add_parser("info", help="Show frames and dirty rectangles")
+    info.add_argument("path")
+
+    play = commands.add_parser("play", help="Play an animation file on the display")
+    play.add_argument("path")
+    play.add_argument("--loop", action="store_true", help="Loop until Ctrl+C")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "encode":
+        size = tuple(int(v) for v in args.size.lower().split("x"))
+        source = args.inputs[0] if len(args.inputs) == 1 else args.inputs
+        count = encode_animation(source, args.output, size=size, fps=args.fps)
+        print(f"Wrote {count} frames to {args.output}")
+
+    elif args.command == "info":
+        with AnimationFile(args.path) as anim:
+            data = sum(frame.w * frame.h * 2 for frame in anim.frames)
+            print(f"{anim.width}x{anim.height}, {len(anim)} frames, {anim.duration:.2f} s, {data} bytes of pixels")
+            for i, frame in enumerate(anim.frames):
+                print(f"{i:5d}  {frame.w:3d}x{frame.h:<3d} at ({frame.x}, {frame.y})  {frame.duration_ms} ms")
+
+    elif args.command == "play":
+        from . import DisplayHATMini
+
+        display = DisplayHATMini()
+        display.set_backlight(1.0)
+        with AnimationFile(args.path) as anim:
+            try:
+                anim.play(display, loop=args.loop)
+            except KeyboardInterrupt:
+                pass
+        display.set_backlight(0)
+
+
+if __name__ == "__main__":
+    main()
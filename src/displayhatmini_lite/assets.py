@@ -0,0 +1,203 @@
+"""
+Persistent on-disk cache of panel-ready images.
+
+load_asset() decodes an image file, rotates and resizes it, packs it as
+big-endian RGB565 and stores the result in a cache directory. Later loads,
+including those from later processes and after reboots, memory-map the
+cached pixels instead. A warm startup therefore neither decodes images nor
+imports Pillow.
+
+The panel has no alpha channel, so transparent pixels are composited onto
+a background colour (black by default) before packing.
+
+Entries are named after a hash of the source file's contents plus the
+settings applied to it. Editing an image, or asking for another size,
+rotation or background, misses the cache and builds a new entry. Entries
+left behind are never read again; clear_asset_cache() removes them.
+
+Entry layout (all integers little-endian):
+
+    header  "<4sHHH"  magic b"DHAC", version, width, height
+    data    width * height * 2 bytes of RGB565
+"""
+
+import glob
+import hashlib
+import mmap
+import os
+import struct
+
+MAGIC = b"DHAC"
+VERSION = 2  # 2: transparent pixels composited onto the background
+SUFFIX = ".rgb565"
+
+_HEADER = struct.Struct("<4sHHH")
+
+
+def default_cache_dir() -> str:
+    """Return the cache directory used when none is given ($XDG_CACHE_HOME or ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "displayhatmini-lite")
+
+
+class Asset:
+    """
+    Panel-ready RGB565 pixels of an image.
+
+    Example:
+        icon = load_asset("icons/wifi.png", size=(32, 32))
+        icon.draw(display, 280, 8)
+    """
+
+    def __init__(self, width: int, height: int, data, cached: bool = False, mapping=None):
+        """
+        Args:
+            width: Width in pixels.
+            height: Height in pixels.
+            data: width * height * 2 bytes of big-endian RGB565 (any buffer).
+            cached: True if the pixels came from the cache.
+            mapping: The mmap holding data, closed by close().
+        """
+        self.width = width
+        self.height = height
+        self.data = data
+        self.cached = cached
+        self._map = mapping
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def draw(self, display, x: int = 0, y: int = 0) -> None:
+        """Send the asset to the screen with its top left corner at (x, y)."""
+        display.blit(self.data, x, y, self.width, self.height)
+
+    def close(self) -> None:
+        """Unmap a cached asset's pixels (it cannot be drawn afterwards)."""
+        if self._map is not None:
+            self.data.release()
+            self._map.close()
+            self._map = None
+
+
+def load_asset(path: str, size=None, rotation: int = 0, cache_dir: str = None, background=(0, 0, 0)) -> Asset:
+    """
+    Load an image file as panel-ready RGB565, through the on-disk cache.
+
+    Args:
+        path: Image file (any format Pillow can open).
+        size: (width, height) to resize to after rotating, or None to keep
+              the image's own size.
+        rotation: Counter-clockwise rotation in degrees, a multiple of 90.
+        cache_dir: Cache directory (default: default_cache_dir()). If it
+                   cannot be written, assets are still loaded, just not
+                   cached.
+        background: Colour (an (r, g, b) tuple or a Pillow colour name)
+                    that transparent pixels are composited onto.
+
+    Returns:
+        An Asset, memory-mapped from the cache when the entry already existed.
+
+    Raises:
+        ValueError: If rotation is not a multiple of 90.
+    """
+    if rotation % 90:
+        raise ValueError(f"rotation must be a multiple of 90 (got {rotation})")
+    rotation %= 360
+    with open(path, "rb") as f:
+        source = f.read()
+
+    digest = hashlib.blake2b(source, digest_size=16).hexdigest()
+    settings = "native" if size is None else f"{size[0]}x{size[1]}"
+    if isinstance(background, str):
+        # Colour names share entries with their tuples (only names need Pillow)
+        from PIL import ImageColor
+
+        background = ImageColor.getrgb(background)
+    background = tuple(background)
+    backdrop = hashlib.blake2b(repr(background).encode(), digest_size=4).hexdigest()
+    entry = os.path.join(
+        cache_dir or default_cache_dir(), f"{digest}-{settings}-r{rotation}-bg{backdrop}{SUFFIX}"
+    )
+
+    asset = _open_entry(entry)
+    if asset is None:
+        width, height, data = _encode(source, size, rotation, background)
+        _write_entry(entry, width, height, data)
+        asset = Asset(width, height, data)
+    return asset
+
+
+def clear_asset_cache(cache_dir: str = None) -> int:
+    """
+    Delete all cached assets.
+
+    Returns:
+        The number of entries removed.
+    """
+    removed = 0
+    for entry in glob.glob(os.path.join(cache_dir or default_cache_dir(), f"*{SUFFIX}")):
+        try:
+            os.unlink(entry)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _open_entry(entry: str):
+    """Map a cache entry, or return None if it is missing or damaged."""
+    try:
+        with open(entry, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        magic, version, width, height = _HEADER.unpack_from(mapping)
+    except struct.error:
+        magic = None
+    if magic != MAGIC or version != VERSION or len(mapping) != _HEADER.size + width * height * 2:
+        mapping.close()
+        return None
+    return Asset(width, height, memoryview(mapping)[_HEADER.size:], cached=True, mapping=mapping)
+
+
+def _encode(source: bytes, size, rotation: int, background=(0, 0, 0)):
+    """Decode, flatten, rotate, resize and pack an image; returns (width, height, data)."""
+    import io
+
+    from PIL import Image
+
+    from .pixels import to_rgb565
+
+    with Image.open(io.BytesIO(source)) as image:
+        if image.mode in ("RGBA", "LA", "PA", "La", "RGBa") or "transparency" in image.info:
+            flat = Image.new("RGBA", image.size, background)
+            flat.alpha_composite(image.convert("RGBA"))
+            image = flat.convert("RGB")
+        if rotation:
+            image = image.rotate(rotation, expand=True)
+        if size is not None and image.size != tuple(size):
+            if image.mode not in ("RGB", "L"):
+                # P and 1 images would be resized with nearest-neighbour only
+                image = image.convert("RGB")
+            image = image.resize(tuple(size))
+        return image.width, image.height, to_rgb565(image)
+
+
+def _write_entry(entry: str, width: int, height: int, data: bytes) -> None:
+    """Atomically store a cache entry (best effort)."""
+    tmp = f"{entry}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, width, height))
+            f.write(data)
+        os.replace(tmp, entry)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
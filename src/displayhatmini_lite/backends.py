@@ -0,0 +1,482 @@
+"""
+Output backends: how pixels get from DisplayHATMini to the panel.
+
+SpidevBackend drives the ST7789 from this process over spidev. When a
+kernel panel driver (fbtft or a DRM mipi-dbi driver with fbdev emulation)
+owns the display, FramebufferBackend writes into its memory-mapped
+framebuffer instead. The kernel then refreshes the panel with DMA, which
+takes the SPI pushing cost out of Python entirely.
+
+Both backends take big-endian RGB565 (or RGB444 where supported) through
+the same set_window()/write() calls, so everything above them is shared.
+"""
+
+import glob
+import mmap
+import os
+import time
+import zlib
+from array import array
+
+from .bus import UNSHARED
+
+# Substrings of /sys/class/graphics/fbN/name that identify a kernel ST7789 driver
+PANEL_FB_NAMES = ("st7789", "mipi-dbi", "mipi_dbi", "panel-mipi")
+
+# ST7789 commands
+_SLPIN = 0x10   # Sleep in
+_SLPOUT = 0x11  # Sleep out
+_INVON = 0x21   # Display inversion on
+_DISPON = 0x29  # Display on
+_CASET = 0x2A   # Column address set
+_RASET = 0x2B   # Row address set
+_RAMWR = 0x2C   # Memory write
+_MADCTL = 0x36  # Memory data access control
+_COLMOD = 0x3A  # Interface pixel format
+
+# Panel setup, as used by luma.lcd's st7789 driver
+_PANEL_SETUP = (
+    (0xB2, (0x0C, 0x0C, 0x00, 0x33, 0x33)),  # PORCTRL: porch setting
+    (0xB7, (0x35,)),                          # GCTRL: VGH = 13.26V, VGL = -10.43V
+    (0xBB, (0x19,)),                          # VCOMS: 0.725V
+    (0xC0, (0x2C,)),                          # LCMCTRL
+    (0xC2, (0x01,)),                          # VDVVRHEN: VDV/VRH from registers
+    (0xC3, (0x12,)),                          # VRHS: 4.45V
+    (0xC4, (0x20,)),                          # VDVS: 0V
+    (0xC6, (0x0F,)),                          # FRCTRL2: 60 Hz
+    (0xD0, (0xA4, 0xA1)),                     # PWCTRL1: AVDD 6.8V, AVCL -4.8V, VDDS 2.3V
+    (0xE0, (0xD0, 0x04, 0x0D, 0x11, 0x13, 0x2B, 0x3F, 0x54, 0x4C, 0x18, 0x0D, 0x0B, 0x1F, 0x23)),  # Gamma +
+    (0xE1, (0xD0, 0x04, 0x0C, 0x11, 0x13, 0x2C, 0x3F, 0x44, 0x51, 0x2F, 0x1F, 0x1F, 0x20, 0x23)),  # Gamma -
+    (_INVON, ()),
+)
+
+# The panel needs 5 ms after sleep-out before it accepts pixel data
+_SLPOUT_DELAY = 0.005
+
+# Minimum time between sleep-in and sleep-out commands
+_SLEEP_SETTLE = 0.120
+
+# Largest single spidev transfer, set with spidev.bufsiz= on the kernel command line
+SPIDEV_BUFSIZ = "/sys/module/spidev/parameters/bufsiz"
+_DEFAULT_BUFSIZ = 4096
+
+# Write sizes tried by SpidevBackend.calibrate()
+CHUNK_CANDIDATES = (1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+# fbdev blanking ioctl and modes (linux/fb.h)
+_FBIOBLANK = 0x4611
+_FB_BLANK_UNBLANK = 0
+_FB_BLANK_POWERDOWN = 4
+
+# Identifies the current boot, so warm-start state never survives a reboot
+_BOOT_ID = "/proc/sys/kernel/random/boot_id"
+
+
+def read_fb_geometry(device: str):
+    """
+    Read (width, height, bits per pixel, stride) of a framebuffer from sysfs.
+
+    Args:
+        device: Framebuffer device path, e.g. "/dev/fb0".
+
+    Raises:
+        OSError: If sysfs has no information for the device.
+    """
+    sysfs = f"/sys/class/graphics/{os.path.basename(device)}"
+
+    def read(name):
+        with open(f"{sysfs}/{name}") as f:
+            return f.read().strip()
+
+    width, height = (int(v) for v in read("virtual_size").split(","))
+    bpp = int(read("bits_per_pixel"))
+    try:
+        stride = int(read("stride"))
+    except OSError:
+        stride = width * bpp // 8
+    return width, height, bpp, stride
+
+
+def find_panel_framebuffer():
+    """
+    Return the /dev/fbN device of a kernel ST7789 panel driver, or None.
+    """
+    for path in sorted(glob.glob("/sys/class/graphics/fb*")):
+        try:
+            with open(f"{path}/name") as f:
+                name = f.read().strip().lower()
+        except OSError:
+            continue
+        if any(key in name for key in PANEL_FB_NAMES):
+            return f"/dev/{os.path.basename(path)}"
+    return None
+
+
+def read_spidev_bufsiz(path: str = SPIDEV_BUFSIZ) -> int:
+    """Return spidev's maximum transfer size in bytes (the kernel default, 4096, if unreadable)."""
+    try:
+        with open(path) as f:
+            return int(f.read()) or _DEFAULT_BUFSIZ
+    except (OSError, ValueError):
+        return _DEFAULT_BUFSIZ
+
+
+class SpidevBackend:
+    """
+    Drive the ST7789 directly over spidev.
+
+    The panel is set up with the same register values luma.lcd uses, but
+    without luma's initial full-screen clear: the display is only switched
+    on with the first pixel write, so nothing stale or blank is shown
+    before the application's first frame.
+
+    With a state file (warm start), a restarted process re-attaches to a
+    panel that is already set up without touching it, so the last image
+    stays on screen. Only the pixel format is re-sent, with the first write.
+    """
+
+    name = "spidev"
+    pixel_formats = ("rgb565", "rgb444")
+
+    # MADCTL 0xB0 is luma's 0x70 with MX/MY flipped: the panel itself does the
+    # 180 degree rotation, so frames and regions are sent without rotating.
+    MADCTL = 0xB0
+    COLMOD = {"rgb565": 0x55, "rgb444": 0x53}
+
+    def __init__(
+        self,
+        gpio,
+        port: int,
+        cs: int,
+        dc: int,
+        speed_hz: int,
+        state_file: str = None,
+        arbiter=None,
+        slice_bytes: int = None,
+    ):
+        """
+        Open the SPI device and initialise the panel.
+
+        Args:
+            gpio: GPIO backend (see gpio.py), used for the data/command line.
+            port: SPI port (bus) number.
+            cs: SPI chip select.
+            dc: GPIO (BCM) of the panel's data/command line.
+            speed_hz: SPI bus speed in Hz.
+            state_file: If given, warm start: skip the panel setup when this
+                        file shows the same configuration was already
+                        applied since boot, and record it otherwise.
+            arbiter: BusArbiter shared with drivers for other devices on the
+                     bus, held for each command group and pixel slice.
+            slice_bytes: With an arbiter, the most pixel bytes sent per hold.
+        """
+        import spidev
+
+        self._gpio = gpio
+        self._dc = dc
+        gpio.setup_output(dc, True)
+
+        self._spi = spidev.SpiDev()
+        self._spi.open(port, cs)
+        self._spi.mode = 0
+        self._spi.max_speed_hz = speed_hz
+
+        self._arbiter = arbiter or UNSHARED
+        self.slice_bytes = slice_bytes if arbiter else None
+
+        # Bytes per writebytes2() call; at bufsiz, spidev splits large
+        # buffers itself, with no per-chunk Python overhead
+        self.bufsiz = read_spidev_bufsiz()
+        self.chunk_bytes = self.bufsiz
+        if self.bufsiz < CHUNK_CANDIDATES[-1]:
+            import logging
+
+            logging.getLogger(__name__).warning(
+                "spidev.bufsiz=%d caps each SPI write at %d bytes; "
+                "add spidev.bufsiz=%d to /boot/firmware/cmdline.txt for larger transfers",
+                self.bufsiz,
+                self.bufsiz,
+                CHUNK_CANDIDATES[-1],
+            )
+
+        self._colmod = None
+        self._display_on = False
+        self._ready_at = 0.0
+        self._asleep = False
+        self._settled_at = 0.0
+
+        # Panel state left by an earlier process is reused, not reset
+        state = self._panel_state(port, cs)
+        self.warm = state_file is not None and _read_state(state_file) == state
+        if not self.warm:
+            self._init_panel()
+            if state_file is not None:
+                _write_state(state_file, state)
+
+    def command(self, cmd: int, *args: int) -> None:
+        """Send a panel command with optional parameter bytes."""
+        gpio = self._gpio
+        with self._arbiter:
+            gpio.output(self._dc, False)  # Command mode
+            self._spi.writebytes([cmd])
+            if args:
+                gpio.output(self._dc, True)  # Data mode
+                self._spi.writebytes(list(args))
+
+    def set_window(self, x: int, y: int, w: int, h: int, pixel_format: str = "rgb565") -> None:
+        """Set the panel address window and start a memory write."""
+        if not self._display_on:
+            self._power_on()
+        self._address(x, y, w, h, pixel_format)
+
+    def write(self, data) -> None:
+        """
+        Stream pixel bytes after set_window(), in writes of chunk_bytes.
+
+        With a bus arbiter, the data goes out in slices of at most slice_bytes,
+        each under its own hold of the arbiter. The panel keeps its write
+        position while other devices use the bus in between.
+        """
+        gpio = self._gpio
+        step = self.slice_bytes
+        if not step or len(data) <= step:
+            with self._arbiter:
+                gpio.output(self._dc, True)  # Data mode
+                self._send(data)
+            return
+        view = memoryview(data).cast("B")
+        for start in range(0, len(view), step):
+            with self._arbiter:
+                gpio.output(self._dc, True)  # Data mode
+                self._send(view[start:start + step])
+
+    def calibrate(self, width: int, height: int, candidates=None, rounds: int = 2) -> dict:
+        """
+        Time full-window writes at several chunk sizes and keep the fastest.
+
+        Black pixels are written into the panel memory, which is not
+        visible until the display is switched on by the first frame.
+
+        Args:
+            width: Window width in pixels.
+            height: Window height in pixels.
+            candidates: Chunk sizes to try (default CHUNK_CANDIDATES); sizes
+                        above bufsiz are skipped and bufsiz is always tried.
+            rounds: Frames written per chunk size.
+
+        Returns:
+            {chunk size: measured bytes per second}
+        """
+        sizes = sorted({size for size in candidates or CHUNK_CANDIDATES if size <= self.bufsiz} | {self.bufsiz})
+        frame = bytes(width * height * 2)
+        results = {}
+        for size in sizes:
+            self.chunk_bytes = size
+            start = time.perf_counter()
+            for _ in range(rounds):
+                self._address(0, 0, width, height)
+                self.write(frame)
+            results[size] = rounds * len(frame) / (time.perf_counter() - start)
+        self.chunk_bytes = max(results, key=results.get)
+        return results
+
+    def sleep(self) -> None:
+        """Put the panel into sleep mode (display off, image kept in memory)."""
+        if not self._asleep:
+            self._sleep_command(_SLPIN)
+            self._asleep = True
+
+    def wake(self) -> None:
+        """Bring the panel out of sleep mode."""
+        if self._asleep:
+            self._sleep_command(_SLPOUT)
+            self._asleep = False
+            time.sleep(_SLPOUT_DELAY)
+
+    def close(self) -> None:
+        """Close the SPI device."""
+        self._spi.close()
+
+    def _init_panel(self) -> None:
+        """Send the register setup and wake the panel, leaving the display off."""
+        self.command(_MADCTL, self.MADCTL)
+        self._set_colmod(self.COLMOD["rgb565"])
+        for cmd, args in _PANEL_SETUP:
+            self.command(cmd, *args)
+        self.command(_SLPOUT)
+        self._ready_at = time.monotonic() + _SLPOUT_DELAY
+        self._settled_at = time.monotonic() + _SLEEP_SETTLE
+
+    def _panel_state(self, port: int, cs: int) -> str:
+        """Describe the configuration _init_panel() applies, for warm starts."""
+        try:
+            with open(_BOOT_ID) as f:
+                boot_id = f.read().strip()
+        except OSError:
+            boot_id = ""
+        return f"{boot_id} spi{port}.{cs} madctl={self.MADCTL:#04x} setup={zlib.crc32(repr(_PANEL_SETUP).encode()):08x}\n"
+
+    def _power_on(self) -> None:
+        """Switch the display on once the panel is out of sleep."""
+        delay = self._ready_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.command(_DISPON)
+        self._display_on = True
+
+    def _sleep_command(self, cmd: int) -> None:
+        """Send SLPIN/SLPOUT, keeping the required gap after the previous one."""
+        delay = self._settled_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.command(cmd)
+        self._settled_at = time.monotonic() + _SLEEP_SETTLE
+
+    def _set_colmod(self, colmod: int) -> None:
+        """Switch the panel's interface pixel format if it differs."""
+        if colmod != self._colmod:
+            self.command(_COLMOD, colmod)
+            self._colmod = colmod
+
+    def _address(self, x: int, y: int, w: int, h: int, pixel_format: str = "rgb565") -> None:
+        """Set the address window and start a memory write, whether or not the display is on."""
+        x1 = x + w - 1
+        y1 = y + h - 1
+        with self._arbiter:
+            self._set_colmod(self.COLMOD[pixel_format])
+            self.command(_CASET, x >> 8, x & 0xFF, x1 >> 8, x1 & 0xFF)
+            self.command(_RASET, y >> 8, y & 0xFF, y1 >> 8, y1 & 0xFF)
+            self.command(_RAMWR)
+
+    def _send(self, data) -> None:
+        """Write pixel bytes in chunk_bytes pieces (DC already high)."""
+        chunk = self.chunk_bytes
+        if chunk >= self.bufsiz or len(data) <= chunk:
+            self._spi.writebytes2(data)
+            return
+        view = memoryview(data).cast("B")
+        for start in range(0, len(view), chunk):
+            self._spi.writebytes2(view[start:start + chunk])
+
+
+def _read_state(path: str):
+    """Return the contents of a warm-start state file, or None."""
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_state(path: str, state: str) -> None:
+    """Atomically record the applied panel configuration (best effort)."""
+    tmp = f"{path}.{os.getpid()}"
+    try:
+        with open(tmp, "w") as f:
+            f.write(state)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+class FramebufferBackend:
+    """
+    Write pixels into a kernel panel driver's memory-mapped framebuffer.
+
+    The framebuffer must already be oriented as the 320x240 screen (set the
+    driver's rotation in its overlay). 16 bpp (RGB565) and 32 bpp (XRGB8888)
+    layouts are supported. A regular file can stand in for the device; it is
+    treated as 16 bpp with no row padding.
+    """
+
+    name = "fbdev"
+    pixel_formats = ("rgb565",)
+    warm = False  # The kernel driver owns panel setup
+
+    def __init__(self, device: str, width: int, height: int):
+        """
+        Map the framebuffer.
+
+        Args:
+            device: Framebuffer device (e.g. "/dev/fb1") or a regular file.
+            width: Expected width in pixels.
+            height: Expected height in pixels.
+
+        Raises:
+            ValueError: If the framebuffer geometry does not match.
+        """
+        try:
+            fb_width, fb_height, bpp, stride = read_fb_geometry(device)
+        except OSError:
+            fb_width, fb_height, bpp, stride = width, height, 16, width * 2
+        if (fb_width, fb_height) != (width, height):
+            raise ValueError(f"{device} is {fb_width}x{fb_height}, expected {width}x{height}")
+        if bpp not in (16, 32):
+            raise ValueError(f"{device}: unsupported depth {bpp} bpp")
+
+        self.device = device
+        self._bpp = bpp
+        self._pixel_bytes = bpp // 8
+        self._stride = stride
+        self._file = open(device, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), stride * height)
+        self._window = (0, 0, width, height)
+        self._cursor = 0
+
+    def command(self, cmd: int, *args: int) -> None:
+        """Panel commands are handled by the kernel driver; ignored here."""
+
+    def set_window(self, x: int, y: int, w: int, h: int, pixel_format: str = "rgb565") -> None:
+        """Start writing pixels into a rectangle."""
+        self._window = (x, y, w, h)
+        self._cursor = 0
+
+    def write(self, data) -> None:
+        """Copy big-endian RGB565 pixels into the window, continuing where the last write ended."""
+        pixels = array("H", bytes(data))
+        pixels.byteswap()  # Panel order is big-endian, the framebuffer is native
+        if self._bpp == 32:
+            from PIL import Image
+
+            count = len(pixels)
+            rgb = Image.frombytes("RGB", (count, 1), pixels.tobytes(), "raw", "BGR;16")
+            data = memoryview(rgb.tobytes("raw", "BGRX"))
+        else:
+            data = memoryview(pixels).cast("B")
+
+        x, y, w, _h = self._window
+        pb = self._pixel_bytes
+        fb = self._map
+        offset = 0
+        while offset < len(data):
+            row, col = divmod(self._cursor, w)
+            n = min(w - col, (len(data) - offset) // pb)
+            start = (y + row) * self._stride + (x + col) * pb
+            fb[start:start + n * pb] = data[offset:offset + n * pb]
+            offset += n * pb
+            self._cursor += n
+
+    def sleep(self) -> None:
+        """Ask the kernel driver to power the panel down (if it supports blanking)."""
+        self._blank(_FB_BLANK_POWERDOWN)
+
+    def wake(self) -> None:
+        """Ask the kernel driver to power the panel back up."""
+        self._blank(_FB_BLANK_UNBLANK)
+
+    def close(self) -> None:
+        """Unmap and close the framebuffer."""
+        self._map.close()
+        self._file.close()
+
+    def _blank(self, mode: int) -> None:
+        """Issue FBIOBLANK; ignored for regular files and drivers without it."""
+        import fcntl
+
+        try:
+            fcntl.ioctl(self._file.fileno(), _FBIOBLANK, mode)
+        except OSError:
+            pass
@@ -0,0 +1,245 @@
+"""
+SPI bus sharing: combining of queued pixel updates, and arbitration with
+other devices on the same bus.
+
+When several threads draw at once, the thread holding the bus sends the
+updates the others queued before releasing it. Those updates are first
+reduced to as few transfers as possible:
+
+- an update whose rectangle a later update covers completely is dropped,
+  since every one of its pixels would be overwritten
+- consecutive updates that stack vertically (same x, width and pixel
+  format, each starting on the row after the previous one ends) are joined
+  into a single window write
+
+BusArbiter shares the SPI bus with drivers for other chip selects. The
+display then sends frames in bounded slices, holding the arbiter for one
+slice at a time, and a waiting high-priority transaction runs before its
+next slice.
+
+BandWriter overlaps preparing pixels with sending them. The caller hands
+over one band of a frame and goes on to encode the next while a writer
+thread puts the first on the bus. An optional pause after each band (set by
+the governor) spreads transfers out.
+"""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+Update = namedtuple("Update", "x y w h data pixel_format")
+
+
+def _covers(outer: Update, inner: Update) -> bool:
+    """True if outer's rectangle contains inner's."""
+    return (
+        outer.x <= inner.x
+        and outer.y <= inner.y
+        and outer.x + outer.w >= inner.x + inner.w
+        and outer.y + outer.h >= inner.y + inner.h
+    )
+
+
+def coalesce(updates):
+    """
+    Reduce queued updates to the transfers that produce the same screen.
+
+    Args:
+        updates: Updates in the order they were made.
+
+    Returns:
+        (transfers, merged): the updates to send, in order, and how many of
+        the input updates were dropped or joined into another transfer.
+    """
+    # Walk backwards so each update is checked against everything after it
+    kept = []
+    for update in reversed(updates):
+        if not any(_covers(later, update) for later in kept):
+            kept.append(update)
+    kept.reverse()
+
+    transfers = []
+    for update in kept:
+        if transfers:
+            last = transfers[-1]
+            if (
+                last.x == update.x
+                and last.w == update.w
+                and last.pixel_format == update.pixel_format
+                and last.y + last.h == update.y
+            ):
+                transfers[-1] = last._replace(h=last.h + update.h, data=bytes(last.data) + bytes(update.data))
+                continue
+        transfers.append(update)
+    return transfers, len(updates) - len(transfers)
+
+
+class BusArbiter:
+    """
+    Ownership of a shared SPI bus between several drivers.
+
+    Pass the same arbiter to DisplayHATMini(bus_arbiter=...) and wrap the
+    other driver's transfers in transaction(). Priority transactions wait
+    for at most the slice in progress; normal ones also let waiting
+    priority transactions go first. An owner can re-enter the arbiter.
+
+    Example:
+        arbiter = BusArbiter()
+        display = DisplayHATMini(bus_arbiter=arbiter, max_slice_latency=0.002)
+
+        with arbiter.transaction(priority=True):
+            reading = sensor.xfer2([0x80, 0])
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._owner = None
+        self._depth = 0
+        self._priority_waiting = 0
+
+        # Counters
+        self.transactions = 0
+        self.priority_transactions = 0
+        self.max_priority_wait = 0.0
+
+    def acquire(self, priority: bool = False) -> None:
+        """
+        Wait for the bus and take it.
+
+        Args:
+            priority: If True, go ahead of normal-priority waiters.
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                return
+            if priority:
+                start = time.perf_counter()
+                self._priority_waiting += 1
+                try:
+                    while self._owner is not None:
+                        self._cond.wait()
+                finally:
+                    self._priority_waiting -= 1
+                self.priority_transactions += 1
+                self.max_priority_wait = max(self.max_priority_wait, time.perf_counter() - start)
+            else:
+                while self._owner is not None or self._priority_waiting:
+                    self._cond.wait()
+            self.transactions += 1
+            self._owner = me
+            self._depth = 1
+
+    def release(self) -> None:
+        """Give the bus back (once per acquire())."""
+        with self._cond:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("Bus released by a thread that does not own it")
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._cond.notify_all()
+
+    def transaction(self, priority: bool = False):
+        """Return a context manager that holds the bus for a with block."""
+        return _Transaction(self, priority)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class _Transaction:
+    """Context manager returned by BusArbiter.transaction()."""
+
+    def __init__(self, arbiter: BusArbiter, priority: bool):
+        self._arbiter = arbiter
+        self._priority = priority
+
+    def __enter__(self):
+        self._arbiter.acquire(self._priority)
+        return self._arbiter
+
+    def __exit__(self, *exc):
+        self._arbiter.release()
+
+
+class _Unshared:
+    """Stand-in arbiter for a bus that nothing else uses."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+UNSHARED = _Unshared()
+
+
+class BandWriter:
+    """
+    Send buffers from a background thread while the caller prepares the next.
+
+    At most depth buffers wait in the queue, so memory stays bounded by a
+    few bands whatever the frame size. The thread starts on first use.
+    """
+
+    def __init__(self, write, depth: int = 1):
+        """
+        Args:
+            write: Called as write(data) on the writer thread for each buffer.
+            depth: Buffers queued behind the one being written.
+        """
+        self._write = write
+        self.band_delay = 0.0  # Seconds to pause after each buffer
+        self._queue = queue.Queue(maxsize=depth)
+        self._error = None
+        self._thread = None
+
+    def send(self, data) -> None:
+        """Queue a buffer, waiting while the queue is full."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="displayhatmini-writer", daemon=True)
+            self._thread.start()
+        self._queue.put(data)
+
+    def finish(self) -> None:
+        """
+        Wait until every queued buffer has been written.
+
+        Raises:
+            Exception: The first error raised by write() since the last finish().
+        """
+        self._queue.join()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Stop the writer thread after the queued buffers."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Writer thread: write buffers in order; after an error, discard until finish()."""
+        while True:
+            data = self._queue.get()
+            try:
+                if data is None:
+                    return
+                if self._error is None:
+                    self._write(data)
+                    if self.band_delay:
+                        time.sleep(self.band_delay)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,289 @@
+"""
+Mirror a Linux framebuffer (e.g. /dev/fb0) onto the Display HAT Mini.
+
+The framebuffer is memory-mapped and compared in place against the last
+copy pushed to the panel, one row and then one tile at a time. Only tiles
+that changed are copied, converted and sent, so an idle console costs almost nothing on the SPI
+bus. A regular file can stand in for the device (pass its geometry
+explicitly).
+
+Command line:
+
+    python -m displayhatmini_lite.fbmirror /dev/fb0 --fps 30
+"""
+
+import argparse
+import mmap
+import time
+from array import array
+
+from PIL import Image
+
+from .backends import read_fb_geometry
+from .pixels import to_rgb565
+
+# PIL raw modes for framebuffer pixel layouts, by bits per pixel
+_RAWMODES = {16: "BGR;16", 24: "BGR", 32: "BGRX"}
+
+
+class FramebufferMirror:
+    """
+    Copy changed regions of a framebuffer to a DisplayHATMini.
+
+    Example:
+        mirror = FramebufferMirror(display, "/dev/fb0", max_fps=30)
+        mirror.run()
+    """
+
+    def __init__(
+        self,
+        display,
+        device: str = "/dev/fb0",
+        width: int = None,
+        height: int = None,
+        bpp: int = None,
+        stride: int = None,
+        mode: str = "scale",
+        offset=(0, 0),
+        max_fps: float = 30,
+        tile: int = 16,
+    ):
+        """
+        Args:
+            display: The DisplayHATMini to mirror onto.
+            device: Framebuffer device, or a regular file with the same layout.
+            width: Source width in pixels (default: from sysfs).
+            height: Source height in pixels (default: from sysfs).
+            bpp: Source bits per pixel: 16 (RGB565), 24 (BGR) or 32 (BGRX).
+            stride: Bytes per source row (default: width * bpp / 8).
+            mode: "scale" to fit the whole source to 320x240, or "crop" to
+                  show a 320x240 window of it at offset.
+            offset: (x, y) of the window in crop mode.
+            max_fps: Maximum number of updates per second in run().
+            tile: Tile size in source pixels used for change detection.
+        """
+        if width is None or height is None or bpp is None:
+            width, height, bpp, sys_stride = read_fb_geometry(device)
+            stride = stride or sys_stride
+        if bpp not in _RAWMODES:
+            raise ValueError(f"Unsupported framebuffer depth: {bpp} bpp")
+        if mode not in ("scale", "crop"):
+            raise ValueError(f"mode must be 'scale' or 'crop' (got {mode!r})")
+        if max_fps <= 0:
+            raise ValueError(f"max_fps must be positive (got {max_fps})")
+
+        self._display = display
+        self.width = width
+        self.height = height
+        self.bpp = bpp
+        self.stride = stride or width * bpp // 8
+        self.mode = mode
+        self.max_fps = max_fps
+        self.tile = tile
+        self._pixel_bytes = bpp // 8
+        self._rawmode = _RAWMODES[bpp]
+        self._running = False
+
+        # Source area that ends up on the panel
+        if mode == "crop":
+            x, y = offset
+            self._area = (x, y, min(x + display.WIDTH, width), min(y + display.HEIGHT, height))
+        else:
+            self._area = (0, 0, width, height)
+
+        self._file = open(device, "rb")
+        self._map = mmap.mmap(self._file.fileno(), self.stride * height, access=mmap.ACCESS_READ)
+        self._last = None
+
+        # Counters
+        self.updates = 0
+        self.rects_sent = 0
+        self.bytes_sent = 0
+
+    def step(self) -> int:
+        """
+        Compare the framebuffer with the last pushed copy and send changes.
+
+        Returns:
+            The number of rectangles sent to the panel.
+        """
+        if self._last is None:
+            # First call: everything is new
+            self._last = bytearray(self._map)
+            rects = [self._area]
+        else:
+            # Changed tiles are copied into the last copy and sent from it, so
+            # a change made meanwhile is either sent now or found next step
+            rects = self._dirty_rects()
+        for rect in rects:
+            self._send(rect)
+        if rects:
+            self.updates += 1
+            self.rects_sent += len(rects)
+        return len(rects)
+
+    def run(self) -> None:
+        """Mirror until stop() is called, at most max_fps updates per second."""
+        self._running = True
+        interval = 1.0 / self.max_fps
+        deadline = time.monotonic()
+        while self._running:
+            self.step()
+            deadline += interval
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.monotonic()  # Running late - don't try to catch up
+
+    def stop(self) -> None:
+        """Make run() return after the current update."""
+        self._running = False
+
+    def close(self) -> None:
+        """Unmap and close the framebuffer."""
+        self._map.close()
+        self._file.close()
+
+    def _dirty_rects(self):
+        """
+        Return the source rectangles that changed, as (x0, y0, x1, y1), merged per tile row.
+
+        The changed tiles are copied from the framebuffer into the last copy.
+        """
+        fb = self._map
+        last = self._last
+        stride = self.stride
+        pb = self._pixel_bytes
+        tile = self.tile
+        ax0, ay0, ax1, ay1 = self._area
+        columns = range(ax0, ax1, tile)
+
+        rects = []
+        open_runs = {}
+        for ty in range(ay0, ay1, tile):
+            ty1 = min(ty + tile, ay1)
+            changed = set()
+            for y in range(ty, ty1):
+                row = y * stride
+                start = row + ax0 * pb
+                end = row + ax1 * pb
+                # Cheap whole-row check before looking at individual tiles
+                if fb[start:end] == last[start:end]:
+                    continue
+                for tx in columns:
+                    if tx in changed:
+                        continue
+                    a = row + tx * pb
+                    b = row + min(tx + tile, ax1) * pb
+                    if fb[a:b] != last[a:b]:
+                        changed.add(tx)
+                if len(changed) == len(columns):
+                    break
+
+            # Merge horizontally adjacent tiles into runs
+            runs = []
+            for tx in columns:
+                if tx in changed:
+                    if runs and runs[-1][1] == tx:
+                        runs[-1][1] = min(tx + tile, ax1)
+                    else:
+                        runs.append([tx, min(tx + tile, ax1)])
+            for x0, x1 in runs:
+                for y in range(ty, ty1):
+                    a = y * stride + x0 * pb
+                    b = y * stride + x1 * pb
+                    last[a:b] = fb[a:b]
+
+            # Extend identical runs from the previous tile row downwards
+            next_runs = {}
+            for x0, x1 in runs:
+                rect = open_runs.pop((x0, x1), None)
+                if rect is None:
+                    rect = [x0, ty, x1, ty1]
+                else:
+                    rect[3] = ty1
+                next_runs[(x0, x1)] = rect
+            rects.extend(tuple(rect) for rect in open_runs.values())
+            open_runs = next_runs
+        rects.extend(tuple(rect) for rect in open_runs.values())
+        return rects
+
+    def _send(self, rect) -> None:
+        """Convert one changed source rectangle and send it to the panel."""
+        x0, y0, x1, y1 = rect
+        ax0, ay0, ax1, ay1 = self._area
+        display = self._display
+        pb = self._pixel_bytes
+
+        if self.mode == "scale":
+            sx = display.WIDTH / self.width
+            sy = display.HEIGHT / self.height
+            dx0, dy0 = int(x0 * sx), int(y0 * sy)
+            dx1 = min(display.WIDTH, max(dx0 + 1, -int(-x1 * sx)))
+            dy1 = min(display.HEIGHT, max(dy0 + 1, -int(-y1 * sy)))
+            # Source area that maps exactly onto the destination pixels
+            x0, y0 = int(dx0 / sx), int(dy0 / sy)
+            x1 = min(self.width, -int(-dx1 / sx))
+            y1 = min(self.height, -int(-dy1 / sy))
+        else:
+            dx0, dy0 = x0 - ax0, y0 - ay0
+            dx1, dy1 = x1 - ax0, y1 - ay0
+
+        w, h = x1 - x0, y1 - y0
+        dw, dh = dx1 - dx0, dy1 - dy0
+        rows = b"".join(
+            self._last[y * self.stride + x0 * pb:y * self.stride + x1 * pb] for y in range(y0, y1)
+        )
+
+        if self.bpp == 16 and (w, h) == (dw, dh):
+            # Same-size RGB565: only the byte order differs from the panel
+            pixels = array("H", rows)
+            pixels.byteswap()
+            data = pixels.tobytes()
+        else:
+            image = Image.frombytes("RGB", (w, h), rows, "raw", self._rawmode)
+            if (w, h) != (dw, dh):
+                image = image.resize((dw, dh), Image.BILINEAR)
+            data = to_rgb565(image)
+
+        display.blit(data, dx0, dy0, dw, dh)
+        self.bytes_sent += len(data)
+
+
+def main(argv=None) -> None:
+    """Command line entry point: mirror a framebuffer until Ctrl+C."""
+    parser = argparse.ArgumentParser(
+        prog="python -m displayhatmini_lite.fbmirror",
+        description="Mirror a Linux framebuffer onto Display HAT Mini",
+    )
+    parser.add_argument("device", nargs="?", default="/dev/fb0")
+    parser.add_argument("--fps", type=float, default=30, help="Maximum updates per second (default: 30)")
+    parser.add_argument("--crop", metavar="X,Y", help="Show a 320x240 window at X,Y instead of scaling")
+    parser.add_argument("--tile", type=int, default=16, help="Change-detection tile size (default: 16)")
+    args = parser.parse_args(argv)
+
+    from . import DisplayHATMini
+
+    display = DisplayHATMini()
+    display.set_backlight(1.0)
+    offset = tuple(int(v) for v in args.crop.split(",")) if args.crop else (0, 0)
+    mirror = FramebufferMirror(
+        display,
+        args.device,
+        mode="crop" if args.crop else "scale",
+        offset=offset,
+        max_fps=args.fps,
+        tile=args.tile,
+    )
+    try:
+        mirror.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mirror.close()
+        display.set_backlight(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Flight recorder and stall watchdog.
+
+Every DisplayHATMini keeps its most recent events in a FlightRecorder, a
+fixed-size ring that is always on. Recording an event stores one tuple and
+takes no lock. The events are:
+
+    frame_start, frame_end    a full-frame transfer (value: bytes)
+    region_start, region_end  a partial transfer (value: bytes, detail: (w, h))
+    frame_skip                display() found the frame already on screen
+    bus_wait                  a caller waited for the bus (value: microseconds)
+    led, backlight            a PWM level was set (value: the level)
+    power_down, power_up      the idle manager blanked or woke the display
+    button                    a button edge arrived (value: pin)
+    callback_end              the application's button callback returned
+    stall, recovered          the watchdog's verdicts (value: milliseconds)
+
+A Watchdog checks that frames keep reaching the panel. When none has
+completed within its deadline, it logs what the display was doing: an
+unfinished transfer (the SPI write hung), an unfinished button callback
+(the GPIO callback thread is blocked), or neither (the application
+stopped drawing). Along with this it writes the recent events and the
+stack of every thread.
+"""
+
+import itertools
+import sys
+import threading
+import time
+from collections import namedtuple
+
+# One entry of the ring; time is monotonic ns, thread the recording thread's name
+FlightEvent = namedtuple("FlightEvent", "time kind value detail thread")
+
+_WRITES = ("frame_start", "frame_end", "region_start", "region_end")
+_BUTTONS = ("button", "callback_end")
+
+
+class FlightRecorder:
+    """
+    Fixed-size ring of recent display events.
+
+    Available as DisplayHATMini.flight_recorder.
+
+    Example:
+        print(display.flight_recorder.dump())
+        display.flight_recorder.dump_on_signal()  # kill -USR1 <pid>
+    """
+
+    def __init__(self, size: int = 1024):
+        """
+        Args:
+            size: Number of events kept.
+
+        Raises:
+            ValueError: If size is not positive.
+        """
+        if size <= 0:
+            raise ValueError(f"size must be positive (got {size})")
+        self.size = size
+        self._ring = [None] * size
+        self._seq = itertools.count()  # next() is atomic, so no lock is needed
+        self._signal_file = None
+
+    def record(self, kind: str, value=None, detail=None) -> None:
+        """Add an event, overwriting the oldest once the ring is full."""
+        seq = next(self._seq)
+        self._ring[seq % self.size] = (seq, time.monotonic_ns(), kind, value, detail, threading.get_ident())
+
+    def clear(self) -> None:
+        """Forget all events."""
+        self._ring = [None] * self.size
+
+    def events(self) -> list:
+        """Return the recorded events as FlightEvents, oldest first."""
+        entries = sorted(entry for entry in list(self._ring) if entry is not None)
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        return [
+            FlightEvent(ns, kind, value, detail, names.get(ident, str(ident)))
+            for _seq, ns, kind, value, detail, ident in entries
+        ]
+
+    def dump(self) -> str:
+        """Return the recorded events as printable text, times relative to now."""
+        events = self.events()
+        now = time.monotonic_ns()
+        lines = [f"Flight recorder: {len(events)} events, oldest first (ms before now)"]
+        for event in events:
+            values = " ".join(str(value) for value in (event.value, event.detail) if value is not None)
+            lines.append(f"{(event.time - now) / 1e6:12.3f}  {event.thread:<24} {event.kind:<14}{values}".rstrip())
+        return "\n".join(lines)
+
+    def dump_on_signal(self, signum=None, path: str = None) -> None:
+        """
+        Write the stack of every thread and then the events when a signal arrives.
+
+        The stacks are written by faulthandler straight from the signal
+        handler, so they appear even while the main thread is stuck in a
+        system call. The events follow once the main thread runs Python
+        code again. Must be called from the main thread.
+
+        Args:
+            signum: Signal number (default: SIGUSR1).
+            path: File to append the dumps to (default: standard error).
+        """
+        import faulthandler
+        import signal
+
+        signum = signal.SIGUSR1 if signum is None else signum
+        if path is not None:
+            self._signal_file = open(path, "a")
+        out = self._signal_file or sys.stderr
+
+        def handler(signum, frame):
+            out.write(self.dump() + "\n")
+            out.flush()
+
+        signal.signal(signum, handler)
+        faulthandler.register(signum, file=out, all_threads=True, chain=True)
+
+
+class Watchdog:
+    """
+    Flag stalls: no frame completing on the panel within a deadline.
+
+    Created by DisplayHATMini.enable_watchdog(); not normally constructed
+    directly. Full frames, regions and skipped identical frames all count
+    as progress.
+
+    Example:
+        watchdog = display.enable_watchdog(deadline=5.0, dump_path="/var/log/display-stall.log")
+    """
+
+    def __init__(self, display, deadline: float = 5.0, on_stall=None, dump_path: str = None):
+        """
+        Args:
+            display: The DisplayHATMini to watch.
+            deadline: Seconds without a completed frame that count as a stall.
+            on_stall: Called as on_stall(report) from the watchdog thread,
+                      with the text that is also logged and written.
+            dump_path: File to append stall reports to (None = logging only).
+
+        Raises:
+            ValueError: If deadline is not positive.
+        """
+        if deadline <= 0:
+            raise ValueError(f"deadline must be positive (got {deadline})")
+        self._display = display
+        self.deadline = deadline
+        self.on_stall = on_stall
+        self.dump_path = dump_path
+        self.stalled = False
+        self.stalls = 0
+        self.last_report = None
+        self._progress = self._count()
+        self._last_progress = time.monotonic()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="displayhatmini-watchdog", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop watching."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+
+    def check(self) -> bool:
+        """
+        Compare progress with the deadline now (the watchdog thread does this regularly).
+
+        Returns:
+            True while stalled.
+        """
+        now = time.monotonic()
+        progress = self._count()
+        if progress != self._progress:
+            self._progress = progress
+            if self.stalled:
+                self.stalled = False
+                self._display._flight.record("recovered", round((now - self._last_progress) * 1000))
+                self._log().info("Display recovered after %.1f s", now - self._last_progress)
+            self._last_progress = now
+        elif not self.stalled and now - self._last_progress > self.deadline:
+            self.stalled = True
+            self.stalls += 1
+            self._stall(now - self._last_progress)
+        return self.stalled
+
+    def diagnose(self) -> str:
+        """Return what the display's recent events say it is stuck on."""
+        events = self._display._flight.events()
+        now = time.monotonic_ns()
+        write = next((event for event in reversed(events) if event.kind in _WRITES), None)
+        button = next((event for event in reversed(events) if event.kind in _BUTTONS), None)
+        findings = []
+        if write is not None and write.kind.endswith("_start"):
+            findings.append(
+                f"a {write.value}-byte transfer started {(now - write.time) / 1e6:.0f} ms ago in "
+                f"{write.thread} has not finished: the SPI write or framebuffer copy is hung"
+            )
+        if button is not None and button.kind == "button":
+            findings.append(
+                f"the callback for the button on GPIO {button.value} started {(now - button.time) / 1e6:.0f} ms "
+                f"ago in {button.thread} has not returned: the GPIO callback thread is blocked"
+            )
+        if not findings:
+            last = write.time if write is not None else None
+            since = f"for {(now - last) / 1e6:.0f} ms" if last is not None else "since the watchdog started"
+            findings.append(f"no transfer has started {since}: the application stopped drawing")
+        return "; ".join(findings)
+
+    def _stall(self, seconds: float) -> None:
+        """Report a stall."""
+        import traceback
+
+        self._display._flight.record("stall", round(seconds * 1000))
+        diagnosis = self.diagnose()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident != threading.get_ident():
+                stacks.append(f"Thread {names.get(ident, ident)}:\n" + "".join(traceback.format_stack(frame)))
+        report = "\n".join(
+            [
+                f"Display stalled: no frame completed for {seconds:.1f} s; {diagnosis}",
+                self._display._flight.dump(),
+                *stacks,
+            ]
+        )
+        self.last_report = report
+        self._log().warning("Display stalled for %.1f s: %s", seconds, diagnosis)
+        if self.dump_path is not None:
+            try:
+                with open(self.dump_path, "a") as f:
+                    f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {report}\n\n")
+            except OSError:
+                self._log().exception("Could not write the stall report to %s", self.dump_path)
+        if self.on_stall is not None:
+            self.on_stall(report)
+
+    def _count(self) -> int:
+        """Frames and regions completed, and frames skipped, so far."""
+        display = self._display
+        return display._transfers_done + display.stats.frames_skipped
+
+    def _log(self):
+        import logging
+
+        return logging.getLogger(__name__)
+
+    def _run(self) -> None:
+        """Watchdog thread."""
+        interval = min(self.deadline / 4, 1.0)
+        with self._cond:
+            while not self._closed:
+                self._cond.wait(interval)
+                if not self._closed:
+                    self.check()
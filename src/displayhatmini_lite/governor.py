@@ -0,0 +1,247 @@
+"""
+Adaptive frame-rate governor: slow down when the Pi is hot or busy.
+
+A Governor samples CPU use (/proc/stat), load average (/proc/loadavg) and
+SoC temperature (/sys/class/thermal) at a fixed interval. It turns them
+into a pressure between 0 (cool and idle) and 1 (at the configured
+temperature or load limit), and from it sets:
+
+    fps         the presentation rate a GameLoop on the display targets,
+                from max_fps at no pressure down to min_fps at full pressure
+    band_delay  a pause after each band the display's writer thread sends,
+                from 0 up to max_band_delay, spreading transfers out
+
+Rising pressure takes effect at once. Falling pressure only relaxes the
+outputs once it has dropped by the hysteresis, so readings that hover
+around a step do not make the frame rate flap. Every change is recorded
+as an Adjustment. The proc and sys roots are parameters, so the governor
+can be driven by fake files.
+"""
+
+import glob
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+# One change of the governor's outputs and the readings that caused it
+Adjustment = namedtuple("Adjustment", "time fps band_delay pressure temperature load cpu")
+
+
+def _scale(value, low: float, high: float) -> float:
+    """Map value from [low, high] onto [0, 1], clamped (None counts as 0)."""
+    if value is None:
+        return 0.0
+    return min(1.0, max(0.0, (value - low) / (high - low)))
+
+
+class Governor:
+    """
+    Lower the presentation rate and transfer pacing under heat or load.
+
+    Created by DisplayHATMini.enable_governor(); not normally constructed directly.
+
+    Example:
+        governor = display.enable_governor(min_fps=15, max_fps=60, temp_range=(60, 75))
+        ...
+        print(governor.fps, governor.stats())
+    """
+
+    def __init__(
+        self,
+        display=None,
+        min_fps: float = 10,
+        max_fps: float = 60,
+        temp_range=(60.0, 75.0),
+        load_range=(0.6, 0.95),
+        max_band_delay: float = 0.002,
+        hysteresis: float = 0.1,
+        interval: float = 2.0,
+        proc_root: str = "/proc",
+        sys_root: str = "/sys",
+        max_history: int = 100,
+    ):
+        """
+        Args:
+            display: The DisplayHATMini whose writer is paced (None = none).
+            min_fps: Presentation rate at full pressure.
+            max_fps: Presentation rate with no pressure.
+            temp_range: (start, limit) SoC temperature in °C: pressure rises
+                        from 0 at start to 1 at limit.
+            load_range: (start, limit) CPU load as a fraction of all cores,
+                        the higher of busy time and 1-minute load average.
+            max_band_delay: Seconds of pause after each band at full pressure.
+            hysteresis: Drop in pressure, below the pressure behind the
+                        current outputs, needed before they are relaxed.
+            interval: Seconds between samples (with start()).
+            proc_root: Root of the proc filesystem.
+            sys_root: Root of the sys filesystem.
+            max_history: Number of recent adjustments kept.
+
+        Raises:
+            ValueError: If the bounds are not in order or not positive.
+        """
+        if not 0 < min_fps <= max_fps:
+            raise ValueError(f"Need 0 < min_fps <= max_fps (got {min_fps}, {max_fps})")
+        for name, (low, high) in (("temp_range", temp_range), ("load_range", load_range)):
+            if not low < high:
+                raise ValueError(f"{name} must be (start, limit) with start < limit (got {(low, high)})")
+        if max_band_delay < 0:
+            raise ValueError(f"max_band_delay must not be negative (got {max_band_delay})")
+        if not 0 <= hysteresis < 1:
+            raise ValueError(f"hysteresis must be in [0, 1) (got {hysteresis})")
+        if interval <= 0:
+            raise ValueError(f"interval must be positive (got {interval})")
+
+        self._display = display
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.temp_range = tuple(temp_range)
+        self.load_range = tuple(load_range)
+        self.max_band_delay = max_band_delay
+        self.hysteresis = hysteresis
+        self.interval = interval
+        self._proc = proc_root
+        self._sys = sys_root
+
+        # Outputs
+        self.fps = max_fps
+        self.band_delay = 0.0
+        self._applied_pressure = 0.0  # Pressure behind fps and band_delay
+
+        # Latest readings (None where the file is missing)
+        self.pressure = 0.0
+        self.temperature = None
+        self.load = None
+        self.cpu = None
+
+        self.samples = 0
+        self.adjustment_count = 0
+        self.adjustments = deque(maxlen=max_history)
+
+        self._cpu_times = self._read_cpu_times()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def start(self) -> None:
+        """Sample every interval seconds in a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="displayhatmini-governor", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop sampling and remove the pacing from the display's writer."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(1.0)
+        if self._display is not None:
+            self._display._band_writer.band_delay = 0.0
+
+    def update(self) -> bool:
+        """
+        Take one sample and adjust the outputs.
+
+        Returns:
+            True if fps or band_delay changed.
+        """
+        self.temperature = self._read_temperature()
+        self.load = self._read_load()
+        self.cpu = self._read_cpu()
+        self.samples += 1
+
+        load = max(value for value in (self.load, self.cpu, 0.0) if value is not None)
+        self.pressure = max(_scale(self.temperature, *self.temp_range), _scale(load, *self.load_range))
+        if self._applied_pressure - self.hysteresis < self.pressure < self._applied_pressure:
+            return False  # Not cooled down enough to relax yet
+        self._applied_pressure = self.pressure
+        fps = round(self.max_fps - self.pressure * (self.max_fps - self.min_fps))
+        fps = min(self.max_fps, max(self.min_fps, fps))
+        band_delay = round(self.pressure * self.max_band_delay, 4)
+        if (fps, band_delay) == (self.fps, self.band_delay):
+            return False
+
+        self.fps = fps
+        self.band_delay = band_delay
+        if self._display is not None:
+            self._display._band_writer.band_delay = band_delay
+        self.adjustment_count += 1
+        self.adjustments.append(
+            Adjustment(time.monotonic(), fps, band_delay, self.pressure, self.temperature, self.load, self.cpu)
+        )
+        return True
+
+    def stats(self) -> dict:
+        """
+        Return the current readings and outputs.
+
+        Returns:
+            A dict with fps, band_delay, pressure, temperature (°C), load
+            and cpu (fractions of all cores), samples, adjustment_count
+            and adjustments (the recent Adjustment records, oldest first).
+        """
+        return {
+            "fps": self.fps,
+            "band_delay": self.band_delay,
+            "pressure": self.pressure,
+            "temperature": self.temperature,
+            "load": self.load,
+            "cpu": self.cpu,
+            "samples": self.samples,
+            "adjustment_count": self.adjustment_count,
+            "adjustments": list(self.adjustments),
+        }
+
+    def _run(self) -> None:
+        """Sampling thread."""
+        with self._cond:
+            while not self._closed:
+                self._cond.wait(self.interval)
+                if not self._closed:
+                    self.update()
+
+    def _read_temperature(self):
+        """Return the hottest thermal zone in °C, or None."""
+        hottest = None
+        for path in glob.glob(os.path.join(self._sys, "class/thermal/thermal_zone*/temp")):
+            try:
+                with open(path) as f:
+                    value = int(f.read()) / 1000.0
+            except (OSError, ValueError):
+                continue
+            hottest = value if hottest is None else max(hottest, value)
+        return hottest
+
+    def _read_load(self):
+        """Return the 1-minute load average per core, or None."""
+        try:
+            with open(os.path.join(self._proc, "loadavg")) as f:
+                load = float(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        return load / self._cores
+
+    def _read_cpu(self):
+        """Return the busy fraction of all cores since the previous sample, or None."""
+        previous, self._cpu_times = self._cpu_times, self._read_cpu_times()
+        if previous is None or self._cpu_times is None:
+            return None
+        busy = self._cpu_times[0] - previous[0]
+        total = self._cpu_times[1] - previous[1]
+        return busy / total if total > 0 else None
+
+    def _read_cpu_times(self):
+        """Return (busy, total) jiffies from /proc/stat, or None; also counts the cores."""
+        try:
+            with open(os.path.join(self._proc, "stat")) as f:
+                lines = f.read().splitlines()
+            fields = [int(value) for value in lines[0].split()[1:]]
+        except (OSError, ValueError, IndexError):
+            self._cores = os.cpu_count() or 1
+            return None
+        self._cores = sum(1 for line in lines[1:] if line.startswith("cpu")) or 1
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+        total = sum(fields[:8])  # guest time is already counted in user
+        return total - idle, total
@@ -0,0 +1,375 @@
+"""
+GPIO backends: how DisplayHATMini drives its buttons, LED, backlight and
+the panel's data/command line.
+
+RPiGPIO wraps RPi.GPIO. GpiodGPIO uses the GPIO character device
+(/dev/gpiochipN) through the libgpiod v2 Python bindings (``pip install
+gpiod``). That works on every current Pi kernel and board, including the
+Pi 5. All four buttons are one bulk line request with kernel debouncing,
+and a single thread blocks on that request's file descriptor. It receives
+edge events with kernel timestamps (CLOCK_MONOTONIC, the same clock as
+time.monotonic_ns()).
+
+NullGPIO drives nothing, for running against a mock panel off the Pi.
+
+All backends take BCM pin numbers and boolean levels (True = high).
+Button callbacks are called as callback(pin, timestamp_ns); RPiGPIO has no
+edge timestamps and passes None.
+"""
+
+import glob
+import os
+import select
+import threading
+import time
+
+# Labels of the Raspberry Pi's header GPIO controllers
+PI_GPIO_CHIP_LABELS = ("pinctrl-bcm2835", "pinctrl-bcm2711", "pinctrl-rp1")
+
+
+def find_gpio_chip() -> str:
+    """
+    Return the /dev/gpiochipN device of the Pi's header GPIOs.
+
+    Falls back to /dev/gpiochip0 if no known controller label is found.
+    """
+    import gpiod
+
+    for path in sorted(glob.glob("/dev/gpiochip*")):
+        try:
+            with gpiod.Chip(path) as chip:
+                if chip.get_info().label in PI_GPIO_CHIP_LABELS:
+                    return path
+        except OSError:
+            continue
+    return "/dev/gpiochip0"
+
+
+class RPiGPIO:
+    """GPIO through RPi.GPIO (mmap register access, one edge thread per process)."""
+
+    name = "rpi-gpio"
+
+    def __init__(self):
+        import RPi.GPIO as GPIO
+
+        self._GPIO = GPIO
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+
+    def setup_output(self, pin: int, value: bool) -> None:
+        """Make pin an output at the given level."""
+        GPIO = self._GPIO
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.HIGH if value else GPIO.LOW)
+
+    def output(self, pin: int, value: bool) -> None:
+        """Set an output pin's level."""
+        self._GPIO.output(pin, value)
+
+    def setup_inputs(self, pins) -> None:
+        """Make pins inputs with pull-ups."""
+        GPIO = self._GPIO
+        for pin in pins:
+            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+
+    def input(self, pin: int) -> bool:
+        """Read an input pin's level."""
+        return bool(self._GPIO.input(pin))
+
+    def watch(self, pins, callback, bouncetime: int = 10) -> None:
+        """Call callback(pin, None) on both edges of each pin, replacing earlier watches."""
+        GPIO = self._GPIO
+        for pin in pins:
+            # Remove any existing event detection
+            try:
+                GPIO.remove_event_detect(pin)
+            except RuntimeError:
+                pass
+            GPIO.add_event_detect(pin, GPIO.BOTH, callback=callback, bouncetime=bouncetime)
+
+    def pwm(self, pin: int, frequency: float):
+        """Return an RPi.GPIO PWM object (start/ChangeDutyCycle/stop) for an output pin."""
+        return self._GPIO.PWM(pin, frequency)
+
+    def close(self) -> None:
+        """Nothing to release; pins keep their state for the next run."""
+
+
+class GpiodGPIO:
+    """
+    GPIO through the character device with libgpiod v2.
+
+    Software PWM (LED, and backlight without kernel PWM) runs in a single
+    shared thread, only while some output is at a level other than fully
+    on or off. Its frequency is capped at PWM_MAX_FREQ, since sleeping
+    in Python cannot keep up with kHz rates.
+    """
+
+    name = "gpiod"
+    PWM_MAX_FREQ = 200
+    CONSUMER = "displayhatmini-lite"
+
+    def __init__(self, chip: str = None):
+        """
+        Args:
+            chip: GPIO chip device (default: the Pi's header controller).
+
+        Raises:
+            ImportError: If the libgpiod v2 Python bindings are not installed.
+        """
+        import gpiod
+
+        if not hasattr(gpiod, "request_lines"):
+            raise ImportError("GpiodGPIO needs the libgpiod v2 Python bindings (pip install gpiod>=2)")
+        from gpiod.line import Bias, Direction, Edge, Value
+
+        self._gpiod = gpiod
+        self._Bias = Bias
+        self._Direction = Direction
+        self._Edge = Edge
+        self._levels = {True: Value.ACTIVE, False: Value.INACTIVE}
+        self._active = Value.ACTIVE
+        self.chip = chip or find_gpio_chip()
+
+        self._outputs = {}
+        self._inputs = None
+        self._input_pins = ()
+
+        self._watch_thread = None
+        self._wake_r, self._wake_w = os.pipe()
+
+        # Shared software PWM: pin -> duty cycle (0.0-1.0 exclusive)
+        self._pwm_lock = threading.Condition()
+        self._pwm_duty = {}
+        self._pwm_period = 1.0 / self.PWM_MAX_FREQ
+        self._pwm_thread = None
+        self._closed = False
+
+    def setup_output(self, pin: int, value: bool) -> None:
+        """Request pin as an output at the given level."""
+        if pin in self._outputs:
+            self.output(pin, value)
+            return
+        settings = self._gpiod.LineSettings(direction=self._Direction.OUTPUT, output_value=self._levels[value])
+        self._outputs[pin] = self._gpiod.request_lines(self.chip, consumer=self.CONSUMER, config={pin: settings})
+
+    def output(self, pin: int, value: bool) -> None:
+        """Set an output pin's level."""
+        self._outputs[pin].set_value(pin, self._levels[bool(value)])
+
+    def setup_inputs(self, pins) -> None:
+        """Request all pins as inputs with pull-ups, in one bulk request."""
+        self._input_pins = tuple(pins)
+        settings = self._gpiod.LineSettings(direction=self._Direction.INPUT, bias=self._Bias.PULL_UP)
+        self._inputs = self._gpiod.request_lines(
+            self.chip, consumer=self.CONSUMER, config={self._input_pins: settings}
+        )
+
+    def input(self, pin: int) -> bool:
+        """Read an input pin's level."""
+        return self._inputs.get_value(pin) == self._active
+
+    def watch(self, pins, callback, bouncetime: int = 10) -> None:
+        """
+        Call callback(pin, timestamp_ns) on both edges of each pin.
+
+        Edge detection and debouncing are done by the kernel. A single
+        thread waits on the request's file descriptor and reads events in
+        batches, so there is no polling.
+        """
+        from datetime import timedelta
+
+        settings = self._gpiod.LineSettings(
+            direction=self._Direction.INPUT,
+            bias=self._Bias.PULL_UP,
+            edge_detection=self._Edge.BOTH,
+            debounce_period=timedelta(milliseconds=bouncetime),
+        )
+        self._inputs.reconfigure_lines(config={tuple(pins): settings})
+        self._callback = callback
+        if self._watch_thread is None:
+            self._watch_thread = threading.Thread(target=self._watch, name="displayhatmini-gpio", daemon=True)
+            self._watch_thread.start()
+
+    def pwm(self, pin: int, frequency: float):
+        """Return a software PWM object (start/ChangeDutyCycle/stop) for an output pin."""
+        return _SoftPWM(self, pin, frequency)
+
+    def close(self) -> None:
+        """Stop the event and PWM threads and release all lines."""
+        if self._closed:
+            return
+        os.write(self._wake_w, b"x")
+        if self._watch_thread is not None:
+            self._watch_thread.join(1.0)
+        with self._pwm_lock:
+            self._closed = True
+            self._pwm_duty.clear()
+            self._pwm_lock.notify()
+        if self._pwm_thread is not None:
+            self._pwm_thread.join(1.0)
+        for request in list(self._outputs.values()) + [self._inputs]:
+            if request is not None:
+                request.release()
+        self._outputs.clear()
+        self._inputs = None
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def _watch(self) -> None:
+        """Event thread: block on the line request fd and dispatch edges."""
+        import logging
+
+        request = self._inputs
+        while True:
+            ready, _, _ = select.select([request.fd, self._wake_r], [], [])
+            if self._wake_r in ready:
+                return
+            for event in request.read_edge_events():
+                try:
+                    self._callback(event.line_offset, event.timestamp_ns)
+                except Exception:
+                    # Like RPi.GPIO's callback thread: report it and keep watching
+                    logging.getLogger(__name__).exception("Button callback failed for pin %d", event.line_offset)
+
+    def _set_duty(self, pin: int, duty: float) -> None:
+        """Drive pin at duty (0.0-1.0); levels strictly between use the PWM thread."""
+        with self._pwm_lock:
+            if 0.0 < duty < 1.0:
+                self._pwm_duty[pin] = duty
+                if self._pwm_thread is None:
+                    self._pwm_thread = threading.Thread(target=self._run_pwm, name="displayhatmini-pwm", daemon=True)
+                    self._pwm_thread.start()
+                self._pwm_lock.notify()
+                return
+            # The PWM thread leaves pins alone once they are removed here
+            self._pwm_duty.pop(pin, None)
+            self.output(pin, duty >= 1.0)
+
+    def _run_pwm(self) -> None:
+        """PWM thread: one period at a time, all channels on, then off in duty order."""
+        while True:
+            with self._pwm_lock:
+                while not self._pwm_duty:
+                    if self._closed:
+                        return
+                    self._pwm_lock.wait()
+                channels = sorted(self._pwm_duty.items(), key=lambda item: item[1])
+            start = time.monotonic()
+            period = self._pwm_period
+            for pin, _duty in channels:
+                self._pwm_output(pin, True)
+            for pin, duty in channels:
+                delay = start + duty * period - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self._pwm_output(pin, False)
+            delay = start + period - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _pwm_output(self, pin: int, value: bool) -> None:
+        """Set a pin from the PWM thread, unless it has left PWM since the period started."""
+        with self._pwm_lock:
+            if pin in self._pwm_duty:
+                self.output(pin, value)
+
+
+class _SoftPWM:
+    """RPi.GPIO-style PWM object for GpiodGPIO."""
+
+    def __init__(self, gpio: GpiodGPIO, pin: int, frequency: float):
+        self._gpio = gpio
+        self._pin = pin
+        gpio._pwm_period = 1.0 / min(frequency, gpio.PWM_MAX_FREQ)
+
+    def start(self, duty_cycle: float) -> None:
+        """Start output at duty_cycle percent."""
+        self._gpio._set_duty(self._pin, duty_cycle / 100.0)
+
+    def ChangeDutyCycle(self, duty_cycle: float) -> None:  # noqa: N802 - RPi.GPIO name
+        """Change the duty cycle (percent)."""
+        self._gpio._set_duty(self._pin, duty_cycle / 100.0)
+
+    def stop(self) -> None:
+        """Stop pulsing; the pin keeps its current level."""
+        with self._gpio._pwm_lock:
+            self._gpio._pwm_duty.pop(self._pin, None)
+
+
+class NullGPIO:
+    """GPIO that drives nothing: outputs are remembered, inputs read high (buttons released)."""
+
+    name = "null"
+
+    def __init__(self):
+        self.levels = {}
+
+    def setup_output(self, pin: int, value: bool) -> None:
+        """Remember pin's level."""
+        self.levels[pin] = bool(value)
+
+    def output(self, pin: int, value: bool) -> None:
+        """Remember pin's level."""
+        self.levels[pin] = bool(value)
+
+    def setup_inputs(self, pins) -> None:
+        """Nothing to set up."""
+
+    def input(self, pin: int) -> bool:
+        """Return the pull-up level (True)."""
+        return True
+
+    def watch(self, pins, callback, bouncetime: int = 10) -> None:
+        """No edges ever arrive; call DisplayHATMini._handle_button() to script presses."""
+
+    def pwm(self, pin: int, frequency: float):
+        """Return a PWM object that only remembers its duty cycle."""
+        return _NullPWM()
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class _NullPWM:
+    """RPi.GPIO-style PWM object for NullGPIO."""
+
+    def __init__(self):
+        self.duty_cycle = None
+
+    def start(self, duty_cycle: float) -> None:
+        self.duty_cycle = duty_cycle
+
+    def ChangeDutyCycle(self, duty_cycle: float) -> None:  # noqa: N802 - RPi.GPIO name
+        self.duty_cycle = duty_cycle
+
+    def stop(self) -> None:
+        self.duty_cycle = None
+
+
+def open_gpio(backend="auto"):
+    """
+    Return a GPIO backend.
+
+    Args:
+        backend: "gpiod", "rpi-gpio", "null" (no hardware), "auto"
+                 (gpiod when the libgpiod v2 bindings are installed, else
+                 RPi.GPIO), or a backend object, which is returned as is.
+
+    Raises:
+        ValueError: If backend is not a known name.
+    """
+    if not isinstance(backend, str):
+        return backend
+    if backend == "auto":
+        try:
+            return GpiodGPIO()
+        except ImportError:
+            return RPiGPIO()
+    if backend == "gpiod":
+        return GpiodGPIO()
+    if backend == "rpi-gpio":
+        return RPiGPIO()
+    if backend == "null":
+        return NullGPIO()
+    raise ValueError(f"GPIO backend must be 'auto', 'gpiod', 'rpi-gpio' or 'null' (got {backend!r})")
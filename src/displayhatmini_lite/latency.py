@@ -0,0 +1,332 @@
+"""
+Press-to-photon latency measurement.
+
+A LatencyTracker follows each button edge through the stages that lead to
+the screen changing:
+
+    edge      the GPIO edge reaches the driver (edge callback thread)
+    callback  the application's button callback starts, and returns
+    draw      the first display()/blit()/fill() call once the callback has
+              started (a call made inside the callback counts)
+    complete  the pixels of that call have been sent to the panel
+
+It reports per-stage latency percentiles and histograms. All timestamps are
+time.monotonic_ns().
+
+Command line (press buttons on the HAT, or script presses on a mock panel):
+
+    python -m displayhatmini_lite.latency --presses 20
+    python -m displayhatmini_lite.latency --mock /tmp/panel.raw --presses 100
+"""
+
+import argparse
+import threading
+import time
+from collections import deque
+
+# Stage name: (start timestamp, end timestamp) attributes of a LatencyRecord
+STAGES = {
+    "dispatch": ("edge", "callback"),
+    "callback": ("callback", "handled"),
+    "draw": ("handled", "draw"),
+    "present": ("draw", "complete"),
+    "total": ("edge", "complete"),
+}
+
+
+class LatencyRecord:
+    """Timestamps (monotonic ns) of one button edge on its way to the screen."""
+
+    __slots__ = ("pin", "edge", "callback", "handled", "draw", "submitted", "complete")
+
+    def __init__(self, pin: int, edge: int):
+        self.pin = pin
+        self.edge = edge
+        self.callback = None
+        self.handled = None
+        self.draw = None
+        self.submitted = False
+        self.complete = None
+
+    def stage(self, name: str):
+        """Return the duration of a stage in milliseconds, or None if not reached."""
+        start, end = (getattr(self, attr) for attr in STAGES[name])
+        if start is None or end is None:
+            return None
+        # A frame drawn inside the callback has no wait after it
+        return max(0, end - start) / 1e6
+
+    def __repr__(self):
+        stages = ", ".join(f"{name}={self.stage(name)}" for name in STAGES)
+        return f"LatencyRecord(pin={self.pin}, {stages})"
+
+
+class LatencyTracker:
+    """
+    Measure button-to-panel latency on a DisplayHATMini.
+
+    Creating a tracker attaches it to the display; close() detaches it.
+    The first frame drawn once the button callback has started is the
+    response, including frames drawn by the callback itself (their draw
+    stage is 0). Edges that get no response within timeout seconds are
+    counted as unanswered.
+
+    Example:
+        tracker = LatencyTracker(display)
+        ...
+        print(tracker.report())
+    """
+
+    # Upper bounds of the histogram buckets, in milliseconds
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+    def __init__(self, display, max_records: int = 1000, timeout: float = 1.0):
+        """
+        Args:
+            display: The DisplayHATMini to instrument.
+            max_records: Number of completed records kept.
+            timeout: Seconds after which an edge with no response is dropped.
+        """
+        self._display = display
+        self._timeout_ns = int(timeout * 1e9)
+        self._lock = threading.Lock()
+        self._pending = []
+        self.records = deque(maxlen=max_records)
+        self.unanswered = 0
+        display._latency = self
+
+    def close(self) -> None:
+        """Stop tracking."""
+        if self._display._latency is self:
+            self._display._latency = None
+
+    def reset(self) -> None:
+        """Forget all records."""
+        with self._lock:
+            self._pending.clear()
+            self.records.clear()
+            self.unanswered = 0
+
+    # Hooks called by DisplayHATMini
+
+    def on_edge(self, pin: int, timestamp: int = None) -> LatencyRecord:
+        """A button edge arrived (timestamp defaults to now)."""
+        record = LatencyRecord(pin, timestamp or time.monotonic_ns())
+        with self._lock:
+            self._pending.append(record)
+        return record
+
+    def on_callback(self, record: LatencyRecord) -> None:
+        """The application's callback is about to run for this edge."""
+        record.callback = time.monotonic_ns()
+
+    def on_handled(self, record: LatencyRecord) -> None:
+        """The callback returned (or there is none): frames from now on respond."""
+        now = time.monotonic_ns()
+        if record.callback is None:
+            record.callback = now
+        record.handled = now
+
+    def discard(self, pin: int) -> None:
+        """
+        Stop tracking the edges of pin that have not been responded to.
+
+        Call it from the button callback for edges the application ignores
+        (e.g. releases), so the next unrelated frame is not taken as their
+        response.
+        """
+        with self._lock:
+            self._pending = [record for record in self._pending if record.pin != pin or record.draw is not None]
+
+    def on_draw(self) -> None:
+        """A drawing call started."""
+        if not self._pending:
+            return
+        now = time.monotonic_ns()
+        with self._lock:
+            self._expire(now)
+            for record in self._pending:
+                if record.callback is not None and record.draw is None:
+                    record.draw = now
+
+    def on_submit(self) -> None:
+        """The pixels of the drawing calls made so far have been handed to the bus."""
+        if not self._pending:
+            return
+        with self._lock:
+            for record in self._pending:
+                if record.draw is not None:
+                    record.submitted = True
+
+    def on_flushed(self) -> None:
+        """Everything submitted so far has reached the panel."""
+        if not self._pending:
+            return
+        now = time.monotonic_ns()
+        with self._lock:
+            self._expire(now)
+            pending = []
+            for record in self._pending:
+                if record.submitted:
+                    record.complete = now
+                    self.records.append(record)
+                else:
+                    pending.append(record)
+            self._pending = pending
+
+    def _expire(self, now: int) -> None:
+        """Count edges with no response for longer than timeout as unanswered (lock held)."""
+        pending = []
+        for record in self._pending:
+            if not record.submitted and now - record.edge > self._timeout_ns:
+                self.unanswered += 1
+            else:
+                pending.append(record)
+        self._pending = pending
+
+    # Reporting
+
+    def samples(self, stage: str = "total") -> list:
+        """Return the recorded durations of a stage in milliseconds."""
+        if stage not in STAGES:
+            raise ValueError(f"stage must be one of {tuple(STAGES)} (got {stage!r})")
+        with self._lock:
+            values = [record.stage(stage) for record in self.records]
+        return [value for value in values if value is not None]
+
+    def summary(self) -> dict:
+        """
+        Return latency percentiles per stage.
+
+        Returns:
+            {stage: {"count", "min", "p50", "p90", "p99", "max"}} in
+            milliseconds (None where there are no samples).
+        """
+        result = {}
+        for stage in STAGES:
+            values = sorted(self.samples(stage))
+            if not values:
+                result[stage] = {"count": 0, "min": None, "p50": None, "p90": None, "p99": None, "max": None}
+                continue
+
+            def percentile(p):
+                return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+            result[stage] = {
+                "count": len(values),
+                "min": values[0],
+                "p50": percentile(50),
+                "p90": percentile(90),
+                "p99": percentile(99),
+                "max": values[-1],
+            }
+        return result
+
+    def histogram(self, stage: str = "total") -> list:
+        """
+        Return a latency histogram of a stage.
+
+        Returns:
+            [(upper bound in ms, count), ...] over BUCKETS_MS, with a final
+            (None, count) bucket for anything slower.
+        """
+        counts = [0] * (len(self.BUCKETS_MS) + 1)
+        for value in self.samples(stage):
+            for i, bound in enumerate(self.BUCKETS_MS):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return list(zip(self.BUCKETS_MS + (None,), counts))
+
+    def report(self, stage: str = "total") -> str:
+        """Return the summary and one histogram as printable text."""
+        lines = [f"{'stage':<10}{'count':>7}{'min':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)"]
+        for name, row in self.summary().items():
+            values = "".join(
+                f"{row[key]:9.2f}" if row[key] is not None else f"{'-':>9}"
+                for key in ("min", "p50", "p90", "p99", "max")
+            )
+            lines.append(f"{name:<10}{row['count']:7d}{values}")
+        lines.append(f"unanswered edges: {self.unanswered}")
+        lines.append("")
+        lines.append(f"{stage} latency histogram:")
+        histogram = self.histogram(stage)
+        peak = max((count for _, count in histogram), default=0) or 1
+        for bound, count in histogram:
+            label = f"<= {bound} ms" if bound is not None else f"> {self.BUCKETS_MS[-1]} ms"
+            lines.append(f"{label:>12} {count:6d} {'#' * round(40 * count / peak)}".rstrip())
+        return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    """Command line entry point: measure latency with a simple responding app."""
+    parser = argparse.ArgumentParser(
+        prog="python -m displayhatmini_lite.latency",
+        description="Measure button press to panel latency on Display HAT Mini",
+    )
+    parser.add_argument("--presses", type=int, default=20, help="Number of presses to measure (default: 20)")
+    parser.add_argument("--fps", type=float, default=30, help="Frame rate of the test app's draw loop (default: 30)")
+    parser.add_argument("--immediate", action="store_true", help="Draw from the button callback instead of the loop")
+    parser.add_argument(
+        "--mock",
+        metavar="FILE",
+        help="Use a file as the panel (fbdev backend, no GPIO) and script the presses",
+    )
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between scripted presses (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    from PIL import Image
+
+    from . import DisplayHATMini
+
+    if args.mock:
+        size = DisplayHATMini.WIDTH * DisplayHATMini.HEIGHT * 2
+        with open(args.mock, "ab") as f:
+            f.truncate(size)
+        display = DisplayHATMini(backend="fbdev", fb_device=args.mock, gpio="null")
+    else:
+        display = DisplayHATMini()
+    display.set_backlight(1.0)
+
+    frames = [Image.new("RGB", (display.WIDTH, display.HEIGHT), color) for color in ("navy", "darkgreen")]
+    state = {"frame": 0, "dirty": True}
+    tracker = LatencyTracker(display)
+
+    def on_button(pin):
+        if not (args.mock or display.read_button(pin)):
+            tracker.discard(pin)  # A release; only presses get a response
+            return
+        state["frame"] ^= 1
+        state["dirty"] = True
+        if args.immediate:
+            display.display(frames[state["frame"]])
+
+    display.on_button_pressed(on_button)
+
+    def script_presses():
+        for _ in range(args.presses):
+            time.sleep(args.interval)
+            display._handle_button(DisplayHATMini.BUTTON_A)
+
+    if args.mock:
+        threading.Thread(target=script_presses, daemon=True).start()
+    else:
+        print(f"Press any button {args.presses} times...")
+
+    interval = 1.0 / args.fps
+    try:
+        while len(tracker.records) < args.presses:
+            if state["dirty"] and not args.immediate:
+                state["dirty"] = False
+                display.display(frames[state["frame"]])
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    print(tracker.report())
+    display.set_backlight(0)
+
+
+if __name__ == "__main__":
+    main()
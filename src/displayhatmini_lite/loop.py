@@ -0,0 +1,220 @@
+"""
+Fixed-timestep run loop for games and interactive apps.
+
+Game state advances in fixed ticks (e.g. 1/60 s), independent of how long
+rendering takes, so physics behaves the same at any frame rate. Each frame
+the loop runs as many ticks as the elapsed time calls for, renders once,
+then sleeps until the next frame's deadline.
+
+Pacing uses time.monotonic_ns(). The loop sleeps until just before the
+deadline and spins for the last fraction of a millisecond. At low frame
+rates nearly all the time is spent asleep, and at high ones frames still
+start on time. With a governor on the display (enable_governor()), the
+frame rate is capped at its current fps.
+"""
+
+import time
+from collections import namedtuple
+
+# Buttons sampled at the start of a tick: all held pins, and the pins that
+# went down or up since the previous tick (frozensets of GPIO numbers)
+Input = namedtuple("Input", "held pressed released")
+
+
+class LoopStats:
+    """Frame pacing counters for one run() call."""
+
+    def __init__(self):
+        self.frames = 0
+        self.ticks = 0
+        self.overruns = 0
+        self.dropped_ticks = 0
+        self.busy_time = 0.0
+        self.max_frame_time = 0.0
+        self.slack_time = 0.0
+        self.min_slack = None
+        self.elapsed = 0.0
+
+    @property
+    def frame_time(self) -> float:
+        """Average seconds of work (ticks and rendering) per frame."""
+        return self.busy_time / self.frames if self.frames else 0.0
+
+    @property
+    def slack(self) -> float:
+        """Average seconds left before each frame's deadline."""
+        return self.slack_time / self.frames if self.frames else 0.0
+
+    @property
+    def fps(self) -> float:
+        """Frames rendered per second of wall-clock time."""
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        """Return the stats as a plain dict."""
+        return {
+            "frames": self.frames,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "dropped_ticks": self.dropped_ticks,
+            "fps": self.fps,
+            "frame_time": self.frame_time,
+            "max_frame_time": self.max_frame_time,
+            "slack": self.slack,
+            "min_slack": self.min_slack,
+        }
+
+    def __repr__(self):
+        return (
+            f"LoopStats(frames={self.frames}, ticks={self.ticks}, fps={self.fps:.1f}, "
+            f"frame_time={self.frame_time * 1000:.2f}ms, slack={self.slack * 1000:.2f}ms, "
+            f"overruns={self.overruns}, dropped_ticks={self.dropped_ticks})"
+        )
+
+
+class GameLoop:
+    """
+    Call update() at a fixed tick rate and render() once per frame.
+
+    Example:
+        def update(dt, buttons):
+            if DisplayHATMini.BUTTON_A in buttons.held:
+                paddle.y -= 200 * dt
+
+        def render(alpha):
+            sprite.move(paddle.x, paddle.y)
+
+        loop = GameLoop(display, update, render, tick_rate=60)
+        loop.run()
+    """
+
+    def __init__(
+        self,
+        display,
+        update,
+        render=None,
+        tick_rate: float = 60,
+        frame_rate: float = None,
+        max_catchup: int = 5,
+        spin: float = 0.0002,
+    ):
+        """
+        Args:
+            display: The DisplayHATMini whose buttons are sampled.
+            update: Called as update(dt, buttons) once per tick, with dt the
+                    tick length in seconds and buttons an Input.
+            render: Called as render(alpha) once per frame. alpha (0.0-1.0)
+                    is how far time has moved into the next tick, for
+                    optional interpolation.
+            tick_rate: Updates per second.
+            frame_rate: Frames per second (default: tick_rate).
+            max_catchup: Most ticks run in one frame after a stall; time
+                         beyond that is dropped rather than fast-forwarded.
+            spin: Seconds before each deadline to stop sleeping and spin,
+                  absorbing the scheduler's wake-up latency.
+
+        Raises:
+            ValueError: If a rate is not positive or max_catchup is below 1.
+        """
+        frame_rate = frame_rate or tick_rate
+        for name, value in (("tick_rate", tick_rate), ("frame_rate", frame_rate)):
+            if value <= 0:
+                raise ValueError(f"{name} must be positive (got {value})")
+        if max_catchup < 1:
+            raise ValueError(f"max_catchup must be at least 1 (got {max_catchup})")
+
+        self._display = display
+        self._update = update
+        self._render = render
+        self.tick_rate = tick_rate
+        self.frame_rate = frame_rate
+        self.max_catchup = max_catchup
+        self.spin = spin
+        self._running = False
+        self._held = frozenset()
+        self.stats = LoopStats()
+
+    def stop(self) -> None:
+        """Make run() return after the current frame (callable from update/render)."""
+        self._running = False
+
+    def run(self, duration: float = None) -> LoopStats:
+        """
+        Run until stop() is called or duration seconds pass.
+
+        Args:
+            duration: Maximum run time in seconds (None = no limit).
+
+        Returns:
+            LoopStats for this run (also available as .stats).
+        """
+        self.stats = stats = LoopStats()
+        tick_ns = round(1e9 / self.tick_rate)
+        dt = tick_ns / 1e9
+        end = None if duration is None else time.monotonic_ns() + round(duration * 1e9)
+
+        self._running = True
+        start = previous = deadline = time.monotonic_ns()
+        accumulator = 0
+        while self._running:
+            now = time.monotonic_ns()
+            if end is not None and now >= end:
+                break
+            accumulator += now - previous
+            previous = now
+
+            ticks = 0
+            while accumulator >= tick_ns:
+                if ticks == self.max_catchup:
+                    stats.dropped_ticks += accumulator // tick_ns
+                    accumulator %= tick_ns
+                    break
+                self._update(dt, self._sample())
+                accumulator -= tick_ns
+                ticks += 1
+            stats.ticks += ticks
+
+            if self._render is not None:
+                self._render(accumulator / tick_ns)
+            stats.frames += 1
+
+            done = time.monotonic_ns()
+            busy = (done - now) / 1e9
+            stats.busy_time += busy
+            stats.max_frame_time = max(stats.max_frame_time, busy)
+
+            deadline += self._frame_ns()
+            slack = (deadline - done) / 1e9
+            stats.slack_time += max(slack, 0.0)
+            stats.min_slack = slack if stats.min_slack is None else min(stats.min_slack, slack)
+            if slack < 0:
+                # Missed the deadline: start the next frame now, don't try to catch up
+                stats.overruns += 1
+                deadline = done
+            else:
+                self._sleep_until(deadline)
+
+        stats.elapsed = (time.monotonic_ns() - start) / 1e9
+        return stats
+
+    def _frame_ns(self) -> int:
+        """Nanoseconds per frame, at frame_rate or the governor's lower fps."""
+        rate = self.frame_rate
+        governor = self._display.governor
+        if governor is not None:
+            rate = min(rate, governor.fps)
+        return round(1e9 / rate)
+
+    def _sample(self) -> Input:
+        """Read all buttons once and work out the edges since the last tick."""
+        held = self._display.read_buttons()
+        previous, self._held = self._held, held
+        return Input(held, held - previous, previous - held)
+
+    def _sleep_until(self, deadline: int) -> None:
+        """Sleep until just before deadline (monotonic ns), then spin to it."""
+        remaining = (deadline - time.monotonic_ns()) / 1e9 - self.spin
+        if remaining > 0:
+            time.sleep(remaining)
+        while time.monotonic_ns() < deadline:
+            pass
@@ -0,0 +1,201 @@
+"""
+Pixel packing helpers for the ST7789 panel.
+
+Everything here stays inside Pillow's C code (split/point/add/merge), so
+frames are packed without NumPy and without per-pixel Python loops.
+
+Palette ("P"), greyscale ("L") and 1-bit images skip the RGB conversion.
+Their pixel values are mapped straight to the two RGB565 bytes through
+256-entry lookup tables, built once per palette.
+"""
+
+from PIL import Image, ImageChops, ImageColor
+
+# Lookup tables for big-endian RGB565: RRRRRGGG GGGBBBBB
+_R565_HI = [v & 0xF8 for v in range(256)]
+_G565_HI = [v >> 5 for v in range(256)]
+_G565_LO = [(v << 3) & 0xE0 for v in range(256)]
+_B565_LO = [v >> 3 for v in range(256)]
+
+# Lookup tables for RGB444, two pixels in three bytes: RRRRGGGG BBBBRRRR GGGGBBBB
+_HI444 = [v & 0xF0 for v in range(256)]
+_LO444 = [v >> 4 for v in range(256)]
+
+# Lookup tables back from big-endian RGB565 to 8-bit channels (high bits repeated)
+_R565_TO_R = [(v & 0xF8) | (v >> 5) for v in range(256)]
+_HI565_TO_G = [((v & 0x07) << 5) | ((v & 0x07) >> 1) for v in range(256)]
+_LO565_TO_G = [(v >> 5) << 2 for v in range(256)]
+_B565_TO_B = [((v & 0x1F) << 3) | ((v & 0x1F) >> 2) for v in range(256)]
+
+
+def _expand5(v: int) -> int:
+    return (v << 1) | (v >> 3)
+
+
+def _expand6(v: int) -> int:
+    return (v << 2) | (v >> 2)
+
+
+# Lookup tables from the bytes A B C of an RGB444 pixel pair to its RGB565 bytes
+_A444_TO_HI1 = [(_expand5(v >> 4) << 3) | (_expand6(v & 0x0F) >> 3) for v in range(256)]
+_A444_TO_LO1 = [(_expand6(v & 0x0F) & 0x07) << 5 for v in range(256)]
+_B444_TO_LO1 = [_expand5(v >> 4) for v in range(256)]
+_B444_TO_HI2 = [_expand5(v & 0x0F) << 3 for v in range(256)]
+_C444_TO_HI2 = [_expand6(v >> 4) >> 3 for v in range(256)]
+_C444_TO_LO2 = [((_expand6(v >> 4) & 0x07) << 5) | _expand5(v & 0x0F) for v in range(256)]
+
+# 4x4 Bayer matrix, used as per-pixel offsets before truncating to 4 bits
+_BAYER4 = (
+    (0, 8, 2, 10),
+    (12, 4, 14, 6),
+    (3, 11, 1, 9),
+    (15, 7, 13, 5),
+)
+_threshold_cache = {}
+
+# RGB565 (high byte, low byte) lookup tables per palette, keyed by its RGB bytes
+_palette_luts = {}
+_PALETTE_CACHE_SIZE = 32
+
+
+def _lut565(palette: bytes) -> tuple:
+    """Return point() tables mapping index i to the high and low RGB565 bytes of palette entry i."""
+    hi = [0] * 256
+    lo = [0] * 256
+    for i in range(min(len(palette) // 3, 256)):
+        r, g, b = palette[i * 3:i * 3 + 3]
+        value = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+        hi[i] = value >> 8
+        lo[i] = value & 0xFF
+    return hi, lo
+
+
+_GREY565 = _lut565(bytes(v for v in range(256) for _ in range(3)))
+
+
+def rgb565_color(color) -> bytes:
+    """
+    Encode a single (r, g, b) colour as two big-endian RGB565 bytes.
+
+    Args:
+        color: An (r, g, b) tuple with 0-255 components, or any colour
+               string PIL understands (e.g. "black", "#ff8000").
+    """
+    if isinstance(color, str):
+        color = ImageColor.getrgb(color)
+    r, g, b = color[:3]
+    value = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+    return bytes((value >> 8, value & 0xFF))
+
+
+def to_rgb565(image: Image.Image) -> bytes:
+    """
+    Encode a PIL Image as big-endian RGB565 bytes, row by row.
+
+    Args:
+        image: Any PIL Image. Non-RGB modes are converted first.
+
+    Returns:
+        width * height * 2 bytes, ready to stream to the panel.
+    """
+    if image.mode in ("P", "L", "1"):
+        return _indexed_rgb565(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    r, g, b = image.split()
+    hi = ImageChops.add(r.point(_R565_HI), g.point(_G565_HI))
+    lo = ImageChops.add(g.point(_G565_LO), b.point(_B565_LO))
+    # "LA" interleaves the two bands, giving hi/lo byte pairs per pixel
+    return Image.merge("LA", (hi, lo)).tobytes()
+
+
+def _indexed_rgb565(image: Image.Image) -> bytes:
+    """Encode a P, L or 1 image through per-value RGB565 lookup tables."""
+    if image.mode == "P":
+        palette = bytes(image.getpalette() or ())
+        luts = _palette_luts.get(palette)
+        if luts is None:
+            if len(_palette_luts) >= _PALETTE_CACHE_SIZE:
+                _palette_luts.clear()
+            luts = _palette_luts[palette] = _lut565(palette)
+        # The palette indices, viewed as a greyscale image
+        values = Image.frombytes("L", image.size, image.tobytes())
+    else:
+        luts = _GREY565
+        values = image if image.mode == "L" else image.convert("L")
+    hi, lo = luts
+    return Image.merge("LA", (values.point(hi), values.point(lo))).tobytes()
+
+
+def to_rgb444(image: Image.Image, dither: bool = False) -> bytes:
+    """
+    Encode a PIL Image as packed 12-bit RGB444, two pixels per three bytes.
+
+    In the RGB byte stream each output byte is the high nibble of one
+    channel byte followed by the high nibble of the next, so packing is a
+    pairwise merge of consecutive bytes.
+
+    Args:
+        image: Any PIL Image with an even number of pixels. Non-RGB modes
+               are converted first.
+        dither: If True, apply 4x4 ordered dithering before truncation.
+
+    Returns:
+        width * height * 3 / 2 bytes, ready to stream to the panel.
+    """
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if dither:
+        image = ImageChops.add(image, _threshold_image(image.size))
+    raw = image.tobytes()
+    # Reinterpret the byte stream as (even, odd) byte pairs
+    hi, lo = Image.frombytes("LA", (len(raw) // 2, 1), raw).split()
+    return ImageChops.add(hi.point(_HI444), lo.point(_LO444)).tobytes()
+
+
+def from_rgb565(data, size) -> Image.Image:
+    """
+    Decode big-endian RGB565 bytes into an RGB image.
+
+    Args:
+        data: width * height * 2 bytes of RGB565 (any buffer).
+        size: (width, height) of the image.
+    """
+    hi, lo = Image.frombytes("LA", size, bytes(data)).split()
+    r = hi.point(_R565_TO_R)
+    g = ImageChops.add(hi.point(_HI565_TO_G), lo.point(_LO565_TO_G))
+    b = lo.point(_B565_TO_B)
+    return Image.merge("RGB", (r, g, b))
+
+
+def rgb444_to_rgb565(data) -> bytes:
+    """
+    Convert packed RGB444 (as from to_rgb444()) to big-endian RGB565.
+
+    Each channel is widened by repeating its high bits, as the panel does.
+
+    Args:
+        data: A multiple of three bytes of RGB444, two pixels per three bytes.
+
+    Returns:
+        Four bytes of RGB565 per three input bytes.
+    """
+    # Each (A, B, C) byte triplet holds one pixel pair
+    a, b, c = Image.frombytes("RGB", (len(data) // 3, 1), bytes(data)).split()
+    hi1 = a.point(_A444_TO_HI1)
+    lo1 = ImageChops.add(a.point(_A444_TO_LO1), b.point(_B444_TO_LO1))
+    hi2 = ImageChops.add(b.point(_B444_TO_HI2), c.point(_C444_TO_HI2))
+    lo2 = c.point(_C444_TO_LO2)
+    return Image.merge("RGBA", (hi1, lo1, hi2, lo2)).tobytes()
+
+
+def _threshold_image(size) -> Image.Image:
+    """Return the tiled Bayer threshold image for a size, built once per size."""
+    threshold = _threshold_cache.get(size)
+    if threshold is None:
+        width, height = size
+        rows = [bytes(_BAYER4[y % 4][x % 4] for x in range(width)) for y in range(4)]
+        band = Image.frombytes("L", size, b"".join(rows[y % 4] for y in range(height)))
+        threshold = Image.merge("RGB", (band, band, band))
+        _threshold_cache[size] = threshold
+    return threshold
@@ -0,0 +1,211 @@
+"""
+Animation playback with decode-ahead and frame dropping.
+
+Frames are decoded and packed for the panel in a worker thread, into a
+small bounded queue. The presenting thread only waits for each frame's
+wall-clock timestamp and pushes it over SPI. Frames that are already late
+are dropped, so playback keeps to real time.
+
+Pillow releases the GIL while decoding and converting, so the worker
+genuinely overlaps with the SPI transfer of the previous frame.
+"""
+
+import queue
+import threading
+import time
+
+from PIL import Image, ImageSequence
+
+# Frame duration used when neither fps nor the image gives one
+DEFAULT_FRAME_MS = 100
+
+# Marks the end of the frame stream in the queue
+_END = object()
+
+
+def iter_frames(source, fps: float = None):
+    """
+    Yield (image, duration in seconds) for one pass over an animation source.
+
+    Args:
+        source: A path or PIL Image (animated GIF/PNG/WebP), or an iterable
+                of PIL Images and/or paths.
+        fps: Fixed frame rate. If None, per-frame durations from the image
+             are used (falling back to DEFAULT_FRAME_MS).
+    """
+    def duration(image):
+        if fps:
+            return 1.0 / fps
+        return (image.info.get("duration") or DEFAULT_FRAME_MS) / 1000.0
+
+    if isinstance(source, str):
+        with Image.open(source) as image:
+            yield from iter_frames(image, fps)
+        return
+    if isinstance(source, Image.Image):
+        for frame in ImageSequence.Iterator(source):
+            yield frame.convert("RGB"), duration(frame)
+        return
+
+    for item in source:
+        if isinstance(item, str):
+            with Image.open(item) as image:
+                yield image.convert("RGB"), duration(image)
+        else:
+            yield item, duration(item)
+
+
+class PlaybackStats:
+    """Counters for one play() call."""
+
+    def __init__(self):
+        self.presented = 0
+        self.dropped = 0
+        self.media_time = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def target_fps(self) -> float:
+        """Frame rate the source asked for, averaged over the frames reached."""
+        frames = self.presented + self.dropped
+        return frames / self.media_time if self.media_time else 0.0
+
+    @property
+    def achieved_fps(self) -> float:
+        """Frames actually pushed to the panel per second of wall-clock time."""
+        return self.presented / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        """Return the stats as a plain dict."""
+        return {
+            "presented": self.presented,
+            "dropped": self.dropped,
+            "target_fps": self.target_fps,
+            "achieved_fps": self.achieved_fps,
+            "elapsed": self.elapsed,
+        }
+
+    def __repr__(self):
+        return (
+            f"PlaybackStats(presented={self.presented}, dropped={self.dropped}, "
+            f"target_fps={self.target_fps:.1f}, achieved_fps={self.achieved_fps:.1f})"
+        )
+
+
+class AnimationPlayer:
+    """
+    Play an animated image or image sequence on a DisplayHATMini.
+
+    Example:
+        player = AnimationPlayer(display, "boot.gif", loop=True)
+        stats = player.play(duration=10)
+        print(stats)
+    """
+
+    def __init__(self, display, source, fps: float = None, loop: bool = False, queue_size: int = 4):
+        """
+        Args:
+            display: The DisplayHATMini to play on.
+            source: A path or PIL Image (animated GIF/PNG/WebP), or an iterable
+                    of PIL Images and/or paths.
+            fps: Fixed frame rate. If None, per-frame durations from the
+                 image are used (falling back to DEFAULT_FRAME_MS).
+            loop: If True, restart from the first frame at the end.
+            queue_size: Number of frames decoded ahead.
+        """
+        if fps is not None and fps <= 0:
+            raise ValueError(f"fps must be positive (got {fps})")
+        self._display = display
+        self._source = source
+        self._fps = fps
+        self._loop = loop
+        self._queue_size = queue_size
+        self._stop = threading.Event()
+        self._start_time = None
+        self.stats = PlaybackStats()
+
+    def stop(self) -> None:
+        """Stop playback; play() returns after the current frame."""
+        self._stop.set()
+
+    def play(self, duration: float = None) -> PlaybackStats:
+        """
+        Play until the source ends, duration seconds pass, or stop() is called.
+
+        Args:
+            duration: Maximum playback time in seconds (None = no limit).
+
+        Returns:
+            PlaybackStats for this run (also available as .stats).
+        """
+        self._stop.clear()
+        self.stats = stats = PlaybackStats()
+        frames = queue.Queue(maxsize=self._queue_size)
+        worker = threading.Thread(target=self._decode, args=(frames,), daemon=True)
+
+        self._start_time = start = time.monotonic()
+        worker.start()
+        try:
+            while not self._stop.is_set():
+                try:
+                    item = frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue  # Nothing decoded yet; check for stop() again
+                if item is _END:
+                    break
+                data, pts, frame_time = item
+                if duration is not None and pts >= duration:
+                    break
+                stats.media_time = pts + frame_time
+
+                now = time.monotonic() - start
+                if now >= pts + frame_time:
+                    # The frame's slot has already passed - drop it
+                    stats.dropped += 1
+                    continue
+                if now < pts:
+                    self._stop.wait(pts - now)
+                    if self._stop.is_set():
+                        break
+                self._display.display_raw(data)
+                stats.presented += 1
+        finally:
+            stats.elapsed = time.monotonic() - start
+            self._stop.set()
+            # Unblock the worker if it is waiting on a full queue
+            while worker.is_alive():
+                try:
+                    frames.get_nowait()
+                except queue.Empty:
+                    worker.join(0.01)
+        return stats
+
+    def _decode(self, frames: queue.Queue) -> None:
+        """Worker: decode and encode frames ahead into the queue."""
+        pts = 0.0
+        try:
+            while not self._stop.is_set():
+                produced = False
+                for image, frame_time in iter_frames(self._source, self._fps):
+                    if self._stop.is_set():
+                        return
+                    produced = True
+                    late = time.monotonic() - self._start_time >= pts + frame_time
+                    # Late frames are still queued (to be counted as dropped)
+                    # but skip the resize and pixel packing
+                    data = None if late else self._display.encode(image)
+                    self._put(frames, (data, pts, frame_time))
+                    pts += frame_time
+                if not (self._loop and produced):
+                    break
+        finally:
+            self._put(frames, _END)
+
+    def _put(self, frames: queue.Queue, item) -> None:
+        """Put an item into the queue, giving up if playback stops."""
+        while not self._stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
@@ -0,0 +1,175 @@
+"""
+Idle power management: dim, then blank the display when nothing happens.
+
+Activity is any button edge or any changed pixels sent to the panel.
+Identical full frames are not pushed and do not count as activity, so an
+application that redraws the same screen on a timer still goes idle.
+
+States:
+
+    active  normal operation
+    dim     backlight lowered to dim_level
+    blank   backlight off, LED PWM threads stopped, panel in sleep mode
+
+Any activity returns straight to active. Button wake-ups run in the GPIO
+edge callback, so the screen comes back without waiting for the
+application's next frame.
+"""
+
+import threading
+import time
+
+STATES = ("active", "dim", "blank")
+
+
+class IdleManager:
+    """
+    Drive a DisplayHATMini through active, dim and blank states.
+
+    Created by DisplayHATMini.enable_idle(); not normally constructed directly.
+
+    Example:
+        idle = display.enable_idle(dim_after=30, blank_after=120)
+        ...
+        print(idle.state, idle.stats())
+    """
+
+    def __init__(
+        self,
+        display,
+        dim_after: float = 30.0,
+        blank_after: float = 120.0,
+        dim_level: float = 0.1,
+        sleep_panel: bool = True,
+    ):
+        """
+        Args:
+            display: The DisplayHATMini to manage.
+            dim_after: Seconds without activity before dimming (None = never).
+            blank_after: Seconds without activity before blanking (None = never).
+            dim_level: Backlight level while dimmed (0.0-1.0).
+            sleep_panel: If True, put the panel into sleep mode when blanked.
+
+        Raises:
+            ValueError: If a timeout is not positive, blank_after is not after
+                        dim_after, or dim_level is outside 0.0-1.0.
+        """
+        for name, value in (("dim_after", dim_after), ("blank_after", blank_after)):
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive (got {value})")
+        if dim_after is not None and blank_after is not None and blank_after <= dim_after:
+            raise ValueError(f"blank_after must be later than dim_after (got {blank_after} <= {dim_after})")
+        if not 0.0 <= dim_level <= 1.0:
+            raise ValueError(f"dim_level must be between 0.0 and 1.0 (got {dim_level})")
+
+        self._display = display
+        self.dim_after = dim_after
+        self.blank_after = blank_after
+        self.dim_level = dim_level
+        self.sleep_panel = sleep_panel
+
+        self._state = "active"
+        self._cond = threading.Condition()
+        self._closed = False
+        self._last_activity = time.monotonic()
+
+        # Wall-clock and process CPU seconds spent in each state
+        self._since = self._last_activity
+        self._cpu_since = time.process_time()
+        self._totals = {state: [0.0, 0.0] for state in STATES}
+        self.wakeups = 0
+
+        self._thread = threading.Thread(target=self._run, name="displayhatmini-idle", daemon=True)
+        self._thread.start()
+
+    @property
+    def state(self) -> str:
+        """Current state: "active", "dim" or "blank"."""
+        return self._state
+
+    def activity(self) -> None:
+        """Record activity, waking the display if it is dimmed or blanked."""
+        self._last_activity = time.monotonic()
+        if self._state != "active":
+            with self._cond:
+                if self._state != "active":
+                    self._enter("active")
+                    self.wakeups += 1
+                self._cond.notify()
+
+    def stats(self) -> dict:
+        """
+        Return time and CPU use per state.
+
+        Returns:
+            {state: {"seconds": ..., "cpu_seconds": ..., "cpu_percent": ...}}
+            where CPU is the whole process's CPU time while in that state.
+        """
+        with self._cond:
+            now = time.monotonic()
+            cpu = time.process_time()
+            result = {}
+            for state, (seconds, cpu_seconds) in self._totals.items():
+                if state == self._state:
+                    seconds += now - self._since
+                    cpu_seconds += cpu - self._cpu_since
+                result[state] = {
+                    "seconds": seconds,
+                    "cpu_seconds": cpu_seconds,
+                    "cpu_percent": 100.0 * cpu_seconds / seconds if seconds else 0.0,
+                }
+            return result
+
+    def close(self) -> None:
+        """Stop the idle timer and restore the display to active."""
+        with self._cond:
+            self._closed = True
+            if self._state != "active":
+                self._enter("active")
+            self._cond.notify()
+        self._thread.join(1.0)
+
+    def _run(self) -> None:
+        """Timer thread: step through the idle states as timeouts pass."""
+        with self._cond:
+            while not self._closed:
+                state, at = self._next_transition()
+                if state is None:
+                    self._cond.wait()
+                    continue
+                delay = at - time.monotonic()
+                if delay > 0:
+                    # Activity moves _last_activity on; recheck when this expires
+                    self._cond.wait(delay)
+                    continue
+                self._enter(state)
+
+    def _next_transition(self):
+        """Return (next state, monotonic time it is due), or (None, None)."""
+        if self._state == "active" and self.dim_after is not None:
+            return "dim", self._last_activity + self.dim_after
+        if self._state != "blank" and self.blank_after is not None:
+            return "blank", self._last_activity + self.blank_after
+        return None, None
+
+    def _enter(self, state: str) -> None:
+        """Apply a state to the display and account the time spent in the old one."""
+        now = time.monotonic()
+        cpu = time.process_time()
+        totals = self._totals[self._state]
+        totals[0] += now - self._since
+        totals[1] += cpu - self._cpu_since
+        self._since = now
+        self._cpu_since = cpu
+
+        display = self._display
+        with display._io_lock:
+            previous, self._state = self._state, state
+            if previous == "blank":
+                display._power_up()
+            if state == "dim":
+                display._apply_backlight(min(display._backlight_level, self.dim_level))
+            elif state == "blank":
+                display._power_down(self.sleep_panel)
+            elif previous == "dim":
+                display._apply_backlight(display._backlight_level)
@@ -0,0 +1,306 @@
+"""
+Remote view: stream the shadow framebuffer to viewers over a socket.
+
+A RemoteViewServer serves a display created with shadow=True. Each
+connected viewer first receives the whole screen, then only the
+rectangles that changed, at most max_fps updates per second. Changes made
+between two updates are merged, so a viewer costs the device at most
+max_fps compressed updates per second, however fast it draws. Every viewer
+has its own thread and reads the shadow copy, never the panel. A slow or
+stalled viewer therefore only delays its own updates.
+
+The server listens on localhost TCP by default, or on a UNIX socket when
+given a path. Protocol (all integers little-endian):
+
+    hello   "<4sHHH"  magic b"DHMV", version, width, height
+    update  "<HHHHI"  x, y, w, h, length, then length bytes of
+                      zlib-compressed big-endian RGB565
+
+Viewers (on the device, or through an SSH tunnel):
+
+    python -m displayhatmini_lite.remote snapshot 127.0.0.1:8320 screen.png
+    python -m displayhatmini_lite.remote view 127.0.0.1:8320
+"""
+
+import argparse
+import os
+import socket
+import stat
+import struct
+import threading
+import time
+import zlib
+
+MAGIC = b"DHMV"
+VERSION = 1
+DEFAULT_ADDRESS = ("127.0.0.1", 8320)
+
+_HELLO = struct.Struct("<4sHHH")
+_UPDATE = struct.Struct("<HHHHI")
+
+
+def parse_address(text: str):
+    """Return (host, port) for "host:port" or ":port", or text itself as a UNIX socket path."""
+    if "/" in text or ":" not in text:
+        return text
+    host, port = text.rsplit(":", 1)
+    return host or DEFAULT_ADDRESS[0], int(port)
+
+
+def _open_socket(address):
+    """Return an unconnected socket of the family matching address."""
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    return socket.socket(family, socket.SOCK_STREAM)
+
+
+class RemoteViewServer:
+    """
+    Serve a display's shadow framebuffer to remote viewers.
+
+    Created by DisplayHATMini.enable_remote_view(); not normally
+    constructed directly.
+
+    Example:
+        display = DisplayHATMini(shadow=True)
+        display.enable_remote_view(max_fps=5)
+    """
+
+    def __init__(self, shadow, address=DEFAULT_ADDRESS, max_fps: float = 10, max_clients: int = 4):
+        """
+        Args:
+            shadow: The ShadowFramebuffer to serve.
+            address: (host, port) to listen on, or a UNIX socket path.
+            max_fps: Most updates per second sent to each viewer.
+            max_clients: Most viewers connected at once; more are refused.
+
+        Raises:
+            ValueError: If max_fps or max_clients is not positive.
+            OSError: If the address cannot be bound (also if a UNIX socket
+                     path exists and is not a socket).
+        """
+        if max_fps <= 0:
+            raise ValueError(f"max_fps must be positive (got {max_fps})")
+        if max_clients <= 0:
+            raise ValueError(f"max_clients must be positive (got {max_clients})")
+        self._shadow = shadow
+        self.max_fps = max_fps
+        self.max_clients = max_clients
+        self.clients = 0
+        self.updates_sent = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._socket = _open_socket(address)
+        if isinstance(address, str):
+            try:
+                if stat.S_ISSOCK(os.stat(address).st_mode):
+                    os.unlink(address)  # Left behind by an earlier process
+            except FileNotFoundError:
+                pass
+        else:
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(address)
+        self._socket.listen(max_clients)
+        self.address = self._socket.getsockname()
+        self._thread = threading.Thread(target=self._accept, name="displayhatmini-remote", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop listening and disconnect all viewers."""
+        self._closed = True
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        if isinstance(self.address, str):
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+        self._thread.join(1.0)
+
+    def _accept(self) -> None:
+        """Listening thread: one thread per viewer."""
+        while not self._closed:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            with self._lock:
+                if self.clients >= self.max_clients:
+                    connection.close()
+                    continue
+                self.clients += 1
+            threading.Thread(target=self._serve, args=(connection,), name="displayhatmini-viewer", daemon=True).start()
+
+    def _serve(self, connection) -> None:
+        """Viewer thread: send changed rectangles, at most max_fps times a second."""
+        shadow = self._shadow
+        subscription = shadow.subscribe()
+        interval = 1.0 / self.max_fps
+        connection.settimeout(10.0)  # Drop viewers that stop reading
+        try:
+            connection.sendall(_HELLO.pack(MAGIC, VERSION, shadow.width, shadow.height))
+            while not self._closed:
+                rects = shadow.changes(subscription, timeout=1.0)
+                if not rects:
+                    continue
+                start = time.monotonic()
+                sent = 0
+                for x, y, w, h in rects:
+                    data = zlib.compress(shadow.read(x, y, w, h), 1)
+                    connection.sendall(_UPDATE.pack(x, y, w, h, len(data)) + data)
+                    sent += _UPDATE.size + len(data)
+                with self._lock:  # Shared by all viewer threads
+                    self.bytes_sent += sent
+                    self.updates_sent += 1
+                delay = start + interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        except OSError:
+            pass  # Viewer went away
+        finally:
+            shadow.unsubscribe(subscription)
+            connection.close()
+            with self._lock:
+                self.clients -= 1
+
+
+class RemoteViewClient:
+    """
+    Connect to a RemoteViewServer and keep a copy of the screen.
+
+    Example:
+        with RemoteViewClient(("127.0.0.1", 8320)) as client:
+            client.update()
+            client.image.save("screen.png")
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout: float = 10.0):
+        """
+        Args:
+            address: (host, port) or UNIX socket path of the server.
+            timeout: Seconds to wait for the server.
+
+        Raises:
+            ValueError: If the server does not speak this protocol.
+            OSError: If the connection fails.
+        """
+        from PIL import Image
+
+        self._socket = _open_socket(address)
+        self._socket.settimeout(timeout)
+        self._socket.connect(address)
+        magic, version, width, height = _HELLO.unpack(self._recv(_HELLO.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{address} is not a remote view server of protocol version {VERSION}")
+        self.width = width
+        self.height = height
+        self.image = Image.new("RGB", (width, height))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        """Disconnect."""
+        self._socket.close()
+
+    def fileno(self) -> int:
+        """The socket's file descriptor, for select() and event loops."""
+        return self._socket.fileno()
+
+    def update(self) -> tuple:
+        """
+        Receive one changed rectangle and apply it to image.
+
+        Returns:
+            The (x, y, w, h) rectangle that changed.
+
+        Raises:
+            ConnectionError: If the server closed the connection.
+            socket.timeout: If nothing arrived within the timeout.
+        """
+        from .pixels import from_rgb565
+
+        x, y, w, h, length = _UPDATE.unpack(self._recv(_UPDATE.size))
+        pixels = zlib.decompress(self._recv(length))
+        self.image.paste(from_rgb565(pixels, (w, h)), (x, y))
+        return x, y, w, h
+
+    def _recv(self, size: int) -> bytes:
+        """Read exactly size bytes."""
+        chunks = []
+        while size:
+            chunk = self._socket.recv(min(size, 65536))
+            if not chunk:
+                raise ConnectionError("Remote view server closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+
+def _view(client: RemoteViewClient, scale: int) -> None:
+    """Show the remote screen in a Tk window until it is closed."""
+    import tkinter
+
+    from PIL import ImageTk
+
+    root = tkinter.Tk()
+    root.title("Display HAT Mini")
+    label = tkinter.Label(root)
+    label.pack()
+
+    def show():
+        image = client.image
+        if scale != 1:
+            image = image.resize((client.width * scale, client.height * scale))
+        label.photo = ImageTk.PhotoImage(image)
+        label.configure(image=label.photo)
+
+    def receive(*_):
+        try:
+            client.update()
+        except (OSError, ValueError):
+            root.destroy()
+            return
+        show()
+
+    show()
+    root.createfilehandler(client, tkinter.READABLE, receive)
+    root.mainloop()
+
+
+def main(argv=None) -> None:
+    """Command line entry point: save or show the screen of a remote display."""
+    parser = argparse.ArgumentParser(
+        prog="python -m displayhatmini_lite.remote",
+        description="View a Display HAT Mini served with enable_remote_view()",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snapshot = commands.add_parser("snapshot", help="Save the current screen as an image file")
+    snapshot.add_argument("address", help="host:port or UNIX socket path")
+    snapshot.add_argument("output", help="Image file to write (e.g. screen.png)")
+
+    view = commands.add_parser("view", help="Show the screen live in a window (needs tkinter)")
+    view.add_argument("address", help="host:port or UNIX socket path")
+    view.add_argument("--scale", type=int, default=2, help="Window scale factor (default: 2)")
+
+    args = parser.parse_args(argv)
+
+    with RemoteViewClient(parse_address(args.address)) as client:
+        if args.command == "snapshot":
+            client.update()  # The first update is the whole screen
+            client.image.save(args.output)
+            print(f"Saved {client.width}x{client.height} screen to {args.output}")
+        elif args.command == "view":
+            _view(client, args.scale)
+
+
+if __name__ == "__main__":
+    main()
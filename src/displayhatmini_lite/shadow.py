@@ -0,0 +1,173 @@
+"""
+Shadow framebuffer: a copy of what the panel shows, kept in memory.
+
+With DisplayHATMini(shadow=True) every transfer to the panel is also
+copied into a ShadowFramebuffer, as big-endian RGB565 in panel order.
+Copying costs a memcpy per update (RGB444 updates are widened to RGB565
+first), and reading the shadow never touches the SPI bus.
+
+Readers that follow changes, such as the remote-view server, subscribe
+and are handed the rectangles written since their last look. Adjacent
+rectangles are merged, and too many are collapsed into their bounding
+box, so a slow reader costs nothing but a larger next update.
+"""
+
+import threading
+
+
+class ShadowFramebuffer:
+    """
+    RGB565 copy of the panel contents, updated from every transfer.
+
+    Available as DisplayHATMini.shadow when the display was created with
+    shadow=True.
+
+    Example:
+        display = DisplayHATMini(shadow=True)
+        ...
+        display.screenshot().save("screen.png")
+    """
+
+    # Pending rectangles per subscriber before they collapse into their bounding box
+    MAX_DIRTY = 16
+
+    def __init__(self, width: int, height: int):
+        """
+        Args:
+            width: Panel width in pixels.
+            height: Panel height in pixels.
+        """
+        self.width = width
+        self.height = height
+        self.data = bytearray(width * height * 2)  # Black, as after panel setup
+        self.version = 0  # Incremented by every update
+        self._cond = threading.Condition()
+        self._subscribers = []
+
+    def write(self, x: int, y: int, w: int, h: int, data, pixel_format: str = "rgb565") -> None:
+        """Copy the pixels of a transfer to a rectangle."""
+        if pixel_format == "rgb444":
+            from .pixels import rgb444_to_rgb565
+
+            data = rgb444_to_rgb565(data)
+        stride = self.width * 2
+        row = w * 2
+        with self._cond:
+            if x == 0 and w == self.width:
+                self.data[y * stride:(y + h) * stride] = data
+            else:
+                view = memoryview(data)
+                start = y * stride + x * 2
+                for i in range(h):
+                    self.data[start:start + row] = view[i * row:(i + 1) * row]
+                    start += stride
+            self._changed(x, y, w, h)
+
+    def fill(self, x: int, y: int, w: int, h: int, color: bytes) -> None:
+        """Fill a rectangle with one RGB565 colour (two bytes)."""
+        stride = self.width * 2
+        line = color * w
+        with self._cond:
+            start = y * stride + x * 2
+            for _ in range(h):
+                self.data[start:start + len(line)] = line
+                start += stride
+            self._changed(x, y, w, h)
+
+    def clear(self) -> None:
+        """Set the whole copy to black."""
+        with self._cond:
+            self.data[:] = bytes(len(self.data))
+            self._changed(0, 0, self.width, self.height)
+
+    def read(self, x: int = 0, y: int = 0, w: int = None, h: int = None) -> bytes:
+        """Return the RGB565 pixels of a rectangle (default: the whole screen)."""
+        w = self.width - x if w is None else w
+        h = self.height - y if h is None else h
+        stride = self.width * 2
+        with self._cond:
+            if x == 0 and w == self.width:
+                return bytes(self.data[y * stride:(y + h) * stride])
+            start = y * stride + x * 2
+            return b"".join(bytes(self.data[i:i + w * 2]) for i in range(start, start + h * stride, stride))
+
+    def image(self):
+        """Return the panel contents as an RGB PIL Image."""
+        from .pixels import from_rgb565
+
+        return from_rgb565(self.read(), (self.width, self.height))
+
+    # Change subscriptions
+
+    def subscribe(self) -> list:
+        """
+        Start following changes.
+
+        Returns:
+            A subscription for changes() and unsubscribe(). The first
+            changes() returns the whole screen.
+        """
+        subscription = [(0, 0, self.width, self.height)]
+        with self._cond:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: list) -> None:
+        """Stop following changes."""
+        with self._cond:
+            self._subscribers = [s for s in self._subscribers if s is not subscription]
+            self._cond.notify_all()
+
+    def changes(self, subscription: list, timeout: float = None) -> list:
+        """
+        Wait for changes and take them.
+
+        Args:
+            subscription: From subscribe().
+            timeout: Seconds to wait for a change (None = forever).
+
+        Returns:
+            The (x, y, w, h) rectangles changed since the last call, or an
+            empty list after the timeout or once unsubscribed.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: subscription or not any(s is subscription for s in self._subscribers), timeout
+            )
+            rects = subscription[:]
+            subscription.clear()
+        return rects
+
+    def _changed(self, x: int, y: int, w: int, h: int) -> None:
+        """Record a changed rectangle for every subscriber (hold the lock)."""
+        self.version += 1
+        rect = (x, y, w, h)
+        for rects in self._subscribers:
+            if any(_covers(pending, rect) for pending in rects):
+                continue
+            rects[:] = [pending for pending in rects if not _covers(rect, pending)]
+            if rects:
+                last = rects[-1]
+                if last[0] == x and last[2] == w and last[1] + last[3] == y:
+                    # Continues the previous rectangle, as the bands of a frame do
+                    rects[-1] = (x, last[1], w, last[3] + h)
+                    continue
+            rects.append(rect)
+            if len(rects) > self.MAX_DIRTY:
+                x0 = min(r[0] for r in rects)
+                y0 = min(r[1] for r in rects)
+                x1 = max(r[0] + r[2] for r in rects)
+                y1 = max(r[1] + r[3] for r in rects)
+                rects[:] = [(x0, y0, x1 - x0, y1 - y0)]
+        if self._subscribers:
+            self._cond.notify_all()
+
+
+def _covers(outer, inner) -> bool:
+    """Whether rectangle outer contains rectangle inner."""
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and outer[0] + outer[2] >= inner[0] + inner[2]
+        and outer[1] + outer[3] >= inner[1] + inner[3]
+    )
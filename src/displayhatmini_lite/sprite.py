@@ -0,0 +1,197 @@
+"""
+Sprites: small images moved around the screen with partial updates.
+
+A sprite's pixels are encoded to RGB565 once. Moving it rebuilds only the
+rectangle it left and the one it entered from a pre-encoded background, so
+a frame of small-object animation costs a few kilobytes of SPI traffic
+instead of a full 150 KB frame.
+"""
+
+import itertools
+import weakref
+
+from PIL import Image
+
+from .pixels import to_rgb565
+
+# Sprites of each display, to find the ones sharing a background
+_SPRITES = weakref.WeakKeyDictionary()
+_ORDER = itertools.count()
+
+
+class Sprite:
+    """
+    A pre-encoded image that can be moved, shown and hidden on the display.
+
+    The background underneath is restored from a full-screen RGB565 copy, so
+    the sprite never needs the rest of the frame to be redrawn. Several
+    sprites can share the same background buffer. Every rectangle sent is
+    then composed from all of the visible ones, later sprites on top, so
+    moving one never erases part of another.
+    """
+
+    # Pixels with alpha below this are treated as transparent
+    ALPHA_THRESHOLD = 128
+
+    def __init__(self, display, image: Image.Image, background, x: int = 0, y: int = 0):
+        """
+        Create a sprite. It is not drawn until show() or move() is called.
+
+        Args:
+            display: The DisplayHATMini to draw on.
+            image: Sprite image. An alpha channel (or palette transparency)
+                   marks transparent pixels.
+            background: Full-screen background, either a PIL Image or
+                        WIDTH * HEIGHT * 2 bytes from pixels.to_rgb565().
+                        Pass the same bytes to several sprites to share it.
+            x: Initial left edge in screen coordinates.
+            y: Initial top edge in screen coordinates.
+        """
+        self._display = display
+        self.width, self.height = image.size
+        self.x = int(round(x))
+        self.y = int(round(y))
+        self.visible = False
+        self._order = next(_ORDER)
+
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        if has_alpha:
+            image = image.convert("RGBA")
+        self._data = to_rgb565(image)
+        self._spans = self._opaque_spans(image) if has_alpha else [
+            (row, 0, self.width) for row in range(self.height)
+        ]
+        self.set_background(background)
+        _SPRITES.setdefault(display, weakref.WeakSet()).add(self)
+
+    def set_background(self, background) -> None:
+        """
+        Replace the background restored underneath the sprite.
+
+        Args:
+            background: A full-screen PIL Image or RGB565 bytes.
+        """
+        size = self._display.WIDTH * self._display.HEIGHT * 2
+        if isinstance(background, Image.Image):
+            background = to_rgb565(background)
+        if len(background) != size:
+            raise ValueError(f"Background must be {size} bytes of RGB565 (got {len(background)})")
+        self._background = background
+
+    def move(self, x: int, y: int) -> None:
+        """
+        Move the sprite, sending only the area it left and the area it entered.
+
+        Overlapping old and new rectangles are sent as one union transfer;
+        disjoint ones are sent separately.
+        """
+        x = int(round(x))
+        y = int(round(y))
+        if self.visible and x == self.x and y == self.y:
+            return
+        old = self._rect() if self.visible else None
+        self.x, self.y = x, y
+        self.visible = True
+        self._update(old, self._rect())
+
+    def show(self) -> None:
+        """Draw the sprite at its current position."""
+        if not self.visible:
+            self.visible = True
+            self._update(None, self._rect())
+
+    def hide(self) -> None:
+        """Remove the sprite, restoring the background underneath."""
+        if self.visible:
+            old = self._rect()
+            self.visible = False
+            self._update(old, None)
+
+    def redraw(self) -> None:
+        """Send the sprite's rectangle again, e.g. after the background changed."""
+        self._update(None, self._rect())
+
+    def _rect(self):
+        """Return the on-screen (x0, y0, x1, y1) rectangle, or None if off-screen."""
+        x0 = max(self.x, 0)
+        y0 = max(self.y, 0)
+        x1 = min(self.x + self.width, self._display.WIDTH)
+        y1 = min(self.y + self.height, self._display.HEIGHT)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return (x0, y0, x1, y1)
+
+    def _update(self, old, new) -> None:
+        """Send the old and new rectangles, merged when they overlap."""
+        if old and new and old[0] <= new[2] and new[0] <= old[2] and old[1] <= new[3] and new[1] <= old[3]:
+            rects = [(min(old[0], new[0]), min(old[1], new[1]), max(old[2], new[2]), max(old[3], new[3]))]
+        else:
+            rects = [r for r in (old, new) if r]
+        for rect in rects:
+            x0, y0, x1, y1 = rect
+            self._display.blit(self._compose(rect), x0, y0, x1 - x0, y1 - y0)
+
+    def _compose(self, rect) -> bytearray:
+        """Build the RGB565 pixels for a screen rectangle: background plus sprites."""
+        x0, y0, x1, y1 = rect
+        row_bytes = (x1 - x0) * 2
+        stride = self._display.WIDTH * 2
+        buf = bytearray(row_bytes * (y1 - y0))
+        bg = self._background
+
+        # Background rows
+        src = y0 * stride + x0 * 2
+        for dst in range(0, len(buf), row_bytes):
+            buf[dst:dst + row_bytes] = bg[src:src + row_bytes]
+            src += stride
+
+        for sprite in self._layers():
+            sprite._paint(buf, rect)
+        return buf
+
+    def _layers(self) -> list:
+        """Visible sprites sharing this sprite's background, bottom first."""
+        sprites = _SPRITES.get(self._display, ())
+        layers = [s for s in sprites if s.visible and s._background is self._background]
+        return sorted(layers, key=lambda sprite: sprite._order)
+
+    def _paint(self, buf: bytearray, rect) -> None:
+        """Copy the sprite's opaque spans into buf, the pixels of a screen rectangle."""
+        x0, y0, x1, y1 = rect
+        if self.x >= x1 or self.y >= y1 or self.x + self.width <= x0 or self.y + self.height <= y0:
+            return
+        row_bytes = (x1 - x0) * 2
+        data = self._data
+        sprite_stride = self.width * 2
+        for row, start, end in self._spans:
+            sy = self.y + row
+            if sy < y0 or sy >= y1:
+                continue
+            sx0 = max(self.x + start, x0)
+            sx1 = min(self.x + end, x1)
+            if sx0 >= sx1:
+                continue
+            dst = (sy - y0) * row_bytes + (sx0 - x0) * 2
+            src = row * sprite_stride + (sx0 - self.x) * 2
+            n = (sx1 - sx0) * 2
+            buf[dst:dst + n] = data[src:src + n]
+
+    @classmethod
+    def _opaque_spans(cls, image: Image.Image):
+        """Return (row, start, end) runs of opaque pixels from the alpha channel."""
+        alpha = image.getchannel("A").tobytes()
+        width, height = image.size
+        spans = []
+        for row in range(height):
+            line = alpha[row * width:(row + 1) * width]
+            start = None
+            for col, value in enumerate(line):
+                if value >= cls.ALPHA_THRESHOLD:
+                    if start is None:
+                        start = col
+                elif start is not None:
+                    spans.append((row, start, col))
+                    start = None
+            if start is not None:
+                spans.append((row, start, width))
+        return spans
@@ -0,0 +1,426 @@
+"""
+Frame traces: record what an application sends to the display, replay it later.
+
+A TraceRecorder logs every display(), display_raw(), display_region(),
+blit(), fill_rect() (and so fill()), set_led() and set_backlight() call
+with its time and arguments. Pixel content is logged as a CRC-32 plus its
+length, and with payload=True also as the compressed content itself.
+
+replay_trace() issues the same calls on another display, as fast as
+possible or with the recorded timing, and measures how long each call
+takes. Replaying one trace before and after a change gives comparable
+throughput and latency figures. Without payloads, each image is replaced
+by filler bytes derived from its CRC. Equal content therefore stays equal,
+so identical-frame skipping behaves as it did while recording, but what
+appears on screen is not the original picture.
+
+Trace files are JSON lines. A header line holds the display settings.
+Each following line is one call:
+
+    {"t": microseconds since recording started, "op": name, ...arguments,
+     "crc": CRC-32 and "len": length of the content in bytes,
+     "data": base64 of the zlib-compressed content (payload traces only)}
+
+Command line:
+
+    python -m displayhatmini_lite.trace info app.trace
+    python -m displayhatmini_lite.trace replay app.trace
+    python -m displayhatmini_lite.trace replay app.trace --realtime --mock /tmp/panel.raw
+"""
+
+import argparse
+import base64
+import json
+import threading
+import time
+import zlib
+
+FORMAT = "displayhatmini-trace"
+VERSION = 1
+
+# Operations in a trace, in the order report() lists them
+OPS = ("display", "display_raw", "display_region", "blit", "fill_rect", "set_led", "set_backlight")
+
+
+class TraceRecorder:
+    """
+    Record the calls made on a DisplayHATMini to a trace file.
+
+    Creating a recorder attaches it to the display; close() detaches it and
+    closes the file. Calls made by the display itself (fill() calling
+    fill_rect(), for example) are recorded once, as the inner call.
+
+    Example:
+        with TraceRecorder(display, "app.trace", payload=True):
+            run_app(display)
+    """
+
+    def __init__(self, display, path: str, payload: bool = False):
+        """
+        Args:
+            display: The DisplayHATMini to record.
+            path: Trace file to write (replaced if it exists).
+            payload: If True, store the pixel content of every call, so a
+                     replay shows the original images. Costs a compression
+                     per call and about as much disk as the content itself.
+        """
+        self._display = display
+        self.path = path
+        self.payload = payload
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "w")
+        self._start = time.monotonic_ns()
+        header = {
+            "format": FORMAT,
+            "version": VERSION,
+            "width": display.WIDTH,
+            "height": display.HEIGHT,
+            "pixel_format": display.pixel_format,
+            "render_size": list(display.render_size),
+            "skip_identical": display.skip_identical,
+            "dither": display.dither,
+            "payload": payload,
+        }
+        self._file.write(json.dumps(header) + "\n")
+        display._trace = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        """Stop recording and close the trace file."""
+        if self._display._trace is self:
+            self._display._trace = None
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    # Hooks called by DisplayHATMini
+
+    def on_display(self, image) -> None:
+        """display(image) was called."""
+        self._record_image("display", image)
+
+    def on_display_raw(self, data) -> None:
+        """display_raw(data) was called."""
+        self._record("display_raw", {}, data)
+
+    def on_region(self, image, x: int, y: int) -> None:
+        """display_region(image, x, y) was called."""
+        self._record_image("display_region", image, x=x, y=y)
+
+    def on_blit(self, data, x: int, y: int, w: int, h: int) -> None:
+        """blit(data, x, y, w, h) was called."""
+        self._record("blit", {"x": x, "y": y, "w": w, "h": h}, data)
+
+    def on_fill(self, x: int, y: int, w: int, h: int, color) -> None:
+        """fill_rect(x, y, w, h, color) was called."""
+        self._record("fill_rect", {"x": x, "y": y, "w": w, "h": h, "color": color})
+
+    def on_led(self, r: float, g: float, b: float) -> None:
+        """set_led(r, g, b) was called."""
+        self._record("set_led", {"rgb": [r, g, b]})
+
+    def on_backlight(self, value: float) -> None:
+        """set_backlight(value) was called."""
+        self._record("set_backlight", {"value": value})
+
+    def _record_image(self, op: str, image, **fields) -> None:
+        """Record a call taking a PIL Image."""
+        fields["mode"] = image.mode
+        fields["size"] = list(image.size)
+        if image.mode == "P" and self.payload:
+            fields["palette"] = base64.b64encode(bytes(image.getpalette())).decode("ascii")
+        self._record(op, fields, image.tobytes())
+
+    def _record(self, op: str, fields: dict, content=None) -> None:
+        """Write one call to the trace."""
+        record = {"t": (time.monotonic_ns() - self._start) // 1000, "op": op}
+        record.update(fields)
+        if content is not None:
+            record["crc"] = zlib.crc32(content)
+            record["len"] = len(content)
+            if self.payload:
+                record["data"] = base64.b64encode(zlib.compress(content, 1)).decode("ascii")
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+                self.calls += 1
+
+
+def read_trace(path: str):
+    """
+    Read a trace file.
+
+    Returns:
+        (header, records): the header dict and a list of call dicts.
+
+    Raises:
+        ValueError: If the file is not a trace of a supported version.
+    """
+    with open(path) as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get("format") != FORMAT:
+            raise ValueError(f"{path} is not a display trace")
+        if header.get("version") != VERSION:
+            raise ValueError(f"Unsupported trace version {header.get('version')} (expected {VERSION})")
+        records = [json.loads(line) for line in f if line.strip()]
+    return header, records
+
+
+class ReplayResult:
+    """Throughput and per-call latency of one replay_trace() run."""
+
+    def __init__(self, realtime: bool):
+        self.realtime = realtime
+        self.calls = 0
+        self.elapsed = 0.0
+        self.recorded_duration = 0.0
+        self.frames = 0
+        self.frames_skipped = 0
+        self.bytes_sent = 0
+        self.late_calls = 0  # Realtime calls that started more than 1 ms behind schedule
+        self.durations = {op: [] for op in OPS}  # Milliseconds
+
+    def summary(self) -> dict:
+        """
+        Return throughput and latency figures.
+
+        Returns:
+            A dict with calls, elapsed and recorded_duration (seconds),
+            calls_per_second, frames, frames_skipped, bytes_sent,
+            bytes_per_second, late_calls and latency: {op: {"count",
+            "min", "p50", "p90", "p99", "max"}} in milliseconds for every
+            operation in the trace, plus "all".
+        """
+        latency = {}
+        everything = []
+        for op, values in self.durations.items():
+            if values:
+                latency[op] = _percentiles(values)
+                everything.extend(values)
+        latency["all"] = _percentiles(everything)
+        elapsed = self.elapsed or float("inf")
+        return {
+            "calls": self.calls,
+            "elapsed": self.elapsed,
+            "recorded_duration": self.recorded_duration,
+            "calls_per_second": self.calls / elapsed,
+            "frames": self.frames,
+            "frames_skipped": self.frames_skipped,
+            "bytes_sent": self.bytes_sent,
+            "bytes_per_second": self.bytes_sent / elapsed,
+            "late_calls": self.late_calls,
+            "latency": latency,
+        }
+
+    def report(self) -> str:
+        """Return the summary as printable text."""
+        summary = self.summary()
+        mode = "real time" if self.realtime else "as fast as possible"
+        lines = [
+            f"{summary['calls']} calls in {summary['elapsed']:.3f} s ({mode}; "
+            f"recorded over {summary['recorded_duration']:.3f} s)",
+            f"{summary['calls_per_second']:.1f} calls/s, {summary['frames']} frames sent, "
+            f"{summary['frames_skipped']} skipped, {summary['bytes_per_second'] / 1e6:.2f} MB/s",
+        ]
+        if self.realtime:
+            lines.append(f"late calls: {summary['late_calls']}")
+        lines.append("")
+        lines.append(f"{'call':<16}{'count':>7}{'min':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+        for op, row in summary["latency"].items():
+            values = "".join(
+                f"{row[key]:9.2f}" if row[key] is not None else f"{'-':>9}"
+                for key in ("min", "p50", "p90", "p99", "max")
+            )
+            lines.append(f"{op:<16}{row['count']:7d}{values}")
+        return "\n".join(lines)
+
+
+def replay_trace(path: str, display, realtime: bool = False, apply_settings: bool = True) -> ReplayResult:
+    """
+    Issue the calls of a trace on a display and time them.
+
+    Each call is timed until it returns, and the replay ends with flush(),
+    so the elapsed time covers every pixel reaching the panel.
+
+    Args:
+        path: Trace file written by a TraceRecorder.
+        display: The DisplayHATMini to replay on.
+        realtime: If True, start each call at its recorded time; otherwise
+                  issue the calls back to back.
+        apply_settings: If True, give the display the pixel format, render
+                        size and skipping settings recorded in the trace
+                        (the pixel format only if its backend supports it,
+                        so that SPI traces replay on a mock panel).
+
+    Returns:
+        A ReplayResult.
+
+    Raises:
+        ValueError: If the file is not a trace, or was recorded for
+                    another panel size.
+    """
+    from PIL import Image
+
+    header, records = read_trace(path)
+    if (header["width"], header["height"]) != (display.WIDTH, display.HEIGHT):
+        raise ValueError(f"Trace was recorded on a {header['width']}x{header['height']} display")
+    if apply_settings:
+        if header["pixel_format"] in display._backend.pixel_formats:
+            display.pixel_format = header["pixel_format"]
+        display.render_size = tuple(header["render_size"])
+        display.skip_identical = header["skip_identical"]
+        display.dither = header["dither"]
+
+    # Decode content up front, so the replay times only the display calls
+    calls = []
+    for record in records:
+        op = record["op"]
+        if op in ("display", "display_region"):
+            image = Image.frombytes(record["mode"], tuple(record["size"]), _content(record))
+            if "palette" in record:
+                image.putpalette(base64.b64decode(record["palette"]))
+            args = (image,) if op == "display" else (image, record["x"], record["y"])
+        elif op == "display_raw":
+            args = (_content(record),)
+        elif op == "blit":
+            args = (_content(record), record["x"], record["y"], record["w"], record["h"])
+        elif op == "fill_rect":
+            color = record["color"]
+            color = tuple(color) if isinstance(color, list) else color
+            args = (record["x"], record["y"], record["w"], record["h"], color)
+        elif op == "set_led":
+            args = tuple(record["rgb"])
+        elif op == "set_backlight":
+            args = (record["value"],)
+        else:
+            continue  # Written by a newer version
+        calls.append((record["t"] * 1000, op, getattr(display, op), args))
+
+    result = ReplayResult(realtime)
+    result.recorded_duration = calls[-1][0] / 1e9 if calls else 0.0
+    before = display.stats.as_dict()
+    start = time.monotonic_ns()
+    for offset, op, method, args in calls:
+        if realtime:
+            delay = start + offset - time.monotonic_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+            elif delay < -1_000_000:
+                result.late_calls += 1
+        t0 = time.monotonic_ns()
+        method(*args)
+        result.durations[op].append((time.monotonic_ns() - t0) / 1e6)
+    display.flush()
+    result.elapsed = (time.monotonic_ns() - start) / 1e9
+
+    after = display.stats.as_dict()
+    result.calls = len(calls)
+    result.frames = after["frames"] - before["frames"]
+    result.frames_skipped = after["frames_skipped"] - before["frames_skipped"]
+    result.bytes_sent = after["bytes_sent"] - before["bytes_sent"]
+    return result
+
+
+def _content(record: dict) -> bytes:
+    """Return the recorded content of a call, or filler derived from its CRC."""
+    if "data" in record:
+        return zlib.decompress(base64.b64decode(record["data"]))
+    length = record["len"]
+    return (record["crc"].to_bytes(4, "little") * (length // 4 + 1))[:length]
+
+
+def _percentiles(values) -> dict:
+    """Return count, min, p50, p90, p99 and max of values (None when empty)."""
+    values = sorted(values)
+    if not values:
+        return {"count": 0, "min": None, "p50": None, "p90": None, "p99": None, "max": None}
+
+    def percentile(p):
+        return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+    return {
+        "count": len(values),
+        "min": values[0],
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p99": percentile(99),
+        "max": values[-1],
+    }
+
+
+def main(argv=None) -> None:
+    """Command line entry point: inspect or replay trace files."""
+    parser = argparse.ArgumentParser(
+        prog="python -m displayhatmini_lite.trace",
+        description="Inspect and replay Display HAT Mini call traces",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    info = commands.add_parser("info", help="Show the settings and calls of a trace")
+    info.add_argument("path")
+
+    replay = commands.add_parser("replay", help="Replay a trace and report throughput and latency")
+    replay.add_argument("path")
+    replay.add_argument("--realtime", action="store_true", help="Keep the recorded timing")
+    replay.add_argument("--repeat", type=int, default=1, help="Number of replays (default: 1)")
+    replay.add_argument("--json", action="store_true", help="Print the summaries as JSON")
+    replay.add_argument(
+        "--mock",
+        metavar="FILE",
+        help="Use a file as the panel (fbdev backend, no GPIO) instead of the HAT",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        header, records = read_trace(args.path)
+        settings = ", ".join(f"{key}={header[key]}" for key in ("pixel_format", "render_size", "skip_identical"))
+        duration = records[-1]["t"] / 1e6 if records else 0.0
+        content = sum(record.get("len", 0) for record in records)
+        print(f"{header['width']}x{header['height']}, {settings}, payload={header['payload']}")
+        print(f"{len(records)} calls over {duration:.3f} s, {content} bytes of content")
+        for op in OPS:
+            count = sum(1 for record in records if record["op"] == op)
+            if count:
+                print(f"{op:<16}{count:7d}")
+
+    elif args.command == "replay":
+        from . import DisplayHATMini
+
+        if args.mock:
+            size = DisplayHATMini.WIDTH * DisplayHATMini.HEIGHT * 2
+            with open(args.mock, "ab") as f:
+                f.truncate(size)
+            display = DisplayHATMini(backend="fbdev", fb_device=args.mock, gpio="null")
+        else:
+            display = DisplayHATMini()
+        summaries = []
+        try:
+            for i in range(args.repeat):
+                result = replay_trace(args.path, display, realtime=args.realtime)
+                if args.json:
+                    summaries.append(result.summary())
+                else:
+                    if args.repeat > 1:
+                        print(f"Replay {i + 1}:")
+                    print(result.report())
+                    print()
+        except KeyboardInterrupt:
+            pass
+        if args.json:
+            print(json.dumps(summaries, indent=2))
+        display.set_backlight(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Shared fixtures: displays that run without a Raspberry Pi.
+
+The fake RPi.GPIO and spidev modules from fakes.py are installed before
+the package is imported, so a plain DisplayHATMini drives fakes.PANEL. A
+mock panel is a regular file driven by the fbdev backend, with the null
+GPIO backend, so no hardware module is needed.
+"""
+
+import sys
+
+import pytest
+from fakes import PANEL, fake_rpi_gpio_modules, fake_spidev_module
+
+sys.modules.update(fake_rpi_gpio_modules())
+sys.modules["spidev"] = fake_spidev_module()
+
+from displayhatmini_lite import DisplayHATMini  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def panel():
+    """The fake ST7789, back in its power-on state."""
+    PANEL.reset()
+    return PANEL
+
+
+@pytest.fixture
+def make_display():
+    """Create DisplayHATMinis on the fake SPI bus and RPi.GPIO, closed after the test."""
+    displays = []
+
+    def make(**options):
+        display = DisplayHATMini(**{"backend": "spidev", "gpio": "rpi-gpio", **options})
+        displays.append(display)
+        return display
+
+    yield make
+    for display in displays:
+        display._cleanup()
+
+
+@pytest.fixture
+def display(make_display):
+    """A DisplayHATMini on the fake SPI bus and RPi.GPIO."""
+    return make_display()
+
+
+@pytest.fixture
+def panel_file(tmp_path):
+    """A regular file the size of a 16 bpp 320x240 framebuffer."""
+    path = tmp_path / "panel.raw"
+    path.write_bytes(bytes(DisplayHATMini.WIDTH * DisplayHATMini.HEIGHT * 2))
+    return str(path)
+
+
+@pytest.fixture
+def mock_display(panel_file):
+    """A DisplayHATMini writing into panel_file."""
+    display = DisplayHATMini(backend="fbdev", fb_device=panel_file, gpio="null")
+    yield display
+    display._cleanup()
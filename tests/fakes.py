@@ -0,0 +1,300 @@
+"""
+Fake hardware for tests: an ST7789 panel on a fake SPI bus, RPi.GPIO and libgpiod v2.
+
+conftest.py installs the fake RPi.GPIO and spidev modules before the
+package is imported, so no test touches real hardware. Everything written
+over SPI reaches PANEL, which decodes the command stream the way the
+ST7789 does and keeps the panel memory.
+"""
+
+import enum
+import os
+import sys
+import types
+from collections import namedtuple
+
+# Panel commands
+SLPIN = 0x10
+SLPOUT = 0x11
+DISPON = 0x29
+CASET = 0x2A
+RASET = 0x2B
+RAMWR = 0x2C
+MADCTL = 0x36
+COLMOD = 0x3A
+
+DC_PIN = 9  # BCM pin of the panel's data/command line
+
+# One memory write: its address window, interface pixel format and bytes
+Transfer = namedtuple("Transfer", "x y w h colmod data")
+
+
+class FakePanel:
+    """
+    ST7789 controller behind the fake SPI bus.
+
+    Attributes:
+        commands: (command, parameter bytes) in the order received; the
+                  pixels of memory writes are in transfers instead.
+        transfers: One Transfer per RAMWR.
+        memory: 320x240 panel memory as big-endian RGB565 (RGB444 writes
+                are widened as the panel does).
+    """
+
+    WIDTH = 320
+    HEIGHT = 240
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Power-on state: black memory, RGB565, no history."""
+        self.dc = True
+        self.colmod = 0x55
+        self.memory = bytearray(self.WIDTH * self.HEIGHT * 2)
+        self.commands = []
+        self.transfers = []
+        self._command = None
+        self._window = (0, 0, self.WIDTH, self.HEIGHT)
+        self._cursor = 0
+        self._pending = b""
+
+    def write(self, data) -> None:
+        """Bytes clocked in on the SPI bus, a command or data as the DC line says."""
+        data = bytes(data)
+        if not self.dc:
+            for cmd in data:
+                self._begin(cmd)
+        elif self._command == RAMWR:
+            self.transfers[-1].data.extend(data)
+            self._pixels(data)
+        elif self.commands:
+            cmd, args = self.commands[-1]
+            args.extend(data)
+            if cmd in (CASET, RASET) and len(args) == 4:
+                start, end = (args[0] << 8) | args[1], (args[2] << 8) | args[3]
+                x, y, w, h = self._window
+                if cmd == CASET:
+                    self._window = (start, y, end - start + 1, h)
+                else:
+                    self._window = (x, start, w, end - start + 1)
+            elif cmd == COLMOD and len(args) == 1:
+                self.colmod = args[0]
+
+    def command_codes(self) -> list:
+        """The command bytes received, in order."""
+        return [cmd for cmd, _args in self.commands]
+
+    def pixel(self, x: int, y: int) -> int:
+        """RGB565 value of a pixel in panel memory."""
+        i = (y * self.WIDTH + x) * 2
+        return (self.memory[i] << 8) | self.memory[i + 1]
+
+    def region(self, x: int, y: int, w: int, h: int) -> bytes:
+        """Big-endian RGB565 bytes of a rectangle of panel memory."""
+        stride = self.WIDTH * 2
+        return b"".join(
+            bytes(self.memory[row * stride + x * 2:row * stride + (x + w) * 2]) for row in range(y, y + h)
+        )
+
+    def _begin(self, cmd: int) -> None:
+        self._command = cmd
+        if cmd == RAMWR:
+            self._cursor = 0
+            self._pending = b""
+            self.transfers.append(Transfer(*self._window, self.colmod, bytearray()))
+        else:
+            self.commands.append((cmd, bytearray()))
+
+    def _pixels(self, data: bytes) -> None:
+        data = self._pending + data
+        if self.colmod == 0x53:
+            # Two 12-bit pixels in three bytes: RRRRGGGG BBBBRRRR GGGGBBBB
+            used = len(data) // 3 * 3
+            values = []
+            for i in range(0, used, 3):
+                a, b, c = data[i:i + 3]
+                values.append(((a >> 4), a & 0x0F, b >> 4))
+                values.append((b & 0x0F, c >> 4, c & 0x0F))
+            colors = [(r << 12) | (r >> 3 << 11) | (g << 7) | (g >> 2 << 5) | (b << 1) | (b >> 3) for r, g, b in values]
+        else:
+            used = len(data) // 2 * 2
+            colors = [(data[i] << 8) | data[i + 1] for i in range(0, used, 2)]
+        self._pending = data[used:]
+        x, y, w, h = self._window
+        for color in colors:
+            row, col = divmod(self._cursor, w)
+            if row < h:
+                i = ((y + row) * self.WIDTH + x + col) * 2
+                self.memory[i:i + 2] = color.to_bytes(2, "big")
+            self._cursor += 1
+
+
+PANEL = FakePanel()
+
+
+class FakeSpiDev:
+    """spidev.SpiDev that records every write and clocks it into PANEL."""
+
+    def __init__(self):
+        self.max_speed_hz = 0
+        self.mode = 0
+        self.writes = []
+
+    def open(self, bus, device):
+        pass
+
+    def writebytes(self, data):
+        self.writes.append(bytes(data))
+        PANEL.write(data)
+
+    def writebytes2(self, data):
+        self.writebytes(data)
+
+    def close(self):
+        pass
+
+
+def fake_spidev_module(spidev_class=FakeSpiDev):
+    """Return a module standing in for spidev, whose SpiDev is spidev_class."""
+    module = types.ModuleType("spidev")
+    module.SpiDev = spidev_class
+    return module
+
+
+def fake_rpi_gpio_modules():
+    """
+    Return {name: module} standing in for RPi and RPi.GPIO.
+
+    RPi.GPIO.levels maps each output pin to its level, and inputs read
+    high (buttons released). Setting the DC pin drives PANEL.dc.
+    """
+    gpio = types.ModuleType("RPi.GPIO")
+    gpio.BCM, gpio.IN, gpio.OUT, gpio.PUD_UP = 11, 1, 0, 22
+    gpio.LOW, gpio.HIGH = 0, 1
+    gpio.FALLING, gpio.RISING, gpio.BOTH = 32, 31, 33
+    gpio.levels = {}
+    gpio.callbacks = {}
+
+    def output(pin, value):
+        gpio.levels[pin] = bool(value)
+        if pin == DC_PIN:
+            PANEL.dc = bool(value)
+
+    def setup(pin, mode, pull_up_down=None, initial=None):
+        if mode == gpio.OUT and initial is not None:
+            output(pin, initial)
+
+    def add_event_detect(pin, edge, callback=None, bouncetime=None):
+        gpio.callbacks[pin] = callback
+
+    def remove_event_detect(pin):
+        gpio.callbacks.pop(pin, None)
+
+    class PWM:
+        def __init__(self, pin, frequency):
+            self.pin = pin
+            self.frequency = frequency
+            self.duty = None
+
+        def start(self, duty):
+            self.duty = duty
+
+        def ChangeDutyCycle(self, duty):
+            self.duty = duty
+
+        def ChangeFrequency(self, frequency):
+            self.frequency = frequency
+
+        def stop(self):
+            self.duty = None
+
+    gpio.setmode = lambda mode: None
+    gpio.setwarnings = lambda flag: None
+    gpio.setup = setup
+    gpio.output = output
+    gpio.input = lambda pin: gpio.HIGH
+    gpio.add_event_detect = add_event_detect
+    gpio.remove_event_detect = remove_event_detect
+    gpio.cleanup = lambda *pins: None
+    gpio.PWM = PWM
+
+    rpi = types.ModuleType("RPi")
+    rpi.GPIO = gpio
+    return {"RPi": rpi, "RPi.GPIO": gpio}
+
+
+def fake_gpiod_modules():
+    """
+    Return {name: module} standing in for gpiod and gpiod.line.
+
+    gpiod.values maps each line to its current Value,
+    gpiod.history records every (line, Value) written, and
+    gpiod.edges(events) queues edge events for the next read.
+    """
+    line = types.ModuleType("gpiod.line")
+
+    class Value(enum.Enum):
+        INACTIVE = 0
+        ACTIVE = 1
+
+    line.Value = Value
+    line.Direction = enum.Enum("Direction", "INPUT OUTPUT")
+    line.Bias = enum.Enum("Bias", "PULL_UP")
+    line.Edge = enum.Enum("Edge", "BOTH")
+
+    gpiod = types.ModuleType("gpiod")
+    gpiod.line = line
+    gpiod.values = {}
+    gpiod.history = []
+    requests = []
+
+    class LineSettings:
+        def __init__(self, **settings):
+            self.__dict__.update(settings)
+
+    class Request:
+        def __init__(self, config):
+            self.fd, self._w = os.pipe()
+            self._events = []
+            requests.append(self)
+            for key, settings in config.items():
+                for pin in key if isinstance(key, tuple) else (key,):
+                    value = getattr(settings, "output_value", None)
+                    gpiod.values[pin] = Value.ACTIVE if value is None else value
+
+        def set_value(self, pin, value):
+            gpiod.values[pin] = value
+            gpiod.history.append((pin, value))
+
+        def get_value(self, pin):
+            return gpiod.values[pin]
+
+        def reconfigure_lines(self, config):
+            pass
+
+        def read_edge_events(self):
+            os.read(self.fd, 1)
+            events, self._events = self._events, []
+            return events
+
+        def release(self):
+            os.close(self.fd)
+            os.close(self._w)
+
+    def edges(events):
+        """Deliver edge events to the last line request (the buttons)."""
+        request = requests[-1]
+        request._events.extend(events)
+        os.write(request._w, b"!")
+
+    gpiod.LineSettings = LineSettings
+    gpiod.request_lines = lambda chip, consumer=None, config=None: Request(config)
+    gpiod.edges = edges
+    return {"gpiod": gpiod, "gpiod.line": line}
+
+
+def install(monkeypatch, modules):
+    """Make modules importable for one test."""
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
@@ -0,0 +1,47 @@
+import pytest
+from PIL import Image
+
+from displayhatmini_lite import to_rgb565
+from displayhatmini_lite.animfile import AnimationFile, encode_animation
+
+
+def _frames():
+    first = Image.new("RGB", (320, 240), "navy")
+    second = first.copy()
+    second.paste((255, 0, 0), (100, 50, 120, 60))
+    third = second.copy()
+    third.paste((0, 255, 0), (10, 200, 14, 202))
+    return [first, second, second, third]
+
+
+@pytest.fixture
+def animation(tmp_path):
+    path = str(tmp_path / "anim.dhma")
+    assert encode_animation(_frames(), path, fps=1000) == 3  # The repeat is folded
+    return path
+
+
+def test_encode_keeps_only_dirty_rectangles(animation):
+    with AnimationFile(animation) as anim:
+        assert [(f.x, f.y, f.w, f.h) for f in anim.frames] == [(0, 0, 320, 240), (100, 50, 20, 10), (10, 200, 4, 2)]
+        assert [f.duration_ms for f in anim.frames] == [1, 2, 1]
+        assert bytes(anim.frame_data(1)) == to_rgb565(Image.new("RGB", (20, 10), "red"))
+
+
+def test_play_on_the_panel(animation, display, panel):
+    with AnimationFile(animation) as anim:
+        assert anim.play(display) == 3
+
+    assert [(t.x, t.y, t.w, t.h) for t in panel.transfers] == [(0, 0, 320, 240), (100, 50, 20, 10), (10, 200, 4, 2)]
+    assert bytes(panel.memory) == to_rgb565(_frames()[-1])
+
+
+@pytest.mark.parametrize("keep", [0, 10, 1000, -1])
+def test_truncated_file_is_rejected(animation, keep):
+    with open(animation, "rb") as f:
+        data = f.read()
+    with open(animation, "wb") as f:
+        f.write(data[:keep])
+
+    with pytest.raises(ValueError):
+        AnimationFile(animation)
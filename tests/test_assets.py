@@ -0,0 +1,74 @@
+import os
+
+from PIL import Image
+
+from displayhatmini_lite.assets import clear_asset_cache, load_asset
+
+WHITE, RED, GREY = 0xFFFF, 0xF800, 0x8410
+
+
+def _pixels(asset):
+    data = bytes(asset.data)
+    return [int.from_bytes(data[i:i + 2], "big") for i in range(0, len(data), 2)]
+
+
+def _icon(tmp_path):
+    """A 2x1 RGBA image: opaque red, then half-transparent black."""
+    image = Image.new("RGBA", (2, 1))
+    image.putpixel((0, 0), (255, 0, 0, 255))
+    image.putpixel((1, 0), (0, 0, 0, 128))
+    path = tmp_path / "icon.png"
+    image.save(path)
+    return str(path)
+
+
+def test_transparent_pixels_are_composited_onto_the_background(tmp_path):
+    path = _icon(tmp_path)
+    cache = str(tmp_path / "cache")
+
+    with load_asset(path, cache_dir=cache, background=(255, 255, 255)) as asset:
+        assert not asset.cached
+        red, grey = _pixels(asset)
+    assert red == RED
+    assert abs((grey >> 11) - (GREY >> 11)) <= 1  # Half black over white
+
+    with load_asset(path, cache_dir=cache, background=(255, 255, 255)) as asset:
+        assert asset.cached
+        assert _pixels(asset) == [red, grey]
+
+
+def test_background_is_part_of_the_cache_key(tmp_path):
+    path = _icon(tmp_path)
+    cache = str(tmp_path / "cache")
+
+    with load_asset(path, cache_dir=cache) as asset:
+        assert _pixels(asset) == [RED, 0]
+    with load_asset(path, cache_dir=cache, background="white") as asset:
+        assert not asset.cached
+        assert _pixels(asset)[1] != 0
+
+    assert len(os.listdir(cache)) == 2
+    assert clear_asset_cache(cache) == 2
+
+
+def test_paletted_transparency(tmp_path):
+    image = Image.new("P", (1, 1), 0)
+    image.putpalette([255, 0, 0] + [0] * 765)
+    path = tmp_path / "dot.gif"
+    image.save(path, transparency=0)
+
+    with load_asset(str(path), cache_dir=str(tmp_path / "cache"), background=(255, 255, 255)) as asset:
+        assert _pixels(asset) == [WHITE]
+
+
+def test_colour_names_share_entries_with_tuples(tmp_path):
+    path = _icon(tmp_path)
+    cache = str(tmp_path / "cache")
+
+    with load_asset(path, cache_dir=cache, background="white"):
+        pass
+    with load_asset(path, cache_dir=cache, background=(255, 255, 255)) as asset:
+        assert asset.cached
+    with load_asset(path, cache_dir=cache, background="#ffffff") as asset:
+        assert asset.cached
+    assert len(os.listdir(cache)) == 1
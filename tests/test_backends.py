@@ -0,0 +1,107 @@
+import pytest
+
+from displayhatmini_lite import backends
+from displayhatmini_lite.backends import FramebufferBackend
+from displayhatmini_lite.gpio import RPiGPIO
+
+WIDTH, HEIGHT = 320, 240
+RED, BLUE = 0xF800, 0x001F
+
+
+def _framebuffer(tmp_path, monkeypatch, bpp, stride):
+    """A regular file laid out as a framebuffer of the given depth and row stride."""
+    path = tmp_path / "fb.raw"
+    path.write_bytes(bytes(stride * HEIGHT))
+    if bpp != 16 or stride != WIDTH * 2:
+        monkeypatch.setattr(backends, "read_fb_geometry", lambda device: (WIDTH, HEIGHT, bpp, stride))
+    return path
+
+
+def _panel(*colors) -> bytes:
+    """Big-endian RGB565 pixels, as sent to the panel."""
+    return b"".join(color.to_bytes(2, "big") for color in colors)
+
+
+def _pixel(path, bpp, stride, x, y) -> bytes:
+    pb = bpp // 8
+    data = path.read_bytes()
+    start = y * stride + x * pb
+    return data[start:start + pb]
+
+
+@pytest.mark.parametrize("bpp, stride", [(16, 640), (16, 704), (32, 1280)])
+def test_full_frame(tmp_path, monkeypatch, bpp, stride):
+    path = _framebuffer(tmp_path, monkeypatch, bpp, stride)
+    backend = FramebufferBackend(str(path), WIDTH, HEIGHT)
+    try:
+        backend.set_window(0, 0, WIDTH, HEIGHT)
+        backend.write(_panel(RED) * (WIDTH * HEIGHT - 1) + _panel(BLUE))
+    finally:
+        backend.close()
+
+    assert path.stat().st_size == stride * HEIGHT
+    red, blue = (RED.to_bytes(2, "little"), BLUE.to_bytes(2, "little"))
+    if bpp == 32:
+        red, blue = b"\x00\x00\xff", b"\xff\x00\x00"  # B, G, R (X is padding)
+    assert _pixel(path, bpp, stride, 0, 0)[:len(red)] == red
+    assert _pixel(path, bpp, stride, WIDTH - 1, 100)[:len(red)] == red
+    assert _pixel(path, bpp, stride, WIDTH - 1, HEIGHT - 1)[:len(blue)] == blue
+    if stride > WIDTH * bpp // 8:
+        padding = path.read_bytes()[WIDTH * bpp // 8:stride]
+        assert padding == bytes(len(padding))
+
+
+@pytest.mark.parametrize("bpp, stride", [(16, 640), (32, 1280)])
+def test_region_at_nonzero_x(tmp_path, monkeypatch, bpp, stride):
+    path = _framebuffer(tmp_path, monkeypatch, bpp, stride)
+    backend = FramebufferBackend(str(path), WIDTH, HEIGHT)
+    x, y, w, h = 101, 50, 7, 3
+    try:
+        backend.set_window(x, y, w, h)
+        pixels = _panel(*(RED if (col + row) % 2 else BLUE for row in range(h) for col in range(w)))
+        backend.write(pixels[:10 * 2])  # Ends partway through the second row
+        backend.write(pixels[10 * 2:])
+    finally:
+        backend.close()
+
+    red, blue = RED.to_bytes(2, "little"), BLUE.to_bytes(2, "little")
+    if bpp == 32:
+        red, blue = b"\x00\x00\xff", b"\xff\x00\x00"
+    black = bytes(bpp // 8)
+    for row in range(h):
+        assert _pixel(path, bpp, stride, x - 1, y + row) == black
+        assert _pixel(path, bpp, stride, x + w, y + row) == black
+        for col in range(w):
+            expected = red if (col + row) % 2 else blue
+            assert _pixel(path, bpp, stride, x + col, y + row)[:len(expected)] == expected
+    assert _pixel(path, bpp, stride, x, y - 1) == black
+    assert _pixel(path, bpp, stride, x, y + h) == black
+
+
+def test_wrong_geometry_is_rejected(tmp_path, monkeypatch):
+    path = _framebuffer(tmp_path, monkeypatch, 16, 640)
+    monkeypatch.setattr(backends, "read_fb_geometry", lambda device: (480, 320, 16, 960))
+    with pytest.raises(ValueError):
+        FramebufferBackend(str(path), WIDTH, HEIGHT)
+
+
+def test_unsupported_depth_is_rejected(tmp_path, monkeypatch):
+    path = _framebuffer(tmp_path, monkeypatch, 24, 960)
+    with pytest.raises(ValueError):
+        FramebufferBackend(str(path), WIDTH, HEIGHT)
+
+
+@pytest.mark.parametrize("bufsiz, warned", [(4096, True), (65536, False)])
+def test_small_spidev_bufsiz_is_logged_at_open(monkeypatch, caplog, bufsiz, warned):
+    monkeypatch.setattr(backends, "read_spidev_bufsiz", lambda *args: bufsiz)
+    backend = backends.SpidevBackend(RPiGPIO(), 0, 1, 9, 80_000_000)
+    backend.close()
+
+    assert ("spidev.bufsiz=4096" in caplog.text) == warned
+
+
+def test_read_spidev_bufsiz(tmp_path):
+    path = tmp_path / "bufsiz"
+    path.write_text("65536\n")
+    assert backends.read_spidev_bufsiz(str(path)) == 65536
+    assert backends.read_spidev_bufsiz(str(tmp_path / "missing")) == 4096
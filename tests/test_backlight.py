@@ -0,0 +1,65 @@
+import displayhatmini_lite
+from displayhatmini_lite import DisplayHATMini, KernelPWM
+
+
+def _pwm_root(tmp_path, enable=1, period=1_000_000, duty_cycle=400_000):
+    """A fake /sys/class/pwm/pwmchip0 with channel 1 exported."""
+    chip = tmp_path / "pwmchip0"
+    channel = chip / "pwm1"
+    channel.mkdir(parents=True)
+    (channel / "enable").write_text(f"{enable}\n")
+    (channel / "period").write_text(f"{period}\n")
+    (channel / "duty_cycle").write_text(f"{duty_cycle}\n")
+    return chip
+
+
+def _kernel_pwm(chip):
+    pwm = KernelPWM(0, 1)
+    pwm.base_path = str(chip)
+    pwm.pwm_path = str(chip / "pwm1")
+    return pwm
+
+
+def test_attach_takes_over_a_running_channel(tmp_path):
+    chip = _pwm_root(tmp_path)
+    pwm = _kernel_pwm(chip)
+
+    assert pwm.attach() == 0.4
+    pwm.set_duty_cycle(50)
+    assert (chip / "pwm1/duty_cycle").read_text() == "500000"
+
+
+def test_attach_ignores_a_disabled_channel(tmp_path):
+    pwm = _kernel_pwm(_pwm_root(tmp_path, enable=0))
+
+    assert pwm.attach() is None
+    assert _kernel_pwm(tmp_path / "missing").attach() is None
+
+
+def test_warm_start_keeps_the_kernel_pwm_running(tmp_path, panel_file, monkeypatch):
+    chip = _pwm_root(tmp_path)
+
+    class SandboxedKernelPWM(KernelPWM):
+        def __init__(self, chip_number=0, channel=0):
+            super().__init__(chip_number, channel)
+            self.base_path = str(chip)
+            self.pwm_path = str(chip / f"pwm{channel}")
+
+        @classmethod
+        def is_available(cls, chip=0, channel=0):
+            return True
+
+    monkeypatch.setattr(displayhatmini_lite, "KernelPWM", SandboxedKernelPWM)
+    display = DisplayHATMini(
+        backend="fbdev", fb_device=panel_file, gpio="null", backlight_pwm=True, warm_start=str(tmp_path / "state")
+    )
+    try:
+        assert display.using_hardware_pwm
+        assert display._backlight_level == 0.4
+        assert not (chip / "unexport").exists()
+        assert (chip / "pwm1/duty_cycle").read_text() == "400000\n"
+        display.set_backlight(0.5)
+        assert (chip / "pwm1/duty_cycle").read_text() == "500000"
+    finally:
+        display._cleanup()
+    assert not (chip / "unexport").exists()  # Left running for the next warm start
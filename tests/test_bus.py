@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+from fakes import FakeSpiDev, fake_spidev_module, install
+from PIL import Image
+
+from displayhatmini_lite import BusArbiter, DisplayHATMini, backends
+
+SLICE = 9996  # 80 MHz for 1 ms, rounded down to 12 bytes
+BAND = DisplayHATMini.WIDTH * 2 * DisplayHATMini.BAND_ROWS  # 10,240 bytes of RGB565
+
+
+class SlowSpiDev(FakeSpiDev):
+    """SpiDev whose pixel writes take a while, logged once they have finished."""
+
+    log = []
+    writing = threading.Event()
+
+    def writebytes2(self, data):
+        SlowSpiDev.writing.set()
+        time.sleep(0.005)
+        super().writebytes2(data)
+        SlowSpiDev.log.append(len(data))
+
+
+@pytest.fixture
+def shared_display(monkeypatch):
+    """A spidev DisplayHATMini on fake hardware, sharing a BusArbiter."""
+    SlowSpiDev.log = []
+    SlowSpiDev.writing = threading.Event()
+    install(monkeypatch, {"spidev": fake_spidev_module(SlowSpiDev)})
+    monkeypatch.setattr(backends, "read_spidev_bufsiz", lambda *args: 4096)
+    arbiter = BusArbiter()
+    display = DisplayHATMini(backend="spidev", gpio="null", bus_arbiter=arbiter, max_slice_latency=0.001)
+    yield display, arbiter
+    display._cleanup()
+
+
+def test_slice_size():
+    assert DisplayHATMini.slice_size(80_000_000, 0.001) == SLICE
+    assert DisplayHATMini.slice_size(80_000_000, 0.002) == 19_992
+    assert DisplayHATMini.slice_size(1_000, 0.001) == 12
+
+
+def test_frame_is_sent_in_slices(shared_display):
+    display, arbiter = shared_display
+    assert display._backend.slice_bytes == SLICE
+    assert display._backend.chunk_bytes == 4096
+
+    display.display(Image.new("RGB", (320, 240), "white"))
+
+    bands = DisplayHATMini.HEIGHT // DisplayHATMini.BAND_ROWS
+    assert SlowSpiDev.log == [SLICE, BAND - SLICE] * bands
+    assert BAND - SLICE == 244
+
+
+def test_priority_transaction_waits_at_most_one_slice(shared_display):
+    display, arbiter = shared_display
+    frame = Image.new("RGB", (320, 240), "white")
+    drawer = threading.Thread(target=display.display, args=(frame,))
+    drawer.start()
+    try:
+        assert SlowSpiDev.writing.wait(5.0)
+        requested = len(SlowSpiDev.log)
+        with arbiter.transaction(priority=True):
+            granted = len(SlowSpiDev.log)
+    finally:
+        drawer.join(10.0)
+
+    assert granted - requested <= 1
+    assert arbiter.priority_transactions == 1
+    assert len(SlowSpiDev.log) == 2 * DisplayHATMini.HEIGHT // DisplayHATMini.BAND_ROWS
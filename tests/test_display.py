@@ -0,0 +1,257 @@
+import threading
+import time
+
+import pytest
+from fakes import COLMOD, RAMWR
+from PIL import Image
+
+from displayhatmini_lite import DisplayHATMini, to_rgb565
+
+RED, BLUE = 0xF800, 0x001F
+
+
+def _gradient(size=(320, 240)):
+    width, height = size
+    image = Image.new("RGB", size)
+    image.putdata([(x * 255 // (width - 1), y * 255 // (height - 1), 96) for y in range(height) for x in range(width)])
+    return image
+
+
+def _paletted(color) -> Image.Image:
+    image = Image.new("P", (320, 240), 0)
+    image.putpalette(list(color) + [0] * 765)
+    return image
+
+
+# fill() and fill_rect()
+
+
+@pytest.mark.parametrize(
+    "rect, window",
+    [
+        ((-5, -8, 20, 20), (0, 0, 15, 12)),
+        ((310, 230, 20, 20), (310, 230, 10, 10)),
+        ((-10, 100, 400, 1), (0, 100, 320, 1)),
+    ],
+)
+def test_fill_rect_is_clipped_to_the_screen(display, panel, rect, window):
+    display.fill_rect(*rect, "red")
+
+    (transfer,) = panel.transfers
+    assert (transfer.x, transfer.y, transfer.w, transfer.h) == window
+    x, y, w, h = window
+    assert panel.region(x, y, w, h) == RED.to_bytes(2, "big") * w * h
+
+
+@pytest.mark.parametrize("rect", [(320, 0, 10, 10), (0, 240, 10, 10), (-20, -20, 20, 20), (10, 10, 0, 5)])
+def test_fill_rect_off_screen_sends_nothing(display, panel, rect):
+    display.fill_rect(*rect, "red")
+
+    assert panel.transfers == []
+
+
+def test_fill_streams_the_pattern_buffer_over_any_window_size(display, panel):
+    w, h = 45, 47  # 4,230 bytes: one whole buffer and a partial one
+    assert (w * h * 2) % DisplayHATMini.FILL_BUFFER_SIZE != 0
+    display.fill_rect(100, 50, w, h, (0, 0, 255))
+
+    (transfer,) = panel.transfers
+    assert len(transfer.data) == w * h * 2
+    assert panel.region(100, 50, w, h) == BLUE.to_bytes(2, "big") * w * h
+    assert panel.pixel(99, 50) == panel.pixel(145, 96) == 0
+
+
+def test_fill_covers_the_screen(display, panel):
+    display.fill("blue")
+
+    assert bytes(panel.memory) == BLUE.to_bytes(2, "big") * 320 * 240
+
+
+# RGB444
+
+
+def test_rgb444_region_packs_two_pixels_in_three_bytes(display, panel):
+    display.pixel_format = "rgb444"
+    image = Image.new("RGB", (2, 2))
+    image.putdata([(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 255)])
+    display.display_region(image, 100, 50)
+
+    transfer = panel.transfers[-1]
+    assert transfer.colmod == 0x53
+    assert bytes(transfer.data) == bytes([0xF0, 0x00, 0xF0, 0x00, 0xFF, 0xFF])
+    assert [panel.pixel(x, y) for y in (50, 51) for x in (100, 101)] == [0xF800, 0x07E0, 0x001F, 0xFFFF]
+
+
+@pytest.mark.parametrize("dither, packed", [(False, [0x00] * 6), (True, [0x00, 0x01, 0x11, 0x11, 0x10, 0x00])])
+def test_rgb444_dither(display, panel, dither, packed):
+    display.pixel_format = "rgb444"
+    display.dither = dither
+    # Grey 8 lands on 0 or 1 depending on the Bayer offsets (0, 8 / 12, 4)
+    display.display_region(Image.new("RGB", (2, 2), (8, 8, 8)), 0, 0)
+
+    assert bytes(panel.transfers[-1].data) == bytes(packed)
+
+
+def test_rgb444_frame_switches_the_interface_format(display, panel):
+    display.pixel_format = "rgb444"
+    display.display(_gradient())
+    display.fill_rect(0, 0, 10, 10, "red")
+
+    colmods = [bytes(args) for cmd, args in panel.commands if cmd == COLMOD]
+    assert colmods[-2:] == [b"\x53", b"\x55"]
+    frame, fill = panel.transfers[-2:]
+    assert (frame.colmod, len(frame.data)) == (0x53, 320 * 240 * 3 // 2)
+    assert fill.colmod == 0x55
+
+
+def test_rgb444_init(make_display, panel):
+    make_display(pixel_format="rgb444").display(_gradient())
+
+    codes = panel.command_codes()
+    assert RAMWR not in codes[:codes.index(COLMOD)]  # Set up before any pixels
+    assert panel.transfers[0].colmod == 0x53
+
+
+# Skipping identical frames
+
+
+def test_palette_change_is_not_skipped(display, panel):
+    display.display(_paletted((255, 0, 0)))
+    assert panel.pixel(0, 0) == RED
+
+    display.display(_paletted((0, 0, 255)))
+
+    assert display.stats.frames_skipped == 0
+    assert panel.pixel(0, 0) == BLUE
+
+
+def test_failed_frame_is_sent_again(display, panel, monkeypatch):
+    backend = display._backend
+    write = backend.write
+    calls = []
+
+    def failing_write(data):
+        calls.append(len(data))
+        if len(calls) == 1:
+            raise OSError("transfer failed")
+        write(data)
+
+    monkeypatch.setattr(backend, "write", failing_write)
+    frame = Image.new("RGB", (320, 240), "blue")
+    with pytest.raises(OSError):
+        display.display(frame)
+
+    display.display(frame)
+
+    assert display.stats.frames_skipped == 0
+    assert panel.pixel(0, 0) == BLUE
+    display.display(frame)
+    assert display.stats.frames_skipped == 1
+
+
+def test_failed_raw_frame_is_sent_again(display, monkeypatch):
+    data = display.encode(Image.new("RGB", (320, 240), "green"))
+    backend = display._backend
+    write = backend.write
+    failures = [OSError("transfer failed")]
+
+    def failing_write(data):
+        if failures:
+            raise failures.pop()
+        write(data)
+
+    monkeypatch.setattr(backend, "write", failing_write)
+    with pytest.raises(OSError):
+        display.display_raw(data)
+
+    display.display_raw(data)
+
+    assert display.stats.frames_skipped == 0
+
+
+# Sharing the bus between threads
+
+
+def test_fill_waiting_for_the_bus_invalidates_frames_queued_before_it(display, panel):
+    frame = Image.new("RGB", (320, 240), "blue")
+    holding, release = threading.Event(), threading.Event()
+
+    def hold_bus():
+        display._acquire_bus()
+        holding.set()
+        release.wait(5.0)
+        display._release_bus()
+
+    holder = threading.Thread(target=hold_bus)
+    holder.start()
+    assert holding.wait(5.0)
+    filler = threading.Thread(target=display.fill, args=("red",))
+    filler.start()
+    time.sleep(0.05)  # The fill is now waiting for the bus
+    display.display(frame)  # Queued for the holder, so sent before the fill
+    release.set()
+    holder.join(5.0)
+    filler.join(5.0)
+    assert panel.pixel(0, 0) == RED
+
+    display.display(frame)
+
+    assert display.stats.frames_skipped == 0
+    assert panel.pixel(0, 0) == BLUE
+
+
+# Band streaming
+
+
+@pytest.mark.parametrize("pixel_format", ["rgb565", "rgb444"])
+def test_bands_send_the_same_bytes_as_a_whole_frame(display, panel, pixel_format):
+    display.pixel_format = pixel_format
+    display.BAND_ROWS = 7  # 240 rows: 34 bands and a short one
+    image = _gradient()
+
+    display.display(image)
+
+    assert bytes(panel.transfers[-1].data) == display.encode(image)
+
+
+@pytest.mark.parametrize("size, window", [((160, 120), (0, 0, 320, 240)), ((106, 80), (1, 0, 318, 240))])
+def test_scaled_bands_send_the_same_bytes_as_a_whole_frame(display, panel, size, window):
+    display.render_size = size
+    display.BAND_ROWS = 12  # Not a multiple of the scale
+    image = _gradient(size)
+
+    display.display(image)
+
+    x, y, w, h = window
+    frame = panel.transfers[-1]
+    assert (frame.x, frame.y, frame.w, frame.h) == window
+    assert bytes(frame.data) == to_rgb565(image.resize((w, h), Image.NEAREST))
+
+
+# render_size
+
+
+def test_upscaled_frames_count_as_frames(mock_display):
+    mock_display.render_size = (106, 80)  # 318x240 with a one-pixel border each side
+    mock_display.display(Image.new("RGB", (106, 80), "white"))
+    mock_display.display(Image.new("RGB", (106, 80), "black"))
+
+    assert mock_display.stats.frames == 2
+    assert mock_display.stats.regions == 2  # The borders, once
+    kinds = [event.kind for event in mock_display.flight_recorder.events()]
+    assert kinds.count("frame_end") == 2
+
+
+def test_render_size_change_redraws_the_same_image(mock_display, panel_file):
+    image = Image.new("RGB", (160, 120), "blue")
+    image.putpixel((0, 0), (255, 0, 0))
+    mock_display.render_size = (160, 120)
+    mock_display.display(image)
+    with open(panel_file, "rb") as f:
+        assert f.read(2) == RED.to_bytes(2, "little")
+
+    mock_display.render_size = (80, 60)  # Now shown at 320x240 by resizing
+    mock_display.display(image)
+
+    assert mock_display.stats.frames_skipped == 0
+    assert mock_display.stats.frames == 2
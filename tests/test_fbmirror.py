@@ -0,0 +1,72 @@
+import pytest
+
+from displayhatmini_lite.fbmirror import FramebufferMirror
+
+WIDTH, HEIGHT = 320, 240
+
+
+def _source(tmp_path):
+    """A regular file standing in for a 16 bpp 320x240 framebuffer."""
+    path = tmp_path / "fb.raw"
+    path.write_bytes(bytes(WIDTH * HEIGHT * 2))
+    return str(path)
+
+
+def _poke(path, x, y, value=0xFFFF):
+    with open(path, "r+b") as f:
+        f.seek((y * WIDTH + x) * 2)
+        f.write(value.to_bytes(2, "little"))
+
+
+def _mirror(display, source):
+    return FramebufferMirror(display, source, width=WIDTH, height=HEIGHT, bpp=16, mode="crop")
+
+
+def _assert_mirrored(source, panel):
+    """The panel shows the source (little-endian RGB565) exactly."""
+    with open(source, "rb") as f:
+        data = f.read()
+    assert bytes(panel.memory) == b"".join(data[i + 1:i + 2] + data[i:i + 1] for i in range(0, len(data), 2))
+
+
+def test_only_changed_tiles_are_sent(display, panel, tmp_path):
+    source = _source(tmp_path)
+    mirror = _mirror(display, source)
+    try:
+        assert mirror.step() == 1  # Everything, the first time
+        assert mirror.step() == 0
+
+        _poke(source, 100, 50)
+        assert mirror.step() == 1
+        assert (panel.transfers[-1].x, panel.transfers[-1].y) == (96, 48)
+        assert mirror.bytes_sent == WIDTH * HEIGHT * 2 + 16 * 16 * 2
+    finally:
+        mirror.close()
+    _assert_mirrored(source, panel)
+
+
+def test_change_during_step_is_sent_next_step(display, panel, tmp_path):
+    source = _source(tmp_path)
+    mirror = _mirror(display, source)
+    mirror.step()
+    dirty_rects = mirror._dirty_rects
+
+    def racing_dirty_rects(*args):
+        rects = dirty_rects(*args)
+        _poke(source, 300, 200)  # Written after the diff, before the copy
+        return rects
+
+    try:
+        _poke(source, 10, 10)
+        mirror._dirty_rects = racing_dirty_rects
+        assert mirror.step() == 1
+        mirror._dirty_rects = dirty_rects
+        assert mirror.step() == 1
+    finally:
+        mirror.close()
+    _assert_mirrored(source, panel)
+
+
+def test_max_fps_must_be_positive(display, tmp_path):
+    with pytest.raises(ValueError):
+        FramebufferMirror(display, _source(tmp_path), width=WIDTH, height=HEIGHT, bpp=16, max_fps=0)
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from PIL import Image
+
+
+def test_hung_transfer_is_a_stall(mock_display, monkeypatch):
+    backend = mock_display._backend
+    write = backend.write
+    unblock = threading.Event()
+
+    def hanging_write(data):
+        unblock.wait(5.0)
+        write(data)
+
+    stalls = []
+    watchdog = mock_display.enable_watchdog(deadline=0.05, on_stall=stalls.append)
+    monkeypatch.setattr(backend, "write", hanging_write)
+    drawer = threading.Thread(target=mock_display.fill, args=("red",))
+    drawer.start()
+    try:
+        deadline = time.monotonic() + 5.0
+        while not stalls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert watchdog.stalled
+        assert "has not finished" in stalls[0]
+    finally:
+        unblock.set()
+        drawer.join(5.0)
+
+    time.sleep(0.01)
+    assert watchdog.check() is False
+    assert watchdog.stalls == 1
+    kinds = [event.kind for event in mock_display.flight_recorder.events()]
+    assert "recovered" in kinds
+    mock_display.disable_watchdog()
+
+
+def test_frames_and_skips_are_progress(mock_display):
+    watchdog = mock_display.enable_watchdog(deadline=60.0)
+    frame = Image.new("RGB", (320, 240), "green")
+    try:
+        before = watchdog._count()
+        mock_display.display(frame)
+        mock_display.display(frame)  # Skipped
+        assert watchdog._count() == before + 2
+        assert mock_display.stats.frames_skipped == 1
+    finally:
+        mock_display.disable_watchdog()
@@ -0,0 +1,135 @@
+import pytest
+
+from displayhatmini_lite.governor import Governor
+
+
+class FakeSystem:
+    """/proc and /sys files of a four-core Pi, rewritten before each sample."""
+
+    def __init__(self, tmp_path):
+        self.proc = tmp_path / "proc"
+        self.sys = tmp_path / "sys"
+        self.proc.mkdir()
+        (self.sys / "class/thermal/thermal_zone0").mkdir(parents=True)
+        self._busy = 0
+        self._idle = 0
+        self.set()
+
+    def set(self, temperature=45.0, load=0.4, cpu=0.1):
+        """Write a temperature in °C, a load average and the CPU use since the last call."""
+        self._busy += round(cpu * 100)
+        self._idle += 100 - round(cpu * 100)
+        cores = "".join(f"cpu{n} 0 0 0 0 0 0 0 0\n" for n in range(4))
+        (self.proc / "stat").write_text(f"cpu  {self._busy} 0 0 {self._idle} 0 0 0 0 0 0\n{cores}")
+        (self.proc / "loadavg").write_text(f"{load} 0.3 0.2 1/123 4567\n")
+        (self.sys / "class/thermal/thermal_zone0/temp").write_text(f"{round(temperature * 1000)}\n")
+
+
+@pytest.fixture
+def system(tmp_path):
+    return FakeSystem(tmp_path)
+
+
+def _governor(system, **options):
+    return Governor(None, min_fps=10, max_fps=60, proc_root=str(system.proc), sys_root=str(system.sys), **options)
+
+
+def test_cool_and_idle_keeps_full_rate(system):
+    governor = _governor(system)
+    system.set()
+
+    assert governor.update() is False
+    assert (governor.fps, governor.band_delay) == (60, 0.0)
+    assert governor.temperature == 45.0
+    assert governor.load == pytest.approx(0.1)
+    assert governor.cpu == pytest.approx(0.1)
+
+
+def test_steps_down_with_temperature_and_back_up(system):
+    governor = _governor(system)
+
+    system.set(temperature=67.5)
+    assert governor.update() is True
+    assert (governor.fps, governor.band_delay) == (35, 0.001)
+
+    system.set(temperature=80.0)
+    assert governor.update() is True
+    assert (governor.fps, governor.band_delay) == (10, 0.002)
+
+    system.set(temperature=50.0)
+    assert governor.update() is True
+    assert (governor.fps, governor.band_delay) == (60, 0.0)
+
+    stats = governor.stats()
+    assert stats["adjustment_count"] == 3
+    assert [(a.fps, a.band_delay) for a in stats["adjustments"]] == [(35, 0.001), (10, 0.002), (60, 0.0)]
+    assert stats["adjustments"][1].temperature == 80.0
+
+
+def test_load_and_cpu_raise_the_pressure(system):
+    governor = _governor(system)
+
+    system.set(load=3.8)  # 0.95 of four cores
+    governor.update()
+    assert governor.pressure == pytest.approx(1.0)
+    assert governor.fps == 10
+
+    system.set(cpu=0.81)
+    governor.update()
+    assert governor.pressure == pytest.approx(0.6)
+    assert governor.fps == 30
+
+
+def test_hysteresis_holds_the_outputs_until_the_pressure_drops_enough(system):
+    governor = _governor(system, hysteresis=0.1)
+    system.set(temperature=67.5)  # Pressure 0.5
+    governor.update()
+
+    system.set(temperature=66.5)  # 0.43: not enough of a drop
+    assert governor.update() is False
+    assert (governor.fps, governor.band_delay) == (35, 0.001)
+
+    system.set(temperature=65.75)  # 0.38: relaxed
+    assert governor.update() is True
+    assert governor.fps == 41
+
+    system.set(temperature=66.0)  # 0.40: rising pressure applies at once
+    assert governor.update() is True
+    assert governor.fps == 40
+
+
+def test_no_hysteresis_follows_every_step(system):
+    governor = _governor(system, hysteresis=0)
+    system.set(temperature=67.5)
+    governor.update()
+
+    system.set(temperature=66.5)
+    assert governor.update() is True
+    assert governor.fps == 38
+
+
+def test_paces_the_display_writer(system, mock_display):
+    governor = Governor(mock_display, proc_root=str(system.proc), sys_root=str(system.sys))
+    system.set(temperature=75.0)
+    governor.update()
+    assert mock_display._band_writer.band_delay == 0.002
+
+    governor.close()
+    assert mock_display._band_writer.band_delay == 0.0
+
+
+def test_missing_files_count_as_no_pressure(tmp_path):
+    governor = Governor(None, proc_root=str(tmp_path), sys_root=str(tmp_path))
+
+    assert governor.update() is False
+    assert (governor.temperature, governor.load, governor.cpu) == (None, None, None)
+    assert governor.pressure == 0.0
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"min_fps": 0}, {"min_fps": 30, "max_fps": 20}, {"temp_range": (70, 60)}, {"hysteresis": 1.0}],
+)
+def test_bad_bounds(options):
+    with pytest.raises(ValueError):
+        Governor(None, **options)
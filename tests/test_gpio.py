@@ -0,0 +1,85 @@
+import random
+import sys
+import threading
+import time
+import types
+
+import pytest
+from fakes import fake_gpiod_modules, install
+
+from displayhatmini_lite.gpio import GpiodGPIO, NullGPIO, open_gpio
+
+PIN = 17
+
+
+@pytest.fixture
+def gpiod(monkeypatch):
+    install(monkeypatch, fake_gpiod_modules())
+    return sys.modules["gpiod"]
+
+
+@pytest.fixture
+def gpio(gpiod):
+    gpio = GpiodGPIO(chip="/dev/gpiochip0")
+    gpio.setup_output(PIN, True)
+    yield gpio
+    gpio.close()
+
+
+def settle(gpio):
+    """Wait for more than one PWM period."""
+    time.sleep(3 / gpio.PWM_MAX_FREQ)
+
+
+@pytest.mark.parametrize("final", [0, 100])
+def test_full_duty_after_pwm_keeps_its_level(gpio, gpiod, final):
+    pwm = gpio.pwm(PIN, 200)
+    pwm.start(100)
+    level = gpiod.line.Value.ACTIVE if final else gpiod.line.Value.INACTIVE
+    for _ in range(40):
+        pwm.ChangeDutyCycle(50)
+        time.sleep(random.uniform(0, 2 / gpio.PWM_MAX_FREQ))
+        pwm.ChangeDutyCycle(final)
+        settle(gpio)
+        assert gpiod.values[PIN] == level
+
+
+def test_stop_leaves_the_pin_alone(gpio, gpiod):
+    pwm = gpio.pwm(PIN, 200)
+    for _ in range(40):
+        pwm.ChangeDutyCycle(50)
+        time.sleep(random.uniform(0, 2 / gpio.PWM_MAX_FREQ))
+        pwm.stop()
+        gpio.output(PIN, True)
+        settle(gpio)
+        assert gpiod.values[PIN] == gpiod.line.Value.ACTIVE
+
+
+def test_open_gpio_names():
+    assert isinstance(open_gpio("null"), NullGPIO)
+    with pytest.raises(ValueError):
+        open_gpio("pigpio")
+
+
+def test_watch_survives_a_failing_callback(gpiod, caplog):
+    gpio = GpiodGPIO(chip="/dev/gpiochip0")
+    gpio.setup_inputs((5, 6))
+    seen = []
+    done = threading.Event()
+
+    def callback(pin, timestamp):
+        seen.append(pin)
+        if pin == 5:
+            raise RuntimeError("boom")
+        done.set()
+
+    try:
+        gpio.watch((5, 6), callback)
+        edge = types.SimpleNamespace
+        gpiod.edges([edge(line_offset=5, timestamp_ns=1), edge(line_offset=6, timestamp_ns=2)])
+        assert done.wait(2.0)
+    finally:
+        gpio.close()
+
+    assert seen == [5, 6]
+    assert "Button callback failed for pin 5" in caplog.text
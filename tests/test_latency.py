@@ -0,0 +1,86 @@
+import threading
+import time
+
+from PIL import Image
+
+from displayhatmini_lite import DisplayHATMini, LatencyTracker
+from displayhatmini_lite.latency import main
+
+
+def test_draw_inside_callback_is_the_response(mock_display):
+    tracker = LatencyTracker(mock_display)
+    frame = Image.new("RGB", (320, 240), "navy")
+    mock_display.on_button_pressed(lambda pin: mock_display.display(frame))
+
+    mock_display._handle_button(DisplayHATMini.BUTTON_A)
+
+    assert len(tracker.records) == 1
+    assert tracker.unanswered == 0
+    record = tracker.records[0]
+    assert record.stage("draw") == 0
+    assert record.stage("total") >= record.stage("present")
+
+
+def test_draw_after_callback_is_the_response(mock_display):
+    tracker = LatencyTracker(mock_display)
+    mock_display.on_button_pressed(lambda pin: None)
+
+    mock_display._handle_button(DisplayHATMini.BUTTON_B)
+    assert len(tracker.records) == 0
+    mock_display.fill("red")
+
+    assert len(tracker.records) == 1
+    assert tracker.records[0].stage("draw") >= 0
+
+
+def test_mock_immediate_runs_to_completion(panel_file, capsys):
+    done = threading.Event()
+
+    def run():
+        main(["--mock", panel_file, "--immediate", "--presses", "5", "--interval", "0.01"])
+        done.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(10)
+
+    assert done.is_set(), "latency --mock --immediate did not finish"
+    output = capsys.readouterr().out
+    total = next(line for line in output.splitlines() if line.startswith("total"))
+    assert total.split()[1] == "5"
+    assert "unanswered edges: 0" in output
+
+
+def test_edge_older_than_timeout_is_not_answered_by_a_later_draw(mock_display):
+    tracker = LatencyTracker(mock_display, timeout=0.05)
+    mock_display.on_button_pressed(lambda pin: None)
+
+    mock_display._handle_button(DisplayHATMini.BUTTON_A)
+    time.sleep(0.1)
+    mock_display.fill("red")
+
+    assert len(tracker.records) == 0
+    assert tracker.unanswered == 1
+
+
+def test_discarded_edge_is_not_answered(mock_display):
+    tracker = LatencyTracker(mock_display)
+    mock_display.on_button_pressed(lambda pin: tracker.discard(pin) if pin == DisplayHATMini.BUTTON_B else None)
+
+    mock_display._handle_button(DisplayHATMini.BUTTON_B)
+    mock_display._handle_button(DisplayHATMini.BUTTON_A)
+    mock_display.fill("red")
+
+    assert [record.pin for record in tracker.records] == [DisplayHATMini.BUTTON_A]
+    assert tracker.unanswered == 0
+
+
+def test_render_size_borders_do_not_answer_edges(mock_display):
+    tracker = LatencyTracker(mock_display)
+    mock_display.render_size = (106, 80)
+    calls = []
+    tracker.on_draw = lambda: calls.append("draw")
+
+    mock_display.display(Image.new("RGB", (106, 80), "red"))
+
+    assert calls == ["draw"]
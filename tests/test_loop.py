@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from displayhatmini_lite import GameLoop, loop
+
+
+class FakeClock:
+    """Stands in for the time module in loop.py; only sleep() moves it on."""
+
+    def __init__(self):
+        self.now = 10**9
+
+    def monotonic_ns(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += math.ceil(seconds * 1e9)
+
+
+class Buttons:
+    """Stands in for a display: no buttons held, no governor."""
+
+    governor = None
+
+    def read_buttons(self):
+        return frozenset()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(loop, "time", clock)
+    return clock
+
+
+def test_ticks_and_frames_keep_their_rates(clock):
+    ticks = []
+    frames = []
+    game = GameLoop(Buttons(), lambda dt, buttons: ticks.append(dt), lambda alpha: frames.append(alpha),
+                    tick_rate=50, frame_rate=25, spin=0)
+
+    stats = game.run(duration=1.0)
+
+    assert stats.frames == len(frames) == 25
+    assert stats.ticks == len(ticks) == 48  # Two per frame, none before the first
+    assert set(ticks) == {0.02}
+    assert stats.overruns == stats.dropped_ticks == 0
+    assert stats.elapsed == 1.0
+
+
+def test_slow_render_is_an_overrun_not_a_burst(clock):
+    frames = []
+
+    def render(alpha):
+        frames.append(clock.now)
+        if len(frames) == 3:
+            clock.now += 50_000_000  # 50 ms frame at 50 fps
+
+    game = GameLoop(Buttons(), lambda dt, buttons: None, render, tick_rate=50, spin=0)
+    stats = game.run(duration=0.3)
+
+    assert stats.overruns == 1
+    gaps = [b - a for a, b in zip(frames, frames[1:])]
+    assert gaps[2] == 50_000_000
+    assert set(gaps[3:]) == {20_000_000}  # Back on pace, not catching up
+
+
+def test_catchup_is_limited_after_a_stall(clock):
+    ticks = []
+
+    def render(alpha):
+        if len(ticks) == 1:
+            clock.now += 500_000_000  # Half a second stall: 25 ticks behind
+
+    game = GameLoop(Buttons(), lambda dt, buttons: ticks.append(clock.now), render, tick_rate=50, max_catchup=5, spin=0)
+    stats = game.run(duration=0.6)
+
+    assert max(ticks.count(now) for now in ticks) == 5
+    assert stats.dropped_ticks == 20
+    assert stats.overruns == 1
@@ -0,0 +1,39 @@
+from PIL import Image
+
+from displayhatmini_lite.pixels import to_rgb565
+
+
+def _reference(image):
+    """RGB565 through a full RGB conversion."""
+    return to_rgb565(image.convert("RGB"))
+
+
+def test_palette_with_transparency_matches_rgb():
+    image = Image.new("P", (16, 16))
+    image.putpalette([v for i in range(256) for v in (i, 255 - i, i * 7 % 256)])
+    image.putdata([(x * 16 + y) % 256 for y in range(16) for x in range(16)])
+    image.info["transparency"] = 3
+
+    assert to_rgb565(image) == _reference(image)
+
+
+def test_short_palette_matches_rgb():
+    image = Image.new("P", (4, 1))
+    image.putpalette([255, 0, 0, 0, 255, 0])
+    image.putdata([0, 1, 0, 1])
+
+    assert to_rgb565(image) == _reference(image)
+
+
+def test_greyscale_matches_rgb():
+    image = Image.new("L", (256, 1))
+    image.putdata(list(range(256)))
+
+    assert to_rgb565(image) == _reference(image)
+
+
+def test_one_bit_matches_rgb():
+    image = Image.new("1", (8, 2))
+    image.putdata([0, 1, 1, 0, 1, 0, 0, 1] * 2)
+
+    assert to_rgb565(image) == _reference(image)
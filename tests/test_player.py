@@ -0,0 +1,40 @@
+import threading
+import time
+
+from PIL import Image
+
+from displayhatmini_lite import AnimationPlayer
+
+
+class SlowEncoder:
+    """Stands in for a display whose encode() takes a while."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.encoding = threading.Event()
+        self.presented = 0
+
+    def encode(self, image):
+        self.encoding.set()
+        time.sleep(self.delay)
+        return b""
+
+    def display_raw(self, data):
+        self.presented += 1
+
+
+def test_stop_from_another_thread_while_waiting_for_a_frame():
+    display = SlowEncoder(0.3)
+    frames = [Image.new("RGB", (320, 240))] * 10
+    player = AnimationPlayer(display, frames, fps=100)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(player.play()), daemon=True)
+    thread.start()
+
+    assert display.encoding.wait(5.0)
+    player.stop()
+    thread.join(2.0)
+
+    assert not thread.is_alive(), "play() did not return after stop()"
+    assert result[0].presented == 0
+
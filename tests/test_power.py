@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+from fakes import SLPIN, SLPOUT
+from PIL import Image
+
+from displayhatmini_lite import DisplayHATMini, power
+
+
+class FakeClock:
+    """Stands in for the time module in power.py."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def process_time(self):
+        return 0.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(power, "time", clock)
+    return clock
+
+
+def _advance(idle, clock, seconds, state):
+    """Move the clock on, wake the timer thread and wait for it to reach state."""
+    clock.now += seconds
+    with idle._cond:
+        idle._cond.notify()
+    deadline = time.monotonic() + 2.0
+    while idle.state != state and time.monotonic() < deadline:
+        time.sleep(0.001)
+    with idle._cond:  # Held by the timer thread until the state is applied
+        assert idle.state == state
+
+
+def test_dim_blank_and_wake(make_display, panel, clock):
+    display = make_display(backlight_pwm=True)
+    display.set_backlight(0.8)
+    backlight = display._backlight_pwm
+    idle = display.enable_idle(dim_after=30, blank_after=120, dim_level=0.1)
+
+    _advance(idle, clock, 29, "active")
+    _advance(idle, clock, 2, "dim")
+    assert backlight.duty == pytest.approx(10)
+
+    _advance(idle, clock, 90, "blank")
+    assert backlight.duty is None  # Stopped
+    assert panel.command_codes()[-1] == SLPIN
+
+    woken = threading.Event()
+    display.on_button_pressed(lambda pin: woken.set())
+    display._handle_button(DisplayHATMini.BUTTON_A)
+    assert woken.is_set()
+    assert idle.state == "active"
+    assert panel.command_codes()[-1] == SLPOUT
+    assert backlight.duty == pytest.approx(80)
+    assert idle.wakeups == 1
+    assert idle.stats()["dim"]["seconds"] == pytest.approx(90)
+
+
+def test_identical_frames_are_not_activity(display, clock):
+    frame = Image.new("RGB", (320, 240), "navy")
+    idle = display.enable_idle(dim_after=30, blank_after=None)
+    _advance(idle, clock, 31, "dim")
+
+    display.display(frame)
+    assert idle.state == "active"
+    _advance(idle, clock, 31, "dim")
+    display.display(frame)  # Already on the panel
+    assert idle.state == "dim"
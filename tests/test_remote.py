@@ -0,0 +1,46 @@
+import os
+
+import pytest
+from PIL import Image
+
+from displayhatmini_lite import to_rgb565
+from displayhatmini_lite.remote import RemoteViewClient, RemoteViewServer, main
+
+
+@pytest.fixture
+def served(make_display, tmp_path):
+    display = make_display(shadow=True)
+    return display, display.enable_remote_view(str(tmp_path / "view.sock"), max_fps=100)
+
+
+def test_snapshot_round_trip(served, tmp_path, capsys):
+    display, server = served
+    image = Image.new("RGB", (320, 240), "navy")
+    image.paste((255, 200, 0), (50, 60, 150, 100))
+    display.display(image)
+
+    output = tmp_path / "screen.png"
+    main(["snapshot", server.address, str(output)])
+
+    with Image.open(output) as snapshot:
+        assert to_rgb565(snapshot) == to_rgb565(display.screenshot())
+    assert "Saved 320x240 screen" in capsys.readouterr().out
+
+
+def test_viewer_receives_changes(served):
+    display, server = served
+    with RemoteViewClient(server.address) as client:
+        assert client.update() == (0, 0, 320, 240)
+        display.fill_rect(10, 20, 30, 40, "red")
+        assert client.update() == (10, 20, 30, 40)
+        assert client.image.getpixel((10, 20)) == (255, 0, 0)
+
+
+def test_existing_file_is_not_replaced(tmp_path):
+    path = tmp_path / "not-a-socket"
+    path.write_text("keep me")
+
+    with pytest.raises(OSError):
+        RemoteViewServer(None, str(path))
+    assert path.read_text() == "keep me"
+    assert os.path.exists(path)
@@ -0,0 +1,49 @@
+import pytest
+from PIL import Image
+
+from displayhatmini_lite import to_rgb565
+
+
+@pytest.fixture
+def shadowed(make_display):
+    return make_display(shadow=True)
+
+
+def _gradient():
+    image = Image.new("RGB", (320, 240))
+    image.putdata([(x * 255 // 319, y * 255 // 239, 128) for y in range(240) for x in range(320)])
+    return image
+
+
+def test_screenshot_after_display(shadowed, panel):
+    image = _gradient()
+    shadowed.display(image)
+
+    assert to_rgb565(shadowed.screenshot()) == to_rgb565(image)
+    assert to_rgb565(shadowed.screenshot()) == bytes(panel.memory)
+
+
+def test_screenshot_after_fill_rect(shadowed, panel):
+    shadowed.display(_gradient())
+    shadowed.fill_rect(-10, 100, 50, 20, "red")
+
+    screenshot = shadowed.screenshot()
+    assert screenshot.getpixel((0, 100)) == (255, 0, 0)
+    assert screenshot.getpixel((39, 119)) == (255, 0, 0)
+    assert screenshot.getpixel((40, 119)) != (255, 0, 0)
+    assert to_rgb565(screenshot) == bytes(panel.memory)
+
+
+@pytest.mark.parametrize("dither", [False, True])
+def test_screenshot_with_rgb444(shadowed, panel, dither):
+    shadowed.pixel_format = "rgb444"
+    shadowed.dither = dither
+    shadowed.display(_gradient())
+
+    assert panel.transfers[-1].colmod == 0x53
+    assert to_rgb565(shadowed.screenshot()) == bytes(panel.memory)
+
+
+def test_screenshot_needs_shadow(display):
+    with pytest.raises(RuntimeError):
+        display.screenshot()
@@ -0,0 +1,64 @@
+from PIL import Image
+
+from displayhatmini_lite import Sprite, to_rgb565
+
+BLUE = 0x001F
+WHITE = 0xFFFF
+RED = 0xF800
+
+
+def _background():
+    return to_rgb565(Image.new("RGB", (320, 240), "blue"))
+
+
+def test_overlapping_move_sends_the_union(display, panel):
+    sprite = Sprite(display, Image.new("RGB", (10, 10), "white"), _background())
+    sprite.move(100, 80)
+    sprite.move(104, 82)
+
+    last = panel.transfers[-1]
+    assert (last.x, last.y, last.w, last.h) == (100, 80, 14, 12)
+    assert panel.pixel(101, 81) == BLUE  # Left behind
+    assert panel.pixel(113, 91) == WHITE
+
+
+def test_disjoint_move_sends_two_rectangles(display, panel):
+    sprite = Sprite(display, Image.new("RGB", (10, 10), "white"), _background())
+    sprite.move(0, 0)
+    sprite.move(50, 50)
+
+    assert [(t.x, t.y, t.w, t.h) for t in panel.transfers[-2:]] == [(0, 0, 10, 10), (50, 50, 10, 10)]
+    assert panel.pixel(5, 5) == BLUE
+    assert panel.pixel(55, 55) == WHITE
+
+
+def test_transparent_pixels_show_the_background(display, panel):
+    image = Image.new("RGBA", (4, 1), (0, 0, 0, 0))
+    image.putpixel((1, 0), (255, 255, 255, 255))
+    image.putpixel((2, 0), (255, 255, 255, 100))  # Below ALPHA_THRESHOLD
+    sprite = Sprite(display, image, _background())
+
+    assert sprite._spans == [(0, 1, 2)]
+    sprite.move(10, 10)
+    assert [panel.pixel(x, 10) for x in range(10, 14)] == [BLUE, WHITE, BLUE, BLUE]
+
+
+def test_hide_restores_the_background(display, panel):
+    sprite = Sprite(display, Image.new("RGB", (10, 10), "white"), _background())
+    sprite.move(20, 20)
+    sprite.hide()
+
+    assert panel.region(20, 20, 10, 10) == BLUE.to_bytes(2, "big") * 100
+    assert not sprite.visible
+
+
+def test_moving_past_a_sprite_sharing_the_background_keeps_it_whole(display, panel):
+    background = _background()
+    paddle = Sprite(display, Image.new("RGB", (6, 51), "red"), background)
+    ball = Sprite(display, Image.new("RGB", (11, 11), "white"), background)
+    paddle.move(22, 100)
+    ball.move(25, 120)  # Overlaps the paddle's right edge
+    ball.move(40, 120)
+    ball.hide()
+
+    assert panel.region(22, 100, 6, 51) == RED.to_bytes(2, "big") * 6 * 51
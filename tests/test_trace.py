@@ -0,0 +1,46 @@
+import json
+
+from PIL import Image
+
+from displayhatmini_lite import TraceRecorder
+from displayhatmini_lite.trace import main, read_trace
+
+
+def _record(display, path):
+    with TraceRecorder(display, path, payload=True):
+        display.display(Image.new("RGB", (320, 240), "red"))
+        display.display_region(Image.new("RGB", (40, 30), "blue"), 100, 50)
+        display.set_led(0.0, 1.0, 0.0)
+        display.display(Image.new("RGB", (320, 240), "red"))
+
+
+def test_recorded_calls(mock_display, tmp_path):
+    path = str(tmp_path / "app.trace")
+    _record(mock_display, path)
+
+    header, records = read_trace(path)
+    assert (header["width"], header["height"], header["payload"]) == (320, 240, True)
+    assert [record["op"] for record in records] == ["display", "display_region", "set_led", "display"]
+
+
+def test_replay_on_mock_panel_without_gpio(mock_display, tmp_path, capsys):
+    path = str(tmp_path / "app.trace")
+    _record(mock_display, path)
+    panel = str(tmp_path / "replay.raw")  # Created at the right size
+
+    main(["replay", path, "--mock", panel, "--json"])
+
+    (summary,) = json.loads(capsys.readouterr().out)
+    assert summary["calls"] == 4
+    with open(panel, "rb") as f:
+        assert f.read(2) == (0xF800).to_bytes(2, "little")
+
+
+def test_render_size_borders_are_not_recorded(mock_display, tmp_path):
+    mock_display.render_size = (106, 80)  # Leaves a border each side
+    path = str(tmp_path / "app.trace")
+    with TraceRecorder(mock_display, path):
+        mock_display.display(Image.new("RGB", (106, 80), "red"))
+
+    _header, records = read_trace(path)
+    assert [record["op"] for record in records] == ["display"]